@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+"""
+Measures the aggregates over Place: the average price per city, price
+percentiles and a histogram of max_guest, computed by the column index
+and by Python loops over storage.all(Place).
+
+Usage:
+    python3 -m benchmarks.bench_aggregates [--objects N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine import columns
+from models.engine.file_storage import FileStorage
+
+
+def python_aggregates(storage):
+    """
+    Computes the aggregates with loops over the objects.
+    """
+    places = storage.all("Place").values()
+    by_city = {}
+    for place in places:
+        by_city.setdefault(place.city_id, []).append(place.price_by_night)
+    {city: sum(prices) / len(prices) for city, prices in by_city.items()}
+    prices = sorted(place.price_by_night for place in places)
+    [prices[(len(prices) - 1) * percent // 100] for percent in (50, 90, 99)]
+    guests = {}
+    for place in places:
+        guests[place.max_guest] = guests.get(place.max_guest, 0) + 1
+
+
+def column_aggregates(storage):
+    """
+    Computes the aggregates with the column index.
+    """
+    storage.aggregate("Place", "price_by_night", by="city_id")
+    storage.percentiles("Place", "price_by_night", (50, 90, 99))
+    storage.histogram("Place", "max_guest", 10)
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        storage = FileStorage(file_path=path)
+        storage.reload()
+        print("{} places, NumPy {}".format(
+            storage.count("Place"),
+            "installed" if columns.numpy is not None else "not installed"))
+        for name, func in (("python", python_aggregates),
+                           ("columns", column_aggregates)):
+            start = time.perf_counter()
+            func(storage)
+            print("{:>8}: {:8.3f} s".format(
+                name, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+"""
+Measures the cold start of a process showing one object: importing
+models (which reloads the storage) and calling storage.get(), with the
+JSON file, in lazy mode and with a memory-mapped snapshot.
+
+Usage:
+    python3 -m benchmarks.bench_cold_start [--objects N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import JSONSerializer, schema_fields
+from models.engine.snapshot import write_snapshot
+
+SHOW = """
+import sys
+from models import storage
+obj = storage.get(sys.argv[1], sys.argv[2])
+assert obj is not None
+"""
+
+
+def cold_start(workdir, env, key):
+    """
+    Runs a process showing the object stored under key.
+
+    Returns:
+        float: The seconds the process took.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", SHOW] + key.split(".", 1),
+                   check=True, cwd=workdir, env=env)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        snapshot = os.path.join(tmp_dir, "file.snap")
+        generate(path, args.objects)
+        with open(path, "r", encoding="utf-8") as f:
+            key = next(iter(json.load(f)))
+        write_snapshot(snapshot, JSONSerializer().read(path),
+                       schema_fields(FileStorage().attributes()))
+        print("{} objects, {:.1f} MB JSON, {:.1f} MB snapshot".format(
+            args.objects, os.path.getsize(path) / 1e6,
+            os.path.getsize(snapshot) / 1e6))
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        for name in ("HBNB_STORAGE_JOURNAL", "HBNB_STORAGE_PARTITIONED",
+                     "HBNB_STORAGE_FORMAT", "HBNB_STORAGE_LAZY",
+                     "HBNB_STORAGE_SNAPSHOT", "HBNB_TYPE_STORAGE"):
+            env.pop(name, None)
+        for mode, extra in (("json", {}),
+                            ("lazy", {"HBNB_STORAGE_LAZY": "1"}),
+                            ("snapshot", {"HBNB_STORAGE_SNAPSHOT": snapshot})):
+            elapsed = cold_start(tmp_dir, dict(env, **extra), key)
+            print("{:>9}: {:8.3f} s".format(mode, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+
+"""
+Measures the objects created per second: one at a time with the class,
+with ids from uuid.uuid4() and from the batched generator, and in bulk
+with storage.new_many(). Place is the default class; most of its cost
+is its indexes, which a class such as BaseModel does not have.
+
+Usage:
+    python3 -m benchmarks.bench_create [--objects N] [--class NAME]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+from models import base_model
+from models.engine import registry
+from models.engine.file_storage import FileStorage
+
+
+def one_by_one(storage, cls, count):
+    """
+    Creates the objects with cls(), each added by storage.new().
+    """
+    for _ in range(count):
+        cls()
+
+
+def bulk(storage, cls, count):
+    """
+    Creates the objects with storage.new_many().
+    """
+    storage.new_many(cls, ({} for _ in range(count)))
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    parser.add_argument("--class", dest="class_name", default="Place")
+    args = parser.parse_args()
+    cls = registry.classes()[args.class_name]
+
+    new_id = base_model.new_id
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = FileStorage(file_path=os.path.join(tmp_dir, "file.json"))
+        for name, func, ids in (
+                ("uuid4", one_by_one, lambda: str(uuid.uuid4())),
+                ("new_id", one_by_one, new_id),
+                ("new_many", bulk, new_id)):
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__pending = {}
+            base_model.new_id = ids
+            start = time.perf_counter()
+            func(storage, cls, args.objects)
+            elapsed = time.perf_counter() - start
+            print("{:>9}: {:8.3f} s  {:>10,.0f} objects/s".format(
+                name, elapsed, args.objects / elapsed))
+    base_model.new_id = new_id
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+"""
+Compares the storage file formats: file size, time to serialize every
+object, time to read the records back and time of a full reload(). The
+times are the best of --repeat runs.
+
+Usage:
+    python3 -m benchmarks.bench_formats [--objects N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine.atomic import write_atomic
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import SERIALIZERS, JSONSerializer, \
+    get_serializer, schema_fields
+
+
+def best(func, repeat):
+    """
+    Returns the shortest time func takes over repeat runs.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fields = schema_fields(FileStorage().attributes())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "source.json")
+        generate(source, args.objects)
+        records = list(JSONSerializer().read(source))
+        print("{} objects".format(args.objects))
+        for name in SERIALIZERS:
+            serializer = get_serializer(name, fields)
+            path = os.path.join(tmp_dir, "file" + serializer.extension)
+
+            encode = best(lambda: serializer.join(
+                [serializer.encode(key, data) for key, data in records]
+            ), args.repeat)
+            write_atomic(path, serializer.join(
+                [serializer.encode(key, data) for key, data in records]
+            ), "none")
+            read = best(lambda: all(True for _ in serializer.read(path)),
+                        args.repeat)
+            storage = FileStorage(file_path=path, file_format=name)
+            reload = best(storage.reload, args.repeat)
+            FileStorage._FileStorage__objects = {}
+
+            print("{:>7}: {:8.1f} MB  encode {:6.2f} s  read {:6.2f} s  "
+                  "reload {:6.2f} s".format(
+                      name, os.path.getsize(path) / 1e6, encode, read,
+                      reload))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+
+"""
+Measures the memory held after FileStorage.reload() with the ids
+interned, and with a copy of each id per object as json produces them.
+
+The dataset has a realistic fan-out (see benchmarks.dataset): most
+objects are reviews, each referring to a place and a user, and each
+place to a city, a user and five amenities. Each reload runs in its own
+process; the resident set size is read once the reload is done.
+
+Usage:
+    python3 -m benchmarks.bench_intern [--objects N]
+"""
+
+import argparse
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+
+
+def rss():
+    """
+    Returns the resident set size of this process, in MB, or its peak
+    where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def child(mode, path):
+    """
+    Runs one reload and prints its object count, duration, and the RSS
+    before and after it.
+    """
+    from models.engine import registry
+    from models.engine.file_storage import FileStorage
+
+    if mode == "copies":
+        registry.intern_references = lambda class_name, data: data
+    storage = FileStorage(file_path=path)
+    gc.collect()
+    baseline = rss()
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(len(storage.all()), elapsed, baseline, rss())
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        print("{} objects, {:.1f} MB".format(
+            args.objects, os.path.getsize(path) / 1e6))
+        for mode in ("copies", "interned"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_intern",
+                 "--child", mode, path],
+                check=True, capture_output=True, text=True,
+                env=dict(os.environ, HBNB_STORAGE_PARTITIONED="",
+                         HBNB_STORAGE_JOURNAL="", HBNB_STORAGE_LAZY="",
+                         HBNB_STORAGE_COMPACT_MODELS="")
+            ).stdout.split()
+            count, elapsed, baseline, after = int(output[0]), *map(
+                float, output[1:])
+            print("{:>9}: {:8.2f} s  RSS +{:8.1f} MB for {} objects "
+                  "({:.0f} B per object)".format(
+                      mode, elapsed, after - baseline, count,
+                      (after - baseline) * 1e6 / count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+"""
+Measures the memory of the model instances, in bytes per object for
+each class, as regular instances and as compact slot-based twins.
+
+The serialized objects are generated before the measure, so that only
+the instances (and the datetimes parsed for them) are counted, not the
+strings they share with the records.
+
+Usage:
+    python3 -m benchmarks.bench_model_memory [--objects N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.dataset import records
+from models.engine import registry
+from models.engine.compact import compact_class
+
+
+def bytes_per_object(cls, values):
+    """
+    Builds an instance of cls from each serialized object.
+
+    Returns:
+        float: The bytes allocated per instance.
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(**value) for value in values]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated / len(objects)
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=100000)
+    args = parser.parse_args()
+
+    by_class = {}
+    for _, value in records(args.objects):
+        by_class.setdefault(value["__class__"], []).append(value)
+    print("{:>8} {:>8} {:>10} {:>10} {:>7}".format(
+        "class", "objects", "regular", "compact", "saved"))
+    for class_name, values in by_class.items():
+        cls = registry.classes()[class_name]
+        regular = bytes_per_object(cls, values)
+        compact = bytes_per_object(compact_class(cls), values)
+        print("{:>8} {:>8} {:>8.0f} B {:>8.0f} B {:>6.0%}".format(
+            class_name, len(values), regular, compact,
+            1 - compact / regular))
+
+
+if __name__ == "__main__":
+    main()
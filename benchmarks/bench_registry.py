@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+
+"""
+Measures the cost per record of FileStorage.reload() with the class
+registry and with the classes() it replaced, which imported the models
+and built a new dictionary on every call.
+
+Usage:
+    python3 -m benchmarks.bench_registry [--objects N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine.file_storage import FileStorage
+
+
+def import_classes(self):
+    """
+    Returns the classes the way FileStorage.classes() did before the
+    registry.
+    """
+    from models.base_model import BaseModel
+    from models.user import User
+    from models.state import State
+    from models.city import City
+    from models.amenity import Amenity
+    from models.place import Place
+    from models.review import Review
+
+    classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review
+    }
+    return classes
+
+
+def time_reload(path, classes, repeat):
+    """
+    Reloads path with the given classes() method.
+
+    Args:
+        path (str): The storage file.
+        classes (function): The implementation of FileStorage.classes().
+        repeat (int): The number of runs, the best of which is kept.
+
+    Returns:
+        tuple: The number of objects loaded and the best time in seconds.
+    """
+    registry_classes = FileStorage.classes
+    FileStorage.classes = classes
+    try:
+        best = None
+        for _ in range(repeat):
+            storage = FileStorage(file_path=path)
+            start = time.perf_counter()
+            storage.reload()
+            elapsed = time.perf_counter() - start
+            count = len(FileStorage._FileStorage__objects)
+            FileStorage._FileStorage__objects = {}
+            best = elapsed if best is None else min(best, elapsed)
+        return count, best
+    finally:
+        FileStorage.classes = registry_classes
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        print("{} objects, {:.1f} MB".format(
+            args.objects, os.path.getsize(path) / 1e6))
+        for name, classes in (("imports", import_classes),
+                              ("registry", FileStorage.classes)):
+            start = time.perf_counter()
+            for _ in range(args.objects):
+                classes(None)
+            per_call = (time.perf_counter() - start) / args.objects
+            count, elapsed = time_reload(path, classes, args.repeat)
+            print("{:>9}: {:6.3f} us per classes() call, {:6.2f} us per "
+                  "record reloaded".format(name, per_call * 1e6,
+                                           elapsed / count * 1e6))
+
+
+if __name__ == "__main__":
+    main()
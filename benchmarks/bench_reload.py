@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+"""
+Measures FileStorage.reload() throughput, in objects per second, with
+the fast datetime parser and with the strptime() parser it replaced.
+
+Usage:
+    python3 -m benchmarks.bench_reload [--objects N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import models.base_model
+from benchmarks.dataset import generate
+from models.engine.file_storage import FileStorage
+
+
+def strptime_datetime(value):
+    """
+    Parses a datetime the way BaseModel did before parse_datetime().
+    """
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+
+
+def time_reload(path, parser):
+    """
+    Reloads path with the given datetime parser.
+
+    Args:
+        path (str): The storage file.
+        parser (function): The function parsing created_at/updated_at.
+
+    Returns:
+        tuple: The number of objects loaded and the seconds it took.
+    """
+    fast_parser = models.base_model.parse_datetime
+    models.base_model.parse_datetime = parser
+    try:
+        storage = FileStorage(file_path=path)
+        start = time.perf_counter()
+        storage.reload()
+        elapsed = time.perf_counter() - start
+        return len(storage.all()), elapsed
+    finally:
+        models.base_model.parse_datetime = fast_parser
+        FileStorage._FileStorage__objects = {}
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        print("{} objects, {:.1f} MB".format(
+            args.objects, os.path.getsize(path) / 1e6))
+        for name, datetime_parser in (
+                ("strptime", strptime_datetime),
+                ("fromisoformat", models.base_model.parse_datetime)):
+            count, elapsed = time_reload(path, datetime_parser)
+            print("{:>14}: {:8.2f} s  {:10.0f} objects/s".format(
+                name, elapsed, count / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+
+"""
+Measures the peak RSS of FileStorage.reload() with the incremental
+reader, and with json.load() as reload() did before it.
+
+Each reload runs in its own process, so that the peak of one does not
+hide the other.
+
+Usage:
+    python3 -m benchmarks.bench_reload_memory [--objects N]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+
+
+def peak_rss():
+    """
+    Returns the peak RSS of this process, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def load_json(path):
+    """
+    Loads path the way reload() did before the incremental reader.
+
+    Returns:
+        int: The number of objects loaded.
+    """
+    from models.engine.file_storage import FileStorage
+
+    classes = FileStorage().classes()
+    with open(path, "r", encoding="utf-8") as f:
+        obj_dict = json.load(f)
+    obj_dict = {k: classes[v["__class__"]](**v) for k, v in obj_dict.items()}
+    return len(obj_dict)
+
+
+def load_stream(path):
+    """
+    Loads path with FileStorage.reload().
+
+    Returns:
+        int: The number of objects loaded.
+    """
+    from models.engine.file_storage import FileStorage
+
+    storage = FileStorage(file_path=path)
+    storage.reload()
+    return len(storage.all())
+
+
+def child(loader, path):
+    """
+    Runs one reload and prints its object count, duration, baseline and
+    peak RSS.
+    """
+    import models  # noqa: F401, imported before the baseline is taken
+
+    baseline = peak_rss()
+    start = time.perf_counter()
+    count = {"json.load": load_json, "stream": load_stream}[loader](path)
+    print(count, time.perf_counter() - start, baseline, peak_rss())
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        print("{} objects, {:.1f} MB".format(
+            args.objects, os.path.getsize(path) / 1e6))
+        for loader in ("json.load", "stream"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_reload_memory",
+                 "--child", loader, path],
+                check=True, capture_output=True, text=True,
+                env=dict(os.environ, HBNB_STORAGE_PARTITIONED="",
+                         HBNB_STORAGE_JOURNAL="")
+            ).stdout.split()
+            count, elapsed, baseline, peak = int(output[0]), *map(
+                float, output[1:])
+            print("{:>10}: {:8.2f} s  peak RSS {:8.1f} MB "
+                  "(+{:.1f} MB for {} objects)".format(
+                      loader, elapsed, peak, peak - baseline, count))
+
+
+if __name__ == "__main__":
+    main()
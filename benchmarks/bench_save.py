@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+"""
+Measures FileStorage.save() throughput, in saves per second, at each
+durability level, both rewriting the JSON file and appending to the
+write-ahead log.
+
+Usage:
+    python3 -m benchmarks.bench_save [--objects N] [--saves N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine.atomic import DURABILITY_LEVELS
+from models.engine.file_storage import FileStorage
+
+
+def time_saves(path, saves, durability, journal):
+    """
+    Updates one object and saves it, saves times.
+
+    Args:
+        path (str): The storage file, reloaded first.
+        saves (int): The number of saves.
+        durability (str): The durability level.
+        journal (bool): Whether to use the write-ahead log.
+
+    Returns:
+        float: The seconds the saves took.
+    """
+    storage = FileStorage(file_path=path, journal=journal,
+                          compact_records=saves + 1, durability=durability)
+    try:
+        storage.reload()
+        objects = list(storage.all().values())
+        start = time.perf_counter()
+        for i in range(saves):
+            objects[i % len(objects)].name = "bench {}".format(i)
+            storage.save()
+        return time.perf_counter() - start
+    finally:
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--saves", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "source.json")
+        generate(source, args.objects)
+        print("{} objects, {:.1f} MB, {} saves".format(
+            args.objects, os.path.getsize(source) / 1e6, args.saves))
+        for journal in (False, True):
+            for durability in DURABILITY_LEVELS:
+                path = os.path.join(tmp_dir, "file.json")
+                shutil.copyfile(source, path)
+                if os.path.exists(path + ".log"):
+                    os.remove(path + ".log")
+                elapsed = time_saves(path, args.saves, durability, journal)
+                print("{:>8} {:>5}: {:8.3f} s  {:10.0f} saves/s".format(
+                    "journal" if journal else "json", durability,
+                    elapsed, args.saves / elapsed))
+
+
+if __name__ == "__main__":
+    main()
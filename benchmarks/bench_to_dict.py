@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+"""
+Measures to_dict() over the objects of a reloaded storage: the first
+pass, which builds each dictionary, a second pass served by the cache,
+and a pass after 1% of the objects were changed.
+
+Usage:
+    python3 -m benchmarks.bench_to_dict [--objects N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import generate
+from models.engine.file_storage import FileStorage
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "file.json")
+        generate(path, args.objects)
+        storage = FileStorage(file_path=path)
+        storage.reload()
+        objects = list(storage.all().values())
+        for name in ("first", "cached", "1% changed"):
+            if name == "1% changed":
+                for obj in objects[::100]:
+                    obj.name = "changed"
+            start = time.perf_counter()
+            for obj in objects:
+                obj.to_dict()
+            elapsed = time.perf_counter() - start
+            print("{:>10}: {:8.3f} s  {:6.2f} us per object".format(
+                name, elapsed, elapsed * 1e6 / len(objects)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+
+"""
+Generates synthetic storage files for the benchmarks.
+
+The objects follow a realistic fan-out: a few states, ten cities per
+state, users, places spread over cities and owned by users, a fixed
+set of amenities, and reviews making up most of the file.
+"""
+
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+SHARES = (
+    ("State", 0.001),
+    ("City", 0.01),
+    ("User", 0.15),
+    ("Place", 0.2),
+    ("Review", None)
+)
+AMENITIES = 50
+WORDS = ("great", "view", "quiet", "clean", "host", "ocean", "cozy",
+         "noisy", "street", "garden", "loft", "close", "metro", "bright")
+
+
+def counts(total):
+    """
+    Splits total objects between the classes.
+
+    Args:
+        total (int): The number of objects in the dataset.
+
+    Returns:
+        dict: Maps class names to their number of objects.
+    """
+    result = {"Amenity": min(AMENITIES, total)}
+    left = total - result["Amenity"]
+    for class_name, share in SHARES:
+        result[class_name] = max(int(total * share), 1) \
+            if share is not None else left
+        left -= result[class_name]
+    if left < 0:
+        result["Review"] += left
+    return result
+
+
+def records(total, seed=98):
+    """
+    Yields (key, serialized object) pairs of a synthetic dataset.
+
+    Args:
+        total (int): The number of objects to yield.
+        seed (int): The seed of the random generator.
+    """
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    ids = {}
+
+    def base(class_name):
+        obj_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        ids.setdefault(class_name, []).append(obj_id)
+        created_at = start + timedelta(seconds=rng.randrange(10 ** 7),
+                                       microseconds=rng.randrange(1, 10 ** 6))
+        return "{}.{}".format(class_name, obj_id), {
+            "id": obj_id,
+            "created_at": created_at.isoformat(),
+            "updated_at": (created_at + timedelta(hours=1)).isoformat(),
+            "__class__": class_name
+        }
+
+    def text(length):
+        return " ".join(rng.choice(WORDS) for _ in range(length))
+
+    for class_name, count in counts(total).items():
+        for i in range(count):
+            key, record = base(class_name)
+            if class_name in ("State", "Amenity"):
+                record["name"] = "{} {}".format(class_name, i)
+            elif class_name == "City":
+                record["state_id"] = rng.choice(ids["State"])
+                record["name"] = "City {}".format(i)
+            elif class_name == "User":
+                record["email"] = "user{}@example.com".format(i)
+                record["password"] = "pwd"
+                record["first_name"] = "First"
+                record["last_name"] = "Last"
+            elif class_name == "Place":
+                record.update({
+                    "city_id": rng.choice(ids["City"]),
+                    "user_id": rng.choice(ids["User"]),
+                    "name": "Place {}".format(i),
+                    "description": text(12),
+                    "number_rooms": rng.randrange(1, 6),
+                    "number_bathrooms": rng.randrange(1, 3),
+                    "max_guest": rng.randrange(1, 10),
+                    "price_by_night": rng.randrange(20, 500),
+                    "latitude": rng.uniform(-60, 70),
+                    "longitude": rng.uniform(-180, 180),
+                    "amenity_ids": rng.sample(ids["Amenity"], 5)
+                })
+            else:
+                record["place_id"] = rng.choice(ids["Place"])
+                record["user_id"] = rng.choice(ids["User"])
+                record["text"] = text(20)
+            yield key, record
+
+
+def generate(path, total, seed=98):
+    """
+    Writes a synthetic dataset in the format of FileStorage.save().
+
+    The file is written one object at a time, so that datasets larger
+    than memory can be generated.
+
+    Args:
+        path (str): The file to write.
+        total (int): The number of objects in the dataset.
+        seed (int): The seed of the random generator.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i, (key, record) in enumerate(records(total, seed)):
+            if i:
+                f.write(", ")
+            f.write("{}: {}".format(json.dumps(key), json.dumps(record)))
+        f.write("}")
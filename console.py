@@ -9,6 +9,7 @@ import re
 
 from shlex import split
 from models import storage
+from models.engine import registry
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -51,6 +52,26 @@ def parse_args(arg):
         return tokenized
 
 
+def parse_numbers(values):
+    """
+    Converts command arguments to numbers.
+
+    Args:
+        values (list): The arguments to convert.
+
+    Returns:
+        list: The arguments as floats, or None if one is not a number.
+
+    Examples:
+        >>> parse_numbers(["48.85", "2"])
+        [48.85, 2.0]
+    """
+    try:
+        return [float(value) for value in values]
+    except ValueError:
+        return None
+
+
 class HBNBCommand(cmd.Cmd):
     """
     Defines the HolbertonBnB command interpreter.
@@ -62,15 +83,7 @@ class HBNBCommand(cmd.Cmd):
 
     prompt = "(hbnb) "
 
-    available_classes = {
-        "BaseModel",
-        "User",
-        "State",
-        "City",
-        "Place",
-        "Amenity",
-        "Review"
-    }
+    available_classes = set(registry.classes())
 
     def emptyline(self):
         """
@@ -94,7 +107,14 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "range": self.do_range,
+            "within": self.do_within,
+            "near": self.do_near,
+            "nearest": self.do_nearest,
+            "amenities": self.do_amenities,
+            "search": self.do_search,
+            "stats": self.do_stats
         }
 
         match = re.search(r"\.", arg)
@@ -114,6 +134,7 @@ class HBNBCommand(cmd.Cmd):
         """
         Quit command to exit the program.
         """
+        storage.close()
         return True
 
     def do_EOF(self, arg):
@@ -121,6 +142,7 @@ class HBNBCommand(cmd.Cmd):
         EOF signal to exit the program.
         """
         print("")
+        storage.close()
         return True
 
     def do_create(self, arg):
@@ -133,6 +155,8 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
         elif args[0] not in self.available_classes:
             print("** class doesn't exist **")
+        elif storage.read_only:
+            print("** storage is read-only **")
         else:
             instance = eval(args[0])()
             print(instance.id)
@@ -144,17 +168,16 @@ class HBNBCommand(cmd.Cmd):
         Display the string representation of a class instance given its id.
         """
         args = parse_args(arg)
-        obj_dict = storage.all()
         if not args:
             print("** class name missing **")
         elif args[0] not in self.available_classes:
             print("** class doesn't exist **")
         elif len(args) < 2:
             print("** instance id missing **")
-        elif "{}.{}".format(args[0], args[1]) not in obj_dict:
+        elif storage.get(args[0], args[1]) is None:
             print("** no instance found **")
         else:
-            print(obj_dict["{}.{}".format(args[0], args[1])])
+            print(storage.get(args[0], args[1]))
 
     def do_destroy(self, arg):
         """
@@ -162,17 +185,18 @@ class HBNBCommand(cmd.Cmd):
         Delete a class instance given its id.
         """
         args = parse_args(arg)
-        obj_dict = storage.all()
         if not args:
             print("** class name missing **")
         elif args[0] not in self.available_classes:
             print("** class doesn't exist **")
         elif len(args) < 2:
             print("** instance id missing **")
-        elif "{}.{}".format(args[0], args[1]) not in obj_dict:
+        elif storage.get(args[0], args[1]) is None:
             print("** no instance found **")
+        elif storage.read_only:
+            print("** storage is read-only **")
         else:
-            del obj_dict["{}.{}".format(args[0], args[1])]
+            storage.delete(storage.get(args[0], args[1]))
             storage.save()
 
     def do_all(self, arg):
@@ -186,10 +210,8 @@ class HBNBCommand(cmd.Cmd):
         if len(class_name) > 0 and class_name[0] not in HBNBCommand.available_classes:
             print("** class doesn't exist **")
         else:
-            object_list = [
-                obj.__str__() for obj in storage.all().values()
-                if len(class_name) == 0 or obj.__class__.__name__ == class_name[0]
-            ]
+            objects = storage.all(class_name[0] if class_name else None)
+            object_list = [obj.__str__() for obj in objects.values()]
             print(object_list)
 
     def do_count(self, arg):
@@ -199,15 +221,167 @@ class HBNBCommand(cmd.Cmd):
         Retrieve the number of instances of a given class.
         """
         args = parse_args(arg)
-        count = 0
         class_name = args[0] if args else None
-        if class_name:
-            for obj in storage.all().values():
-                if obj.__class__.__name__ == class_name:
-                    count += 1
+        print(storage.count(class_name))
+
+    def do_range(self, arg):
+        """
+        Usage: range <class> <attribute> <min> <max> [...] or
+       <class>.range(<attribute>, <min>, <max>)
+
+        Display the instances of a class whose numeric attributes lie
+        between min and max, both included. Use - for an open bound.
+        """
+        args = parse_args(arg)
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in self.available_classes:
+            print("** class doesn't exist **")
+        elif len(args) < 2:
+            print("** attribute name missing **")
+        elif (len(args) - 1) % 3 != 0:
+            print("** value missing **")
+        else:
+            bounds = {}
+            try:
+                for i in range(1, len(args), 3):
+                    bounds[args[i]] = tuple(
+                        None if value == "-" else float(value)
+                        for value in args[i + 1:i + 3]
+                    )
+            except ValueError:
+                print("** value must be a number **")
+                return False
+            objects = storage.range(args[0], **bounds)
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_within(self, arg):
+        """
+        Usage: within <class> <min_lat> <min_lng> <max_lat> <max_lng> or
+       <class>.within(<min_lat>, <min_lng>, <max_lat>, <max_lng>)
+
+        Display the instances of a class located inside a bounding box.
+        """
+        args = self.geo_args(arg, 5)
+        if args is not None:
+            objects = storage.within(*args)
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_near(self, arg):
+        """
+        Usage: near <class> <latitude> <longitude> <km> or
+       <class>.near(<latitude>, <longitude>, <km>)
+
+        Display the instances of a class located within km kilometres of
+        a point, nearest first.
+        """
+        args = self.geo_args(arg, 4)
+        if args is not None:
+            objects = storage.near(*args)
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_nearest(self, arg):
+        """
+        Usage: nearest <class> <latitude> <longitude> <count> or
+       <class>.nearest(<latitude>, <longitude>, <count>)
+
+        Display the count instances of a class nearest to a point.
+        """
+        args = self.geo_args(arg, 4)
+        if args is not None:
+            args[3] = int(args[3])
+            objects = storage.nearest(*args)
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_amenities(self, arg):
+        """
+        Usage: amenities <class> <all|any> <amenity_id> [...] or
+       <class>.amenities(<all|any>, <amenity_id>, ...)
+
+        Display the instances of a class offering all (or any) of the
+        given amenities.
+        """
+        args = parse_args(arg)
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in self.available_classes:
+            print("** class doesn't exist **")
+        elif len(args) < 2 or args[1] not in ("all", "any"):
+            print("** match must be all or any **")
+        elif len(args) < 3:
+            print("** amenity id missing **")
+        else:
+            objects = storage.contains(args[0], "amenity_ids", args[2:],
+                                       match=args[1])
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_search(self, arg):
+        """
+        Usage: search [<class>] <words> or <class>.search(<words>)
+
+        Display the instances whose text (place descriptions, review
+        texts) holds every word and "quoted phrase", best match first.
+        """
+        words = arg.split(None, 1)
+        class_name = None
+        if words and words[0] in self.available_classes:
+            class_name = words[0]
+            arg = words[1] if len(words) > 1 else ""
+        if not arg.strip():
+            print("** search words missing **")
+        else:
+            objects = storage.search(arg, class_name)
+            print([obj.__str__() for obj in objects.values()])
+
+    def do_stats(self, arg):
+        """
+        Usage: stats <class> <attribute> [<group attribute>] or
+       <class>.stats(<attribute>[, <group attribute>])
+
+        Display the count, sum, mean, min, max and 50th, 90th and 99th
+        percentiles of a numeric attribute over the instances of a
+        class, or the aggregates of each value of a group attribute,
+        e.g. stats Place price_by_night city_id.
+        """
+        args = parse_args(arg)
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in self.available_classes:
+            print("** class doesn't exist **")
+        elif len(args) < 2:
+            print("** attribute name missing **")
+        elif len(args) > 2:
+            print(storage.aggregate(args[0], args[1], by=args[2]))
         else:
-            count = len(storage.all())
-        print(count)
+            result = storage.aggregate(args[0], args[1])
+            result.update(zip(("p50", "p90", "p99"), storage.percentiles(
+                args[0], args[1], (50, 90, 99))))
+            print(result)
+
+    def geo_args(self, arg, count):
+        """
+        Parses the arguments of a geographic query.
+
+        Args:
+            arg (str): The command argument.
+            count (int): The expected number of arguments, class included.
+
+        Returns:
+            list: The class name followed by the numeric arguments, or
+            None after printing an error.
+        """
+        args = parse_args(arg)
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in self.available_classes:
+            print("** class doesn't exist **")
+        elif len(args) < count:
+            print("** value missing **")
+        elif parse_numbers(args[1:count]) is None:
+            print("** value must be a number **")
+        else:
+            return [args[0]] + parse_numbers(args[1:count])
+        return None
 
     def do_update(self, arg):
         """
@@ -219,7 +393,6 @@ class HBNBCommand(cmd.Cmd):
         a given attribute key/value pair or dictionary.
         """
         args = parse_args(arg)
-        obj_dict = storage.all()
 
         if len(args) == 0:
             print("** class name missing **")
@@ -230,7 +403,8 @@ class HBNBCommand(cmd.Cmd):
         if len(args) == 1:
             print("** instance id missing **")
             return False
-        if f"{args[0]}.{args[1]}" not in obj_dict.keys():
+        obj = storage.get(args[0], args[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(args) == 2:
@@ -242,25 +416,23 @@ class HBNBCommand(cmd.Cmd):
             except NameError:
                 print("** value missing **")
                 return False
+        if storage.read_only:
+            print("** storage is read-only **")
+            return False
 
+        coercions = registry.coercions(args[0])
         if len(args) == 4:
-            obj = obj_dict[f"{args[0]}.{args[1]}"]
-            if args[2] in obj.__class__.__dict__.keys():
-                value_type = type(obj.__class__.__dict__[args[2]])
-                obj.__dict__[args[2]] = value_type(args[3])
+            if args[2] in coercions:
+                setattr(obj, args[2], coercions[args[2]](args[3]))
             else:
-                obj.__dict__[args[2]] = args[3]
+                setattr(obj, args[2], args[3])
         elif type(eval(args[2])) == dict:
-            obj = obj_dict[f"{args[0]}.{args[1]}"]
             for key, value in eval(args[2]).items():
-                if key in obj.__class__.__dict__.keys() and type(
-                        obj.__class__.__dict__[key]
-                ) in {str, int, float}:
-                    value_type = type(obj.__class__.__dict__[key])
-                    obj.__dict__[key] = value_type(value)
+                if key in coercions:
+                    setattr(obj, key, coercions[key](value))
                 else:
-                    obj.__dict__[key] = value
-        storage.save()
+                    setattr(obj, key, value)
+        obj.save()
 
 
 if __name__ == '__main__':
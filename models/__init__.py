@@ -4,7 +4,33 @@ models/__init__.py
 This module serves as the entry point for the models package.
 
 It initializes the FileStorage instance and reloads data from
-the JSON file.
+the JSON file. Both happen on the first access to models.storage, so
+that tools importing only the engine modules, such as the format
+converter, do not load the data file.
+
+Setting the HBNB_STORAGE_JOURNAL environment variable to "1" makes
+the storage append mutations to a write-ahead log instead of rewriting
+the JSON file on every save. Setting HBNB_STORAGE_PARTITIONED to "1"
+stores each class in its own <class name>.json file, loaded on first
+access. HBNB_STORAGE_COMMIT_WINDOW (seconds) and HBNB_STORAGE_COMMIT_COUNT
+coalesce the saves made within that window, or up to that count, into
+one write. HBNB_STORAGE_DURABILITY picks how far each write is pushed
+to disk: "none", "flush" or "fsync" (the default).
+Setting HBNB_STORAGE_BACKGROUND to "1" writes the files on a background
+thread; storage.flush() waits for it and storage.close() stops it.
+HBNB_STORAGE_FORMAT selects the file format, "json" (the default) or
+"binary".
+Setting HBNB_STORAGE_SNAPSHOT to the path of a snapshot written by
+storage.write_snapshot() (or python3 -m models.engine.snapshot) opens
+it read-only and memory-mapped instead of parsing the data file.
+Setting HBNB_STORAGE_LAZY to "1" only builds the instances of the
+objects read from the data file when they are first accessed.
+Setting HBNB_STORAGE_COMPACT_MODELS to "1" builds the objects read from
+the files with their declared attributes in __slots__, to save memory.
+
+Setting HBNB_TYPE_STORAGE to "db" stores the objects in the SQLite
+database HBNB_DB_PATH ("hbnb.db" by default) with DBStorage instead; the
+variables above then have no effect.
 
 Usage:
     - Import modules or packages from the models package to access
@@ -17,7 +43,48 @@ Example:
     ...
 """
 
-from models.engine.file_storage import FileStorage
+import os
+
+
+def _open_storage():
+    """
+    Creates the storage selected by the environment and reloads it.
+
+    Returns:
+        FileStorage or DBStorage: The storage.
+    """
+    if os.getenv("HBNB_TYPE_STORAGE") == "db":
+        from models.engine.db_storage import DBStorage
+
+        storage = DBStorage(os.getenv("HBNB_DB_PATH", "hbnb.db"))
+    else:
+        from models.engine.file_storage import FileStorage
+
+        storage = FileStorage(
+            journal=os.getenv("HBNB_STORAGE_JOURNAL") == "1",
+            partitioned=os.getenv("HBNB_STORAGE_PARTITIONED") == "1",
+            commit_window=float(os.getenv("HBNB_STORAGE_COMMIT_WINDOW"))
+            if os.getenv("HBNB_STORAGE_COMMIT_WINDOW") else None,
+            commit_count=int(os.getenv("HBNB_STORAGE_COMMIT_COUNT"))
+            if os.getenv("HBNB_STORAGE_COMMIT_COUNT") else None,
+            durability=os.getenv("HBNB_STORAGE_DURABILITY", "fsync"),
+            background=os.getenv("HBNB_STORAGE_BACKGROUND") == "1",
+            file_format=os.getenv("HBNB_STORAGE_FORMAT", "json"),
+            snapshot=os.getenv("HBNB_STORAGE_SNAPSHOT") or None,
+            lazy=os.getenv("HBNB_STORAGE_LAZY") == "1",
+            compact_models=os.getenv("HBNB_STORAGE_COMPACT_MODELS") == "1"
+        )
+    storage.reload()
+    return storage
+
 
-storage = FileStorage()
-storage.reload()
+def __getattr__(name):
+    """
+    Opens the storage on the first access to models.storage.
+    """
+    if name == "storage":
+        global storage
+        storage = _open_storage()
+        return storage
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
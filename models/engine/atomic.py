@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+Crash-safe file writes for the storage engine.
+
+A file is never rewritten in place: the new content goes to a temporary
+file next to it, which then atomically replaces the old one, so a crash
+leaves either the previous or the new version behind, never a truncated
+file. The durability level picks how far the data is pushed first:
+
+    "none"  - nothing is forced to disk: a process crash is safe, but an
+              OS crash or power loss may lose the last writes.
+    "flush" - the file content is fsynced before the rename, so a power
+              loss keeps the previous or the new version, but the rename
+              itself may be lost.
+    "fsync" - the directory is fsynced after the rename as well, so a
+              write that returned survives a power loss.
+"""
+
+import os
+
+DURABILITY_LEVELS = ("none", "flush", "fsync")
+
+
+def check_durability(durability):
+    """
+    Validates a durability level.
+
+    Args:
+        durability (str): One of DURABILITY_LEVELS.
+
+    Raises:
+        ValueError: If durability is not a known level.
+    """
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError("durability must be one of {}".format(
+            ", ".join(DURABILITY_LEVELS)))
+
+
+def fsync_directory(path):
+    """
+    Fsyncs the directory holding path, so that a rename into it is
+    durable. Platforms that cannot open directories are skipped.
+
+    Args:
+        path (str): A file in the directory.
+    """
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, text, durability="fsync"):
+    """
+    Replaces the content of path with text.
+
+    Args:
+        path (str): The file to write.
+        text (str or bytes): The new content.
+        durability (str): One of DURABILITY_LEVELS.
+    """
+    tmp_path = path + ".tmp"
+    if isinstance(text, bytes):
+        tmp_file = open(tmp_path, "wb")
+    else:
+        tmp_file = open(tmp_path, "w", encoding="utf-8")
+    with tmp_file:
+        tmp_file.write(text)
+        if durability != "none":
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+    if durability == "fsync":
+        fsync_directory(path)
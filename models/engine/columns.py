@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+
+"""
+Columnar mirror of numeric attributes, for aggregates over a class.
+
+ColumnIndex keeps each numeric attribute of a class in a column of
+doubles, one row per object, and each grouping attribute (a foreign key
+such as Place.city_id) as a column of integer codes. Rows are appended
+on add() and a removed row is replaced by the last one, so the columns
+stay dense and follow the objects as FileStorage stores and drops them.
+
+The columns are array.array buffers, which grow in place. When NumPy is
+installed the aggregates view them as NumPy arrays without copying and
+run vectorized; otherwise the same results are computed in Python.
+Values that are not numbers are stored as NaN and ignored.
+"""
+
+import math
+from array import array
+
+from models.engine.indexes import Index
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is optional
+    numpy = None
+
+NAN = float("nan")
+
+
+class ColumnIndex(Index):
+    """
+    Keeps numeric attributes of one class in columns.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        columns (dict): Maps numeric attributes to their array("d")
+        column.
+        groups (dict): Maps grouping attributes to their array("q")
+        column of codes, -1 where the object has no value or one that
+        is not hashable.
+        labels (dict): Maps grouping attributes to the list of values
+        their codes stand for.
+        keys (list): The storage key of each row.
+    """
+
+    def __init__(self, class_name, attributes, group_attributes=()):
+        """
+        Initializes an empty column index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            attributes (iterable): The numeric attributes to mirror.
+            group_attributes (iterable): The attributes aggregates can
+            be grouped by.
+        """
+        self.class_name = class_name
+        self.__attributes = list(attributes)
+        self.__group_attributes = list(group_attributes)
+        self.clear()
+
+    def clear(self):
+        """
+        Drops every row of the index.
+        """
+        self.columns = {name: array("d") for name in self.__attributes}
+        self.groups = {name: array("q") for name in self.__group_attributes}
+        self.labels = {name: [] for name in self.__group_attributes}
+        self.__codes = {name: {} for name in self.__group_attributes}
+        self.keys = []
+        self.__rows = {}
+
+    def __len__(self):
+        """
+        Returns the number of rows.
+        """
+        return len(self.keys)
+
+    def add(self, key, obj):
+        """
+        Appends the row of obj, stored under key.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return
+        self.__rows[key] = len(self.keys)
+        self.keys.append(key)
+        for name, column in self.columns.items():
+            value = getattr(obj, name, None)
+            if isinstance(value, bool) or \
+                    not isinstance(value, (int, float)):
+                value = NAN
+            column.append(value)
+        for name, column in self.groups.items():
+            column.append(self.__code(name, getattr(obj, name, None)))
+
+    def __code(self, name, value):
+        """
+        Returns the code of a value of a grouping attribute.
+        """
+        if value is None:
+            return -1
+        codes = self.__codes[name]
+        try:
+            code = codes.get(value)
+        except TypeError:
+            # Not hashable, such as a list: not grouped, as HashIndex
+            # does not index it.
+            return -1
+        if code is None:
+            code = codes[value] = len(self.labels[name])
+            self.labels[name].append(value)
+        return code
+
+    def remove(self, key, obj):
+        """
+        Drops the row of the object stored under key, moving the last
+        row in its place.
+        """
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        for column in list(self.columns.values()) + \
+                list(self.groups.values()):
+            column[row] = column[last]
+            column.pop()
+        moved = self.keys.pop()
+        if row != last:
+            self.keys[row] = moved
+            self.__rows[moved] = row
+
+
+def _view(column):
+    """
+    Returns a column as a NumPy array, sharing the buffer of an
+    array("d") instead of copying it.
+    """
+    return numpy.asarray(column, dtype=numpy.float64)
+
+
+def _numbers(column):
+    """
+    Returns the values of a column that are not NaN, as a list.
+    """
+    return [value for value in column if value == value]
+
+
+def summary(count, total, low, high):
+    """
+    Builds the dictionary of aggregates returned by summarize().
+
+    Args:
+        count (int): The number of values.
+        total (float): Their sum.
+        low (float): The smallest value.
+        high (float): The largest value.
+    """
+    if not count:
+        return {"count": 0, "sum": 0.0, "mean": None, "min": None,
+                "max": None}
+    count, total = int(count), float(total)
+    return {"count": count, "sum": total, "mean": total / count,
+            "min": float(low), "max": float(high)}
+
+
+def summarize(column):
+    """
+    Computes the count, sum, mean, min and max of a column.
+
+    Args:
+        column (sequence): Floats, NaN for missing values.
+
+    Returns:
+        dict: The aggregates; mean, min and max are None when no value
+        is present.
+    """
+    if numpy is not None:
+        values = _view(column)
+        values = values[~numpy.isnan(values)]
+        if not len(values):
+            return summary(0, 0, None, None)
+        return summary(len(values), values.sum(), values.min(),
+                       values.max())
+    values = _numbers(column)
+    if not values:
+        return summary(0, 0, None, None)
+    return summary(len(values), math.fsum(values), min(values),
+                   max(values))
+
+
+def summarize_groups(column, codes, labels):
+    """
+    Computes the aggregates of summarize() for each group of rows.
+
+    Args:
+        column (sequence): Floats, NaN for missing values.
+        codes (sequence): The group code of each row, -1 for none.
+        labels (list): The value each code stands for.
+
+    Returns:
+        dict: Maps the value of each group with at least one number to
+        its aggregates.
+    """
+    if numpy is not None:
+        values = _view(column)
+        groups = numpy.asarray(codes, dtype=numpy.int64)
+        keep = ~numpy.isnan(values) & (groups >= 0)
+        values, groups = values[keep], groups[keep]
+        size = len(labels)
+        counts = numpy.bincount(groups, minlength=size)
+        totals = numpy.bincount(groups, weights=values, minlength=size)
+        lows = numpy.full(size, numpy.inf)
+        numpy.minimum.at(lows, groups, values)
+        highs = numpy.full(size, -numpy.inf)
+        numpy.maximum.at(highs, groups, values)
+        return {labels[code]: summary(counts[code], totals[code],
+                                      lows[code], highs[code])
+                for code in numpy.flatnonzero(counts)}
+    grouped = {}
+    for value, code in zip(column, codes):
+        if code >= 0 and value == value:
+            grouped.setdefault(code, []).append(value)
+    return {labels[code]: summary(len(values), math.fsum(values),
+                                  min(values), max(values))
+            for code, values in sorted(grouped.items())}
+
+
+def percentiles(column, percents):
+    """
+    Computes percentiles of a column, interpolating linearly between
+    the closest values as numpy.percentile() does by default.
+
+    Args:
+        column (sequence): Floats, NaN for missing values.
+        percents (iterable): The percentiles to compute, from 0 to 100.
+
+    Returns:
+        list: The percentiles, or Nones when no value is present.
+    """
+    percents = list(percents)
+    if numpy is not None:
+        values = _view(column)
+        values = values[~numpy.isnan(values)]
+        if not len(values):
+            return [None] * len(percents)
+        return [float(value) for value in numpy.percentile(values,
+                                                           percents)]
+    values = sorted(_numbers(column))
+    if not values:
+        return [None] * len(percents)
+    result = []
+    for percent in percents:
+        position = (len(values) - 1) * percent / 100
+        low = math.floor(position)
+        high = min(low + 1, len(values) - 1)
+        result.append(values[low] +
+                      (values[high] - values[low]) * (position - low))
+    return result
+
+
+def histogram(column, bins=10):
+    """
+    Counts the values of a column in equal-width bins, as
+    numpy.histogram() does: each bin holds its lower edge, and the last
+    one its upper edge as well.
+
+    Args:
+        column (sequence): Floats, NaN for missing values.
+        bins (int): The number of bins.
+
+    Returns:
+        tuple: The list of counts and the list of the bins + 1 edges,
+        both empty when no value is present.
+    """
+    if numpy is not None:
+        values = _view(column)
+        values = values[~numpy.isnan(values)]
+        if not len(values):
+            return [], []
+        counts, edges = numpy.histogram(values, bins)
+        return [int(count) for count in counts], \
+            [float(edge) for edge in edges]
+    values = _numbers(column)
+    if not values:
+        return [], []
+    low, high = min(values), max(values)
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    edges = [low + width * i for i in range(bins)] + [high]
+    counts = [0] * bins
+    for value in values:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return counts, edges
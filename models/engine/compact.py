@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+
+"""
+Compact representation of the model instances.
+
+A regular instance keeps its attributes in a __dict__, which costs a
+few hundred bytes per object on top of the values. compact_class()
+derives from a model class a twin with the same name that stores the
+attributes declared in the registry in __slots__, and the other ones
+(those do_update adds) in a dictionary only created for the objects
+that have some. The twins behave as their model class: isinstance()
+holds, storage keys, to_dict() and __str__ are the same. To list the
+attributes in the order a __dict__ would, each instance refers to the
+tuple of its attribute names in assignment order; the instances read
+from the same file share a few such tuples.
+
+FileStorage builds twins instead of the model classes in compact mode.
+"""
+
+import types
+
+import models
+from models.base_model import parse_datetime
+from models.engine import registry
+
+_twins = {}
+_orders = {}
+
+
+def _order(names):
+    """
+    Returns the shared tuple equal to names, so that the instances whose
+    attributes were assigned in the same order hold one tuple.
+    """
+    return _orders.setdefault(names, names)
+
+
+class CompactModel:
+    """
+    Base class of the compact twins of the model classes.
+
+    Attributes:
+        _fields (tuple): The attributes stored in slots, in the order
+        to_dict() lists them.
+        _field_set (frozenset): The same attributes, for lookups.
+        _defaults (dict): The class-level defaults of the declared
+        attributes, returned while the slot is unset.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _field_set = frozenset()
+    _defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes an instance, as BaseModel.__init__ does.
+
+        Args:
+            *args: Tuple of arguments
+            **kwargs: Dictionary of key-value arguments.
+        """
+        if not kwargs:
+            super().__init__(*args)
+            object.__setattr__(self, "_order",
+                               _order(("id", "created_at", "updated_at")))
+            return
+        object.__setattr__(self, "_order", _order(tuple(kwargs)))
+        for key, value in kwargs.items():
+            if key == "created_at" or key == "updated_at":
+                value = parse_datetime(value)
+            elif key == "__class__":
+                # BaseModel keeps it in __dict__; only whether it was
+                # there matters to __str__.
+                key, value = "_class_key", True
+            self.__store(key, value)
+
+    def __order(self):
+        """
+        Returns the names of the attributes in assignment order.
+        """
+        try:
+            return object.__getattribute__(self, "_order")
+        except AttributeError:
+            return ()
+
+    def __put(self, name, value):
+        """
+        Stores an attribute, recording its name if it is a new one.
+        """
+        order = self.__order()
+        if name not in order:
+            object.__setattr__(self, "_order", _order(order + (name,)))
+        self.__store(name, value)
+
+    def __store(self, name, value):
+        """
+        Stores an attribute in its slot or in the extra attributes.
+        """
+        if name in self._field_set or name == "_class_key":
+            object.__setattr__(self, name, value)
+            return
+        try:
+            extra = object.__getattribute__(self, "_extra")
+        except AttributeError:
+            extra = {}
+            object.__setattr__(self, "_extra", extra)
+        extra[name] = value
+
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute and reports the change to storage.
+
+        Args:
+            name (str): The name of the attribute.
+            value: The new value.
+        """
+        if name in registry.references(self.__class__.__name__):
+            value = registry.intern_value(value)
+        self.__put(name, value)
+        object.__setattr__(self, "_BaseModel__serialized", None)
+        models.storage.touch(self, name)
+
+    def __getattr__(self, name):
+        """
+        Returns an extra attribute, or the default of a declared
+        attribute that was never set.
+        """
+        if name != "_extra":
+            try:
+                return self._extra[name]
+            except (AttributeError, KeyError):
+                pass
+            if name in self._defaults:
+                return self._defaults[name]
+        raise AttributeError("{!r} object has no attribute {!r}".format(
+            type(self).__name__, name))
+
+    def __delattr__(self, name):
+        """
+        Deletes an attribute.
+        """
+        if name in self._field_set:
+            object.__delattr__(self, name)
+        else:
+            try:
+                del self._extra[name]
+            except (AttributeError, KeyError):
+                raise AttributeError(name) from None
+        object.__setattr__(self, "_order", _order(tuple(
+            key for key in self.__order() if key != name)))
+        object.__setattr__(self, "_BaseModel__serialized", None)
+        models.storage.touch(self, name)
+
+    def __attributes(self):
+        """
+        Returns the attributes of the instance, in the order the
+        __dict__ of a regular instance would hold them.
+        """
+        try:
+            extra = object.__getattribute__(self, "_extra")
+        except AttributeError:
+            extra = {}
+        attributes = {}
+        # Attributes set behind __setattr__'s back, such as by
+        # BaseModel.build(), come after the recorded ones.
+        for name in self.__order() + self._fields + ("__class__",) + \
+                tuple(extra):
+            if name in attributes:
+                continue
+            if name == "__class__":
+                try:
+                    object.__getattribute__(self, "_class_key")
+                    attributes[name] = type(self).__name__
+                except AttributeError:
+                    pass
+            elif name in self._field_set:
+                try:
+                    attributes[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+            elif name in extra:
+                attributes[name] = extra[name]
+        return attributes
+
+    def __str__(self):
+        """
+        Retrieves an informal string representation of the object.
+
+        Return:
+        A string in the format: "[class name] (id) {attribute dictionary}"
+        """
+        return "[{}] ({}) {}".format(type(self).__name__, self.id,
+                                     self.__attributes())
+
+    def _serialize(self):
+        """
+        Builds the dictionary to_dict() returns.
+        """
+        obj_dict = self.__attributes()
+        obj_dict["__class__"] = type(self).__name__
+        obj_dict["created_at"] = self.created_at.isoformat()
+        obj_dict["updated_at"] = self.updated_at.isoformat()
+        return obj_dict
+
+
+def compact_class(cls):
+    """
+    Returns the compact twin of a model class, creating it on first use.
+
+    Args:
+        cls (type): A registered model class.
+
+    Returns:
+        type: A subclass of cls and CompactModel named after cls.
+    """
+    twin = _twins.get(cls)
+    if twin is not None:
+        return twin
+    attributes = registry.attributes()
+    fields = []
+    for base in reversed(cls.__mro__):
+        for name in attributes.get(base.__name__, {}):
+            if name not in fields:
+                fields.append(name)
+    namespace = {
+        "__slots__": tuple(fields) + ("_class_key", "_extra", "_order"),
+        "__doc__": cls.__doc__,
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "_fields": tuple(fields),
+        "_field_set": frozenset(fields),
+        "_defaults": {name: getattr(cls, name) for name in fields
+                      if hasattr(cls, name)}
+    }
+    twin = _twins[cls] = types.new_class(
+        cls.__name__, (CompactModel, cls), {"register": False},
+        lambda body: body.update(namespace)
+    )
+    return twin
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+"""
+Background compaction of the FileStorage write-ahead log.
+
+Compaction seals the current log, folds the sealed records into a new
+JSON snapshot on a worker thread, atomically swaps the snapshot in and
+then drops the sealed segment. Saves keep appending to a fresh log the
+whole time, so callers of FileStorage.new() and save() never wait for it.
+"""
+
+import os
+import threading
+import time
+
+from models.engine.atomic import write_atomic
+from models.engine.serializers import JSONSerializer
+
+
+class Compactor:
+    """
+    Folds a Journal into its JSON snapshot once the log is large enough.
+
+    Attributes:
+        journal (Journal): The log to compact.
+        snapshot_path (str): The JSON snapshot the log is folded into.
+        max_bytes (int): The log size, in bytes, that triggers compaction.
+        max_records (int): The number of records that triggers compaction.
+        stats (dict): Counters describing the compactions run so far.
+    """
+
+    def __init__(self, journal, snapshot_path, max_bytes=4 * 1024 * 1024,
+                 max_records=10000):
+        """
+        Initializes a compactor.
+
+        Args:
+            journal (Journal): The log to compact.
+            snapshot_path (str): The JSON snapshot the log is folded into.
+            max_bytes (int): The log size that triggers compaction.
+            max_records (int): The record count that triggers compaction.
+        """
+        self.journal = journal
+        self.snapshot_path = snapshot_path
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.stats = {
+            "compactions": 0,
+            "last_duration": 0.0,
+            "total_duration": 0.0,
+            "last_bytes_reclaimed": 0,
+            "total_bytes_reclaimed": 0
+        }
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def needed(self):
+        """
+        Tells whether the log has crossed one of the thresholds.
+
+        Returns:
+            bool: True if a compaction should run.
+        """
+        return (self.journal.record_count >= self.max_records or
+                self.journal.size() >= self.max_bytes)
+
+    def maybe_compact(self):
+        """
+        Starts a background compaction if the log has crossed one of the
+        thresholds and none is running yet.
+        """
+        if self.needed():
+            self.start()
+
+    def start(self):
+        """
+        Starts a background compaction unless one is already running.
+
+        Returns:
+            threading.Thread: The worker thread.
+        """
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(
+                    target=self.compact, name="hbnb-compactor", daemon=True
+                )
+                self.__thread.start()
+            return self.__thread
+
+    def wait(self):
+        """
+        Blocks until the running compaction, if any, is over.
+        """
+        thread = self.__thread
+        if thread is not None:
+            thread.join()
+
+    def compact(self):
+        """
+        Folds the log into a new snapshot and swaps it in.
+
+        The old snapshot is read one object at a time, with the sealed
+        records applied to each, and the new one is written with the
+        durability of the journal.
+
+        Returns:
+            bool: True if a compaction took place.
+        """
+        if not self.journal.seal():
+            return False
+        start = time.perf_counter()
+        bytes_before = self.__file_size(self.snapshot_path) + \
+            self.__file_size(self.journal.sealed_path)
+
+        changes, count = self.journal.fold(
+            self.journal.records(sealed_only=True)
+        )
+        serializer = JSONSerializer()
+        parts = []
+        if os.path.isfile(self.snapshot_path):
+            for key, value in serializer.read(self.snapshot_path):
+                if key in changes:
+                    value = self.journal.merge(value, changes.pop(key))
+                    if value is None:
+                        continue
+                parts.append(serializer.encode(key, value))
+        for key, change in changes.items():
+            if change is not None:
+                parts.append(serializer.encode(key, change[1]))
+
+        write_atomic(self.snapshot_path, serializer.join(parts),
+                     self.journal.durability)
+        self.journal.drop_sealed(count)
+
+        duration = time.perf_counter() - start
+        reclaimed = bytes_before - self.__file_size(self.snapshot_path)
+        self.stats["compactions"] += 1
+        self.stats["last_duration"] = duration
+        self.stats["total_duration"] += duration
+        self.stats["last_bytes_reclaimed"] = reclaimed
+        self.stats["total_bytes_reclaimed"] += reclaimed
+        return True
+
+    @staticmethod
+    def __file_size(path):
+        """
+        Returns the size of path in bytes, or 0 if it does not exist.
+        """
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
@@ -0,0 +1,806 @@
+#!/usr/bin/python3
+
+"""
+SQLite storage engine, a drop-in replacement for FileStorage.
+
+Every class gets its own table, with one column per attribute declared
+in FileStorage.attributes() and a JSON column for the others, and the
+foreign keys and numeric attributes are indexed. Queries such as get(),
+count(), lookup() and range() run in SQL, so they only build the
+instances they return instead of going through every stored object.
+"""
+
+import json
+import sqlite3
+import weakref
+from array import array
+from contextlib import contextmanager
+
+from models.engine import columns, registry
+from models.engine.columns import ColumnIndex
+from models.engine.file_storage import FileStorage
+from models.engine.indexes import KM_PER_DEGREE, TextIndex, haversine, \
+    parse_query, within_bounds
+
+_COLUMN_TYPES = {int: "INTEGER", float: "REAL"}
+_EXTRA = "_extra"
+
+
+class DBStorage:
+    """
+    Stores objects in a SQLite database, with the interface of
+    FileStorage.
+
+    Objects created, changed (reported through touch()) or deleted are
+    written to the database before the next query, inside a transaction
+    that save() commits. An identity map hands out the same instance for
+    a row as long as it is referenced, so that changes made to it are
+    seen by the next save().
+
+    Attributes:
+        db_path (str): The SQLite database file.
+    """
+
+    def __init__(self, db_path="hbnb.db"):
+        """
+        Initializes a DBStorage instance. The database is opened, and its
+        tables created, on first use.
+
+        Args:
+            db_path (str): The SQLite database file.
+        """
+        self.db_path = db_path
+        self.read_only = False
+        self.__conn = None
+        self.__columns = {}
+        self.__identity = weakref.WeakValueDictionary()
+        self.__dirty = {}
+        self.__batch_depth = 0
+
+    def classes(self):
+        """
+        Returns the classes FileStorage stores, keyed by name.
+        """
+        return FileStorage.classes(self)
+
+    def attributes(self):
+        """
+        Returns the attributes FileStorage declares for each class.
+        """
+        return FileStorage.attributes(self)
+
+    def __connection(self):
+        """
+        Returns the connection to the database, opening it and creating
+        the tables and indexes the first time.
+        """
+        if self.__conn is None:
+            self.__conn = sqlite3.connect(self.db_path)
+            if self.db_path != ":memory:":
+                self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__create_tables()
+        return self.__conn
+
+    def __create_tables(self):
+        """
+        Creates a table per class, adding the columns declared since the
+        table was created, and indexes the foreign keys and the numeric
+        and spatial attributes.
+        """
+        attributes = self.attributes()
+        base = attributes["BaseModel"]
+        indexed = {}
+        for declared in (FileStorage.indexed_attributes(self),
+                         FileStorage.sorted_attributes(self)):
+            for class_name, names in declared.items():
+                indexed.setdefault(class_name, []).extend(names)
+        for class_name, names in FileStorage.spatial_attributes(self).items():
+            indexed.setdefault(class_name, []).extend(names)
+
+        for class_name in self.classes():
+            columns = dict(base)
+            columns.update(attributes.get(class_name, {}))
+            self.__conn.execute(
+                'CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY)'.format(
+                    class_name)
+            )
+            existing = {row[1] for row in self.__conn.execute(
+                'PRAGMA table_info("{}")'.format(class_name))}
+            for name, kind in list(columns.items()) + [(_EXTRA, dict)]:
+                if name not in existing:
+                    self.__conn.execute(
+                        'ALTER TABLE "{}" ADD COLUMN "{}" {}'.format(
+                            class_name, name,
+                            _COLUMN_TYPES.get(kind, "TEXT"))
+                    )
+            self.__columns[class_name] = columns
+            for name in indexed.get(class_name, []):
+                self.__create_index(class_name, name)
+        self.__conn.commit()
+
+    def __create_index(self, class_name, attribute):
+        """
+        Creates an index on a column unless it exists.
+        """
+        self.__connection().execute(
+            'CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" ("{1}")'.format(
+                class_name, attribute)
+        )
+
+    @staticmethod
+    def __class_name(cls):
+        """
+        Returns the name of cls, which may already be a class name.
+        """
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __row(self, obj):
+        """
+        Returns the column values of obj, in table order.
+
+        A declared attribute that was never set is stored as NULL: the
+        queries read it as its class default, as FileStorage does.
+        """
+        data = obj.to_dict()
+        del data["__class__"]
+        columns = self.__columns[obj.__class__.__name__]
+        row = [data.pop("id")]
+        for name, kind in columns.items():
+            if name == "id":
+                continue
+            value = data.pop(name, None)
+            if kind is list and value is not None:
+                value = json.dumps(value)
+            row.append(value)
+        row.append(json.dumps(data) if data else None)
+        return row
+
+    def __materialize(self, class_name, rows):
+        """
+        Returns the instances of rows, reusing the instances handed out
+        before.
+
+        Args:
+            class_name (str): The class of the rows.
+            rows (iterable): Rows selected with __select().
+
+        Returns:
+            dict: The instances, keyed by storage key.
+        """
+        cls = self.classes()[class_name]
+        names = self.__names(class_name)[1:-1]
+        lists = {name for name, kind in self.__columns[class_name].items()
+                 if kind is list}
+        objects = {}
+        for row in rows:
+            key = "{}.{}".format(class_name, row[0])
+            obj = self.__identity.get(key)
+            if obj is None:
+                kwargs = {"id": row[0]}
+                for name, value in zip(names, row[1:-1]):
+                    if value is not None:
+                        kwargs[name] = json.loads(value) \
+                            if name in lists else value
+                if row[-1] is not None:
+                    kwargs.update(json.loads(row[-1]))
+                registry.intern_references(class_name, kwargs)
+                obj = self.__identity[key] = cls(**kwargs)
+            objects[key] = obj
+        return objects
+
+    def __names(self, class_name, quoted=False):
+        """
+        Returns the columns of class_name in row order: id, the declared
+        attributes and the JSON column of the others.
+        """
+        names = ["id"] + [name for name in self.__columns[class_name]
+                          if name != "id"] + [_EXTRA]
+        if quoted:
+            return ", ".join('"{}"'.format(name) for name in names)
+        return names
+
+    def __default(self, class_name, attribute):
+        """
+        Returns the class default of a declared attribute, which the
+        rows that never set it hold as NULL, or None without one.
+        """
+        default = getattr(self.classes()[class_name], attribute, None)
+        if isinstance(default, bool) or \
+                not isinstance(default, (int, float, str)):
+            return None
+        return default
+
+    def __value(self, class_name, attribute):
+        """
+        Returns the SQL expression of a declared attribute, reading NULL
+        as its class default.
+        """
+        default = self.__default(class_name, attribute)
+        if default is None:
+            return '"{}"'.format(attribute)
+        if isinstance(default, str):
+            default = "'{}'".format(default.replace("'", "''"))
+        return 'COALESCE("{}", {})'.format(attribute, default)
+
+    def __select(self, class_name, where="", params=()):
+        """
+        Runs a SELECT of whole rows of class_name and returns their
+        instances.
+        """
+        rows = self.__query('SELECT {} FROM "{}" {}'.format(
+            self.__names(class_name, True), class_name, where), params)
+        return self.__materialize(class_name, rows)
+
+    def __query(self, sql, params=()):
+        """
+        Writes the pending changes, then runs a query.
+        """
+        self.__sync()
+        return self.__connection().execute(sql, params)
+
+    def __sync(self):
+        """
+        Writes the objects created, changed or deleted since the last
+        call to the database, in the open transaction.
+        """
+        if not self.__dirty:
+            return
+        conn = self.__connection()
+        dirty, self.__dirty = self.__dirty, {}
+        for key, obj in dirty.items():
+            class_name, obj_id = key.split(".", 1)
+            if obj is None:
+                conn.execute('DELETE FROM "{}" WHERE id = ?'.format(
+                    class_name), (obj_id,))
+            else:
+                row = self.__row(obj)
+                conn.execute(
+                    'INSERT OR REPLACE INTO "{}" ({}) VALUES ({})'.format(
+                        class_name, self.__names(class_name, True),
+                        ", ".join("?" * len(row))), row)
+
+    def __classes_of(self, cls):
+        """
+        Returns the names of the tables a query on cls reads.
+        """
+        if cls is None:
+            return list(self.classes())
+        self.__connection()
+        class_name = self.__class_name(cls)
+        return [class_name] if class_name in self.__columns else []
+
+    def all(self, cls=None):
+        """
+        Returns the stored objects.
+
+        Args:
+            cls (type or str): If given, only the objects of this class
+            are returned.
+
+        Returns:
+            dict: The objects, keyed by storage key.
+        """
+        objects = {}
+        for class_name in self.__classes_of(cls):
+            objects.update(self.__select(class_name))
+        return objects
+
+    def get(self, cls, id):
+        """
+        Retrieves one object.
+
+        Args:
+            cls (type or str): The class of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it does not exist.
+        """
+        key = "{}.{}".format(self.__class_name(cls), id)
+        obj = self.__identity.get(key)
+        if obj is not None:
+            return obj
+        for class_name in self.__classes_of(cls):
+            return self.__select(class_name, "WHERE id = ?",
+                                 (id,)).get(key)
+        return None
+
+    def count(self, cls=None):
+        """
+        Counts the objects in storage.
+
+        Args:
+            cls (type or str): If given, only the objects of this class
+            are counted.
+
+        Returns:
+            int: The number of objects.
+        """
+        return sum(
+            self.__query('SELECT COUNT(*) FROM "{}"'.format(
+                class_name)).fetchone()[0]
+            for class_name in self.__classes_of(cls)
+        )
+
+    def add_index(self, cls, attribute, kind="hash"):
+        """
+        Declares a secondary index on an attribute of a class.
+
+        "hash" and "sorted" indexes become SQL indexes on the column of
+        the attribute; "inverted" and "text" are accepted for
+        compatibility with FileStorage and have no effect.
+
+        Args:
+            cls (type or str): The class of the indexed objects.
+            attribute (str): The attribute to index.
+            kind (str): "hash", "sorted", "inverted" or "text".
+        """
+        if kind not in ("hash", "sorted", "inverted", "text"):
+            raise ValueError("unknown index kind: {}".format(kind))
+        self.__connection()
+        class_name = self.__class_name(cls)
+        if kind in ("hash", "sorted") and \
+                attribute in self.__columns.get(class_name, {}):
+            self.__create_index(class_name, attribute)
+
+    def lookup(self, cls, attribute, value):
+        """
+        Retrieves the objects of a class whose attribute equals value.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The attribute to compare.
+            value: The value to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        for class_name in self.__classes_of(cls):
+            if self.__columns[class_name].get(attribute, list) is list:
+                return {key: obj for key, obj in
+                        self.all(class_name).items()
+                        if getattr(obj, attribute, None) == value}
+            where = 'WHERE "{}" = ?'.format(attribute)
+            if value == self.__default(class_name, attribute):
+                where += ' OR "{}" IS NULL'.format(attribute)
+            return self.__select(class_name, where, (value,))
+        return {}
+
+    def range(self, cls, **bounds):
+        """
+        Retrieves the objects of a class whose numeric attributes fall
+        within inclusive bounds, e.g. range(Place, price_by_night=(None,
+        99), max_guest=(4, None)).
+
+        The bounds on declared numeric attributes are checked in SQL and
+        the others on the selected objects.
+
+        Args:
+            cls (type or str): The class of the objects.
+            **bounds: Maps attribute names to (low, high) pairs, where
+            None leaves that side open.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        for class_name in self.__classes_of(cls):
+            columns = self.__columns[class_name]
+            conditions = []
+            params = []
+            others = {}
+            for attribute, (low, high) in bounds.items():
+                if columns.get(attribute) not in (int, float):
+                    others[attribute] = (low, high)
+                    continue
+                condition = [
+                    "typeof(\"{}\") IN ('integer', 'real')".format(attribute)
+                ]
+                for bound, operator in ((low, ">="), (high, "<=")):
+                    if bound is not None:
+                        condition.append('"{}" {} ?'.format(
+                            attribute, operator))
+                        params.append(bound)
+                condition = " AND ".join(condition)
+                if within_bounds(self.classes()[class_name],
+                                 {attribute: (low, high)}):
+                    condition = '({} OR "{}" IS NULL)'.format(
+                        condition, attribute)
+                conditions.append(condition)
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            return {key: obj for key, obj in
+                    self.__select(class_name, where, params).items()
+                    if within_bounds(obj, others)}
+        return {}
+
+    def contains(self, cls, attribute, values, match="all"):
+        """
+        Retrieves the objects of a class whose list attribute holds all
+        (or any) of values.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The list attribute to search.
+            values (iterable): The elements to look for.
+            match (str): "all" or "any".
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'")
+        values = list(values)
+        for class_name in self.__classes_of(cls):
+            if self.__columns[class_name].get(attribute) is not list or \
+                    not values:
+                return {}
+            member = ("EXISTS (SELECT 1 FROM json_each(\"{}\") "
+                      "WHERE value = ?)").format(attribute)
+            where = "WHERE json_type(\"{}\") = 'array' AND ({})".format(
+                attribute,
+                (" AND " if match == "all" else " OR ").join(
+                    [member] * len(values)))
+            return self.__select(class_name, where, values)
+        return {}
+
+    def search(self, query, cls=None, limit=None):
+        """
+        Retrieves the objects whose text attributes, as declared in
+        FileStorage.text_attributes(), match every word and every
+        double-quoted phrase of query, best match first.
+
+        The text is ranked in Python, with the same BM25 scoring as
+        FileStorage, over the objects of the searched classes.
+
+        Args:
+            query (str): The words and "phrases" to look for.
+            cls (type or str): If given, only this class is searched.
+            limit (int): The maximum number of objects to retrieve.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        phrases = parse_query(query)
+        class_name = None if cls is None else self.__class_name(cls)
+        scores = {}
+        objects = {}
+        for name, attributes in FileStorage.text_attributes(self).items():
+            if class_name not in (None, name):
+                continue
+            candidates = self.all(name)
+            for attribute in attributes:
+                index = TextIndex(name, attribute)
+                index.rebuild(candidates)
+                for key, score in index.score(phrases).items():
+                    scores[key] = scores.get(key, 0.0) + score
+                    objects[key] = candidates[key]
+        ranked = sorted(scores, key=lambda key: (-scores[key], key))
+        return {key: objects[key] for key in ranked[:limit]}
+
+    def __points(self, class_name, min_lat=-90, max_lat=90):
+        """
+        Returns the (id, latitude, longitude) rows of class_name whose
+        latitude lies within bounds.
+        """
+        lat, lng = FileStorage.spatial_attributes(self).get(
+            class_name, ("latitude", "longitude"))
+        columns = self.__columns[class_name]
+        if columns.get(lat) is not float or columns.get(lng) is not float:
+            return []
+        lat = self.__value(class_name, lat)
+        lng = self.__value(class_name, lng)
+        return self.__query(
+            "SELECT id, {0}, {1} FROM \"{2}\" WHERE {0} BETWEEN ? AND ? "
+            "AND typeof({1}) IN ('integer', 'real')".format(
+                lat, lng, class_name), (min_lat, max_lat)).fetchall()
+
+    def __by_distance(self, class_name, found):
+        """
+        Returns the objects of the (distance, id) pairs of found, in
+        that order.
+        """
+        found.sort()
+        ids = [obj_id for _, obj_id in found]
+        objects = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            objects.update(self.__select(
+                class_name, "WHERE id IN ({})".format(
+                    ", ".join("?" * len(chunk))), chunk))
+        return {key: objects[key] for key in
+                ("{}.{}".format(class_name, obj_id) for obj_id in ids)}
+
+    def aggregate(self, cls, attribute, by=None):
+        """
+        Computes the count, sum, mean, min and max of a numeric attribute
+        over the objects of a class, e.g. aggregate(Place,
+        "price_by_night", by="city_id") for the prices of each city.
+
+        Declared attributes are aggregated in SQL.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            by (str): If given, the attribute to group the objects by.
+
+        Returns:
+            dict: The aggregates, or a dictionary mapping each value of
+            by to the aggregates of its objects.
+        """
+        for class_name in self.__classes_of(cls):
+            declared = self.__columns[class_name]
+            if declared.get(attribute) not in (int, float) or \
+                    (by is not None and by not in declared):
+                index = ColumnIndex(class_name, [attribute],
+                                    [] if by is None else [by])
+                index.rebuild(self.all(class_name))
+                if by is None:
+                    return columns.summarize(index.columns[attribute])
+                return columns.summarize_groups(
+                    index.columns[attribute], index.groups[by],
+                    index.labels[by])
+            value = self.__value(class_name, attribute)
+            numbers = "typeof({}) IN ('integer', 'real')".format(value)
+            aggregates = "COUNT({0}), TOTAL({0}), MIN({0}), MAX({0})".format(
+                value)
+            if by is None:
+                return columns.summary(*self.__query(
+                    'SELECT {} FROM "{}" WHERE {}'.format(
+                        aggregates, class_name, numbers)).fetchone())
+            by = self.__value(class_name, by)
+            return {row[0]: columns.summary(*row[1:]) for row in
+                    self.__query(
+                        'SELECT {0}, {1} FROM "{2}" WHERE {3} AND {0} '
+                        'IS NOT NULL GROUP BY {0}'.format(
+                            by, aggregates, class_name, numbers))}
+        return columns.summarize([])
+
+    def percentiles(self, cls, attribute, percents):
+        """
+        Computes percentiles of a numeric attribute over the objects of a
+        class, e.g. percentiles(Place, "price_by_night", [50, 90, 99]).
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            percents (iterable): The percentiles, from 0 to 100.
+
+        Returns:
+            list: The percentiles, or Nones without any value.
+        """
+        return columns.percentiles(self.__column(cls, attribute), percents)
+
+    def histogram(self, cls, attribute, bins=10):
+        """
+        Counts the values of a numeric attribute over the objects of a
+        class in equal-width bins.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            bins (int): The number of bins.
+
+        Returns:
+            tuple: The counts and the bins + 1 edges.
+        """
+        return columns.histogram(self.__column(cls, attribute), bins)
+
+    def __column(self, cls, attribute):
+        """
+        Returns the numeric values of an attribute over the objects of a
+        class, as an array("d"), read in SQL for declared attributes.
+        """
+        for class_name in self.__classes_of(cls):
+            if self.__columns[class_name].get(attribute) in (int, float):
+                value = self.__value(class_name, attribute)
+                return array("d", (row[0] for row in self.__query(
+                    "SELECT {0} FROM \"{1}\" WHERE typeof({0}) IN "
+                    "('integer', 'real')".format(value, class_name))))
+            index = ColumnIndex(class_name, [attribute])
+            index.rebuild(self.all(class_name))
+            return index.columns[attribute]
+        return array("d")
+
+    def within(self, cls, min_lat, min_lng, max_lat, max_lng):
+        """
+        Retrieves the objects of a class inside a bounding box.
+
+        Args:
+            cls (type or str): The class of the objects.
+            min_lat (float): The southern edge, in degrees.
+            min_lng (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lng (float): The eastern edge, in degrees. A box with
+            min_lng greater than max_lng crosses the antimeridian.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        for class_name in self.__classes_of(cls):
+            found = []
+            for obj_id, _, lng in self.__points(class_name, min_lat,
+                                                max_lat):
+                if min_lng <= max_lng:
+                    inside = min_lng <= lng <= max_lng
+                else:
+                    inside = lng >= min_lng or lng <= max_lng
+                if inside:
+                    found.append((0, obj_id))
+            return self.__by_distance(class_name, found)
+        return {}
+
+    def near(self, cls, lat, lng, km):
+        """
+        Retrieves the objects of a class within km of a point, nearest
+        first.
+
+        Args:
+            cls (type or str): The class of the objects.
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            km (float): The radius, in kilometres.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        for class_name in self.__classes_of(cls):
+            d_lat = km / KM_PER_DEGREE
+            found = []
+            for obj_id, p_lat, p_lng in self.__points(
+                    class_name, lat - d_lat, lat + d_lat):
+                distance = haversine(lat, lng, p_lat, p_lng)
+                if distance <= km:
+                    found.append((distance, obj_id))
+            return self.__by_distance(class_name, found)
+        return {}
+
+    def nearest(self, cls, lat, lng, k):
+        """
+        Retrieves the k objects of a class nearest to a point, nearest
+        first.
+
+        The band of latitudes searched doubles until it holds k objects
+        closer than its half-width, which nothing outside of it can be.
+
+        Args:
+            cls (type or str): The class of the objects.
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            k (int): The number of objects to retrieve.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        if k <= 0:
+            return {}
+        for class_name in self.__classes_of(cls):
+            km = 50.0
+            while True:
+                d_lat = km / KM_PER_DEGREE
+                found = sorted(
+                    (haversine(lat, lng, p_lat, p_lng), obj_id)
+                    for obj_id, p_lat, p_lng in self.__points(
+                        class_name, lat - d_lat, lat + d_lat)
+                )
+                if (len(found) >= k and found[k - 1][0] <= km) or \
+                        d_lat >= 180:
+                    return self.__by_distance(class_name, found[:k])
+                km *= 2
+        return {}
+
+    def new(self, obj):
+        """
+        Adds obj to the database on the next query or save().
+
+        Args:
+            obj (BaseModel): The object to store.
+        """
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.__identity[key] = obj
+            self.__dirty[key] = obj
+
+    def new_many(self, cls, rows):
+        """
+        Creates an object of cls for each row of attributes, to be
+        inserted on the next query or save(), as new() would one by one.
+
+        Args:
+            cls (type or str): The class of the objects.
+            rows (iterable): A dictionary of attributes for each object.
+
+        Returns:
+            list: The new objects, in the order of rows.
+        """
+        class_name = self.__class_name(cls)
+        cls = self.classes()[class_name]
+        prefix = class_name + "."
+        created = [cls.build(row) for row in rows]
+        for obj in created:
+            key = prefix + obj.id
+            self.__identity[key] = obj
+            self.__dirty[key] = obj
+        return created
+
+    def touch(self, obj, name):
+        """
+        Records that an attribute of a stored object changed, so that the
+        next query or save() writes it. Called by BaseModel on every
+        attribute assignment; objects not handed out by this storage are
+        ignored.
+
+        Args:
+            obj (BaseModel): The changed object.
+            name (str): The name of the attribute that changed.
+        """
+        obj_id = getattr(obj, "id", None)
+        if obj_id is None:
+            return
+        key = obj.__class__.__name__ + "." + obj_id
+        if self.__identity.get(key) is obj:
+            self.__dirty[key] = obj
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from the database on the next query or save().
+
+        Args:
+            obj (BaseModel): The object to delete.
+        """
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.__identity.pop(key, None)
+            self.__dirty[key] = None
+
+    def save(self):
+        """
+        Writes the pending changes and commits them, unless inside
+        batch().
+        """
+        self.__sync()
+        if not self.__batch_depth:
+            self.__connection().commit()
+
+    def flush(self, wait=True):
+        """
+        Writes the pending changes and commits them.
+
+        Args:
+            wait (bool): Accepted for compatibility with FileStorage.
+        """
+        self.__sync()
+        self.__connection().commit()
+
+    @contextmanager
+    def batch(self):
+        """
+        Commits every save() made inside a with block once, when the
+        outermost block ends.
+        """
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.flush()
+
+    def close(self):
+        """
+        Closes the database. Changes that were not saved are dropped; the
+        database is opened again on the next use.
+        """
+        if self.__conn is not None:
+            self.__conn.close()
+            self.__conn = None
+        self.__dirty = {}
+
+    def reload(self):
+        """
+        Drops the changes that were not saved and the instances handed
+        out so far, so that the next queries read the database again.
+        """
+        if self.__conn is not None:
+            self.__conn.rollback()
+        self.__connection()
+        self.__dirty = {}
+        self.__identity = weakref.WeakValueDictionary()
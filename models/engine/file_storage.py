@@ -4,102 +4,1194 @@
 File storage class for storing objects in JSON format.
 """
 
-import datetime
+import atexit
 import os
 import json
+import threading
+import time
+from contextlib import contextmanager
+
+from models.engine import registry
+from models.engine.atomic import check_durability, write_atomic
+from models.engine import columns
+from models.engine.columns import ColumnIndex
+from models.engine.compact import compact_class
+from models.engine.compactor import Compactor
+from models.engine.flusher import Flusher
+from models.engine.indexes import ClassIndex, GridIndex, HashIndex, \
+    InvertedIndex, SortedIndex, TextIndex, parse_query, within_bounds
+from models.engine.journal import Journal
+from models.engine.serializers import FormatError, get_serializer, \
+    schema_fields
+from models.engine.snapshot import Snapshot, write_snapshot
 
 
 class FileStorage:
     """
     A class that serializes instances to a JSON file and deserializes JSON
     file to instances.
+
+    In journaled mode every save appends the pending mutations to a
+    write-ahead log (<file path>.log) instead of rewriting the JSON file,
+    and reload() replays that log on top of the JSON snapshot. Once the
+    log crosses compact_bytes or compact_records it is folded back into
+    the snapshot on a background thread.
+
+    In partitioned mode every class lives in its own file, read the first
+    time the class is accessed through all(), get(), count() or new().
+
+    The objects are also indexed by class name, so that all(cls) and
+    count(cls) do not scan __objects. The index follows the objects
+    stored and dropped through new(), delete() and reload(), and is
+    rebuilt whenever __objects is replaced as a whole. Secondary hash
+    indexes, declared in indexed_attributes() or with add_index(), are
+    maintained the same way and serve lookup(); sorted indexes, declared
+    in sorted_attributes(), serve range(), inverted indexes over the
+    list attributes in inverted_attributes() serve contains(), text
+    indexes over the attributes in text_attributes() serve search(), and
+    grid indexes over the coordinates in spatial_attributes() serve
+    within(), near() and nearest(), and column indexes over the numeric
+    attributes in column_attributes() serve aggregate(), percentiles()
+    and histogram().
+
+    With a commit window or count, save() only requests a write: the
+    saves requested within the window, or up to the count, are coalesced
+    into one flush(). batch() defers every save until the block ends.
+    In background mode the files are written by a worker thread, and
+    flush(wait=True) or close() wait for it. The objects in memory are
+    only changed under a lock, which the flush run by the timer of the
+    commit window holds as well.
+
+    In lazy mode reload() keeps the serialized objects and only builds
+    the instance of an object when it is first accessed, through get(),
+    or of a whole class when all(cls) or a query needs it.
+
+    In snapshot mode the storage reads a memory-mapped snapshot written
+    by write_snapshot() and cannot be saved: get() and count() read the
+    snapshot directly, and a class is only decoded as a whole the first
+    time another query needs it.
+
+    With compact_models, the objects read from the files are built as
+    the compact twins of their classes (see models.engine.compact),
+    which keep the declared attributes in __slots__.
     """
     __file_path = "file.json"
     __objects = {}
+    __pending = {}
+    __loaded = set()
+    __fragments = {}
+    __fragments_for = None
+    __fragments_format = None
+    __unbuilt = {}
+    __unbuilt_for = None
+    __class_index = ClassIndex()
+    __secondary = None
+    __spatial = {}
+    __columns = {}
+    __indexed = None
+    __lock = threading.RLock()
 
-    def all(self):
+    def __init__(self, file_path=None, journal=False,
+                 compact_bytes=4 * 1024 * 1024, compact_records=10000,
+                 partitioned=False, commit_window=None, commit_count=None,
+                 durability="fsync", background=False, max_queued=64,
+                 file_format="json", snapshot=None, lazy=False,
+                 compact_models=False):
+        """
+        Initializes a FileStorage instance.
+
+        Args:
+            file_path (str): The JSON file to use instead of "file.json".
+            journal (bool): Whether mutations are appended to a
+            write-ahead log rather than rewriting the JSON file.
+            compact_bytes (int): The log size that triggers a compaction.
+            compact_records (int): The log length that triggers a
+            compaction.
+            partitioned (bool): Whether each class is stored in its own
+            <class name>.json file, next to file_path, and only loaded
+            the first time that class is accessed.
+            commit_window (float): The seconds during which saves are
+            coalesced into one flush, which a timer runs once they have
+            elapsed.
+            commit_count (int): The number of saves coalesced into one
+            flush.
+            durability (str): How far a flush is pushed to disk before
+            it returns: "none", "flush" or "fsync". Files are always
+            replaced atomically, through a temporary file.
+            background (bool): Whether the files are written by a
+            background thread instead of the thread calling save().
+            max_queued (int): The number of queued writes past which
+            save() blocks until the background thread catches up.
+            file_format (str): The format of the files, "json" or
+            "binary". Without a file_path, a binary storage uses
+            "file.hbnb".
+            snapshot (str): The snapshot file to read in snapshot mode.
+            lazy (bool): Whether reload() defers building the instances
+            until they are accessed.
+            compact_models (bool): Whether the objects read from the
+            files are built as compact, slot-based instances.
+        """
+        if journal and partitioned:
+            raise ValueError("journal and partitioned modes are exclusive")
+        if snapshot is not None and (journal or partitioned):
+            raise ValueError("snapshot mode is read-only")
+        if lazy and (partitioned or snapshot is not None):
+            raise ValueError("partitioned and snapshot modes are already "
+                             "lazy")
+        self.serializer = get_serializer(
+            file_format, schema_fields(self.attributes())
+        )
+        if journal and file_format != "json":
+            raise ValueError("journaled mode only supports the json format")
+        check_durability(durability)
+        self.durability = durability
+        if file_path is not None:
+            self.__file_path = file_path
+        elif file_format != "json":
+            self.__file_path = "file" + self.serializer.extension
+        self.partitioned = partitioned
+        self.snapshot_path = snapshot
+        self.snapshot = None
+        self.read_only = snapshot is not None
+        self.lazy = lazy
+        self.compact_models = compact_models
+        self.stats = {"flushes": 0, "last_serialized": 0,
+                      "total_serialized": 0, "last_coalesced": 0,
+                      "materialized": 0}
+        self.commit_window = commit_window
+        self.commit_count = commit_count
+        self.__deferred = 0
+        self.__deferred_since = None
+        self.__window_timer = None
+        self.__batch_depth = 0
+        self.flusher = Flusher(max_queued) if background else None
+        if commit_window is not None or commit_count is not None or \
+                background:
+            atexit.register(self.close)
+        self.journal = None
+        self.compactor = None
+        if journal:
+            self.journal = Journal(self.__file_path + ".log", durability)
+            self.compactor = Compactor(
+                self.journal, self.__file_path,
+                max_bytes=compact_bytes, max_records=compact_records
+            )
+
+    def all(self, cls=None):
         """
         Returns the dictionary __objects.
+
+        Args:
+            cls (type or str): If given, only the objects of this class
+            are returned.
+        """
+        with FileStorage.__lock:
+            if cls is None:
+                if self.partitioned or self.snapshot is not None:
+                    for class_name in self.classes():
+                        self.__load(class_name)
+                for class_name in list(self.__unbuilt_records()):
+                    self.__load(class_name)
+                return FileStorage.__objects
+            class_name = self.__class_name(cls)
+            self.__load(class_name)
+            return self.__index().objects(class_name)
+
+    def get(self, cls, id):
         """
-        return FileStorage.__objects
+        Retrieves one object.
+
+        Args:
+            cls (type or str): The class of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it does not exist.
+        """
+        with FileStorage.__lock:
+            class_name = self.__class_name(cls)
+            key = "{}.{}".format(class_name, id)
+            if self.snapshot is not None and \
+                    class_name not in FileStorage.__loaded:
+                return self.__from_snapshot(class_name, key)
+            records = self.__unbuilt_records().get(class_name)
+            if records is not None:
+                value = records.pop(key, None)
+                if value is not None:
+                    self.__store(key, self.__build(value))
+            else:
+                self.__load(class_name)
+            return FileStorage.__objects.get(key)
+
+    def count(self, cls=None):
+        """
+        Counts the objects in storage.
+
+        Args:
+            cls (type or str): If given, only the objects of this class
+            are counted.
+
+        Returns:
+            int: The number of objects.
+        """
+        with FileStorage.__lock:
+            unbuilt = self.__unbuilt_records()
+            if cls is None:
+                if unbuilt:
+                    return len(FileStorage.__objects) + \
+                        sum(len(records) for records in unbuilt.values())
+                return len(self.all())
+            class_name = self.__class_name(cls)
+            if class_name in unbuilt:
+                return self.__index().count(class_name) + \
+                    len(unbuilt[class_name])
+            if self.snapshot is not None and \
+                    class_name not in FileStorage.__loaded and \
+                    not any(key.startswith(class_name + ".")
+                            for key in FileStorage.__pending):
+                return self.snapshot.count(class_name)
+            self.__load(class_name)
+            return self.__index().count(class_name)
+
+    def add_index(self, cls, attribute, kind="hash"):
+        """
+        Declares a secondary index on an attribute of a class.
+
+        Args:
+            cls (type or str): The class of the indexed objects.
+            attribute (str): The attribute to index.
+            kind (str): "hash" for equality lookups, "sorted" for
+            range queries over a numeric attribute, "inverted" for
+            membership queries over a list attribute or "text" for
+            full-text search over a text attribute.
+        """
+        index_types = {
+            "hash": HashIndex,
+            "sorted": SortedIndex,
+            "inverted": InvertedIndex,
+            "text": TextIndex
+        }
+        if kind not in index_types:
+            raise ValueError("unknown index kind: {}".format(kind))
+        class_name = self.__class_name(cls)
+        self.__index()
+        if (class_name, attribute) not in FileStorage.__secondary:
+            index = index_types[kind](class_name, attribute)
+            index.rebuild(FileStorage.__objects)
+            FileStorage.__secondary[(class_name, attribute)] = index
+
+    def lookup(self, cls, attribute, value):
+        """
+        Retrieves the objects of a class whose attribute equals value,
+        e.g. lookup(Review, "place_id", place.id) for the reviews of a
+        place.
+
+        Uses the secondary index on the attribute when there is one and
+        scans the objects of the class otherwise.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The attribute to compare.
+            value: The value to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        class_name = self.__class_name(cls)
+        self.__load(class_name)
+        self.__index()
+        index = FileStorage.__secondary.get((class_name, attribute))
+        if index is not None:
+            return index.lookup(value)
+        return {key: obj for key, obj in self.all(class_name).items()
+                if getattr(obj, attribute, None) == value}
+
+    def range(self, cls, **bounds):
+        """
+        Retrieves the objects of a class whose numeric attributes fall
+        within inclusive bounds, e.g. range(Place, price_by_night=(None,
+        99), max_guest=(4, None)).
+
+        The most selective sorted index among the bounded attributes
+        produces the candidates, which are then checked against the other
+        bounds. Without any sorted index the class is scanned.
+
+        Args:
+            cls (type or str): The class of the objects.
+            **bounds: Maps attribute names to (low, high) pairs, where
+            None leaves that side open.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        class_name = self.__class_name(cls)
+        self.__load(class_name)
+        self.__index()
+        best = None
+        for attribute, (low, high) in bounds.items():
+            index = FileStorage.__secondary.get((class_name, attribute))
+            if isinstance(index, SortedIndex):
+                count = index.count(low, high)
+                if best is None or count < best[0]:
+                    best = (count, index, low, high)
+        if best is None:
+            candidates = self.all(class_name)
+        else:
+            candidates = best[1].range(best[2], best[3])
+        return {key: obj for key, obj in candidates.items()
+                if within_bounds(obj, bounds)}
+
+    def contains(self, cls, attribute, values, match="all"):
+        """
+        Retrieves the objects of a class whose list attribute holds all
+        (or any) of values, e.g. contains(Place, "amenity_ids", [wifi.id,
+        tv.id]) for the places offering both amenities.
+
+        Uses the inverted index on the attribute when there is one and
+        scans the objects of the class otherwise.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The list attribute to search.
+            values (iterable): The elements to look for.
+            match (str): "all" or "any".
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'")
+        values = list(values)
+        class_name = self.__class_name(cls)
+        self.__load(class_name)
+        self.__index()
+        index = FileStorage.__secondary.get((class_name, attribute))
+        if not isinstance(index, InvertedIndex):
+            index = InvertedIndex(class_name, attribute)
+            index.rebuild(self.all(class_name))
+        if match == "all":
+            return index.all_of(values)
+        return index.any_of(values)
+
+    def search(self, query, cls=None, limit=None):
+        """
+        Retrieves the objects whose indexed text matches every word and
+        every double-quoted phrase of query, best match first.
+
+        Args:
+            query (str): The words and "phrases" to look for.
+            cls (type or str): If given, only this class is searched.
+            limit (int): The maximum number of objects to retrieve.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        phrases = parse_query(query)
+        class_name = None if cls is None else self.__class_name(cls)
+        if class_name is not None:
+            self.__load(class_name)
+        else:
+            self.all()
+        self.__index()
+        scores = {}
+        objects = {}
+        for index in FileStorage.__secondary.values():
+            if not isinstance(index, TextIndex) or \
+                    class_name not in (None, index.class_name):
+                continue
+            for key, score in index.score(phrases).items():
+                scores[key] = scores.get(key, 0.0) + score
+                objects[key] = index.objects[key]
+        ranked = sorted(scores, key=lambda key: (-scores[key], key))
+        return {key: objects[key] for key in ranked[:limit]}
+
+    def within(self, cls, min_lat, min_lng, max_lat, max_lng):
+        """
+        Retrieves the objects of a class inside a bounding box.
+
+        Args:
+            cls (type or str): The class of the objects.
+            min_lat (float): The southern edge, in degrees.
+            min_lng (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lng (float): The eastern edge, in degrees. A box with
+            min_lng greater than max_lng crosses the antimeridian.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        return self.__grid(cls).bbox(min_lat, min_lng, max_lat, max_lng)
+
+    def near(self, cls, lat, lng, km):
+        """
+        Retrieves the objects of a class within km of a point, nearest
+        first.
+
+        Args:
+            cls (type or str): The class of the objects.
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            km (float): The radius, in kilometres.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        return self.__grid(cls).radius(lat, lng, km)
+
+    def nearest(self, cls, lat, lng, k):
+        """
+        Retrieves the k objects of a class nearest to a point, nearest
+        first.
+
+        Args:
+            cls (type or str): The class of the objects.
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            k (int): The number of objects to retrieve.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        """
+        return self.__grid(cls).nearest(lat, lng, k)
+
+    def aggregate(self, cls, attribute, by=None):
+        """
+        Computes the count, sum, mean, min and max of a numeric attribute
+        over the objects of a class, e.g. aggregate(Place,
+        "price_by_night", by="city_id") for the prices of each city.
+
+        Objects whose value is not a number are ignored.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            by (str): If given, the attribute to group the objects by.
+
+        Returns:
+            dict: The aggregates, or a dictionary mapping each value of
+            by to the aggregates of its objects.
+        """
+        index = self.__columns_of(cls, attribute, by)
+        if by is None:
+            return columns.summarize(index.columns[attribute])
+        return columns.summarize_groups(index.columns[attribute],
+                                        index.groups[by], index.labels[by])
+
+    def percentiles(self, cls, attribute, percents):
+        """
+        Computes percentiles of a numeric attribute over the objects of a
+        class, e.g. percentiles(Place, "price_by_night", [50, 90, 99]).
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            percents (iterable): The percentiles, from 0 to 100.
+
+        Returns:
+            list: The percentiles, or Nones without any value.
+        """
+        index = self.__columns_of(cls, attribute)
+        return columns.percentiles(index.columns[attribute], percents)
+
+    def histogram(self, cls, attribute, bins=10):
+        """
+        Counts the values of a numeric attribute over the objects of a
+        class in equal-width bins.
+
+        Args:
+            cls (type or str): The class of the objects.
+            attribute (str): The numeric attribute.
+            bins (int): The number of bins.
+
+        Returns:
+            tuple: The counts and the bins + 1 edges.
+        """
+        index = self.__columns_of(cls, attribute)
+        return columns.histogram(index.columns[attribute], bins)
+
+    def __columns_of(self, cls, attribute, by=None):
+        """
+        Returns the column index of a class holding attribute (and by).
+        Without one declared in column_attributes(), a throwaway index
+        over the objects of the class is built.
+
+        The rows of the objects changed since the last flush are
+        refreshed first, since attribute assignments do not reach the
+        indexes until the object is stored again.
+        """
+        class_name = self.__class_name(cls)
+        self.__load(class_name)
+        self.__index()
+        index = FileStorage.__columns.get(class_name)
+        if index is not None and attribute in index.columns and \
+                (by is None or by in index.groups):
+            prefix = class_name + "."
+            for key, change in FileStorage.__pending.items():
+                obj = FileStorage.__objects.get(key)
+                if change != "delete" and obj is not None and \
+                        key.startswith(prefix):
+                    index.remove(key, obj)
+                    index.add(key, obj)
+            return index
+        index = ColumnIndex(class_name, [attribute],
+                            [] if by is None else [by])
+        index.rebuild(self.all(class_name))
+        return index
+
+    def __grid(self, cls):
+        """
+        Returns the grid index of a class. A class without one declared
+        in spatial_attributes() gets a throwaway index over its objects.
+        """
+        class_name = self.__class_name(cls)
+        self.__load(class_name)
+        self.__index()
+        if class_name in FileStorage.__spatial:
+            return FileStorage.__spatial[class_name]
+        index = GridIndex(class_name)
+        index.rebuild(self.all(class_name))
+        return index
 
     def new(self, obj):
         """
         Sets the obj in __objects with key <obj class name>.id
 
+        The whole object is written on the next save, even if it was
+        already stored: obj.save() goes through here, and changes made
+        in place, such as appending to a list attribute, are only seen
+        this way.
+
         Args:
             obj (BaseModel): The object to set in __objects.
         """
-        if obj is not None:
-            key = "{}.{}".format(obj.__class__.__name__, obj.id)
-            FileStorage.__objects[key] = obj
+        with FileStorage.__lock:
+            if obj is not None:
+                if self.partitioned:
+                    self.__load(obj.__class__.__name__)
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__unbuilt_records().get(obj.__class__.__name__, {}).pop(
+                    key, None)
+                self.__store(key, obj)
+                FileStorage.__pending[key] = "put"
+
+    def new_many(self, cls, rows):
+        """
+        Creates an object of cls for each row of attributes and adds
+        them all to __objects in one pass, as new() would one by one.
+
+        Args:
+            cls (type): The class of the objects.
+            rows (iterable): A dictionary of attributes for each object;
+            an empty one for an object with only its id and timestamps.
+
+        Returns:
+            list: The new objects, in the order of rows.
+        """
+        with FileStorage.__lock:
+            class_name = self.__class_name(cls)
+            cls = self.classes()[class_name]
+            if self.partitioned:
+                self.__load(class_name)
+            self.__index()
+            objects = FileStorage.__objects
+            pending = FileStorage.__pending
+            prefix = class_name + "."
+            created = []
+            for row in rows:
+                obj = cls.build(row)
+                key = prefix + obj.id
+                objects[key] = obj
+                pending[key] = "put"
+                created.append((key, obj))
+            for index in self.__indexes():
+                index.add_many(created)
+            return [obj for _, obj in created]
+
+    def touch(self, obj, name):
+        """
+        Records that an attribute of a stored object changed, so that the
+        next save() persists it. Called by BaseModel on every attribute
+        assignment; objects not in storage yet are ignored.
+
+        Args:
+            obj (BaseModel): The changed object.
+            name (str): The name of the attribute that changed.
+        """
+        with FileStorage.__lock:
+            obj_id = getattr(obj, "id", None)
+            if obj_id is None:
+                return
+            key = obj.__class__.__name__ + "." + obj_id
+            if FileStorage.__objects.get(key) is not obj:
+                return
+            changed = FileStorage.__pending.get(key)
+            if changed is None:
+                FileStorage.__pending[key] = {name}
+            elif isinstance(changed, set):
+                changed.add(name)
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from __objects if it is inside.
+
+        Args:
+            obj (BaseModel): The object to delete.
+        """
+        with FileStorage.__lock:
+            if obj is not None:
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__index()
+                self.__unbuilt_records().get(obj.__class__.__name__, {}).pop(
+                    key, None)
+                old = FileStorage.__objects.pop(key, None)
+                if old is not None:
+                    for index in self.__indexes():
+                        index.remove(key, old)
+                    FileStorage.__pending[key] = "delete"
 
     def save(self):
         """
         Serializes __objects to the JSON file.
+
+        Inside batch(), or with a commit window or count, the write is
+        deferred to flush(), which runs once the window has elapsed or
+        the count of saves is reached. The window is timed from the
+        first deferred save: a timer flushes it even if no other save
+        comes.
+        """
+        with FileStorage.__lock:
+            grouped = self.commit_window is not None or \
+                self.commit_count is not None
+            if not grouped and not self.__batch_depth:
+                self.flush(wait=False)
+                return
+            self.__deferred += 1
+            if self.__deferred_since is None:
+                self.__deferred_since = time.monotonic()
+            if self.__batch_depth:
+                return
+            if self.commit_window is not None:
+                elapsed = time.monotonic() - self.__deferred_since
+                if elapsed >= self.commit_window:
+                    self.flush(wait=False)
+                    return
+                if self.__window_timer is None:
+                    self.__window_timer = threading.Timer(
+                        self.commit_window - elapsed, self.__window_expired)
+                    self.__window_timer.daemon = True
+                    self.__window_timer.start()
+            if self.commit_count is not None and \
+                    self.__deferred >= self.commit_count:
+                self.flush(wait=False)
+
+    def __window_expired(self):
+        """
+        Flushes the saves deferred when the commit window elapses,
+        unless a batch() defers them further.
+        """
+        with FileStorage.__lock:
+            self.__window_timer = None
+            if self.__deferred and not self.__batch_depth:
+                self.flush(wait=False)
+
+    def flush(self, wait=True):
+        """
+        Writes the pending changes out now.
+
+        Only the objects created, changed or deleted since the last call
+        are serialized again: the JSON file is assembled from the cached
+        serialized form of the others. In journaled mode those objects
+        are appended to the log instead, with only the attributes that
+        changed, and in partitioned mode only the files of the classes
+        they belong to are rewritten.
+
+        stats["last_serialized"] tells how many objects were serialized
+        and stats["last_coalesced"] how many saves the flush covered.
+
+        In background mode the objects are serialized on the calling
+        thread and the files written by the background thread.
+
+        Args:
+            wait (bool): Whether to block, in background mode, until
+            every write queued so far is on disk.
+
+        Raises:
+            PermissionError: In snapshot mode, which is read-only.
+        """
+        with FileStorage.__lock:
+            if self.snapshot is not None:
+                raise PermissionError("{} is a read-only snapshot".format(
+                    self.snapshot_path))
+            if self.journal is not None:
+                records = self.__journal_records()
+                self.__write(None, self.__append, records)
+                serialized = sum(record["op"] == "put" for record in records)
+            else:
+                serialized = self.__refresh_fragments()
+                if self.partitioned:
+                    class_names = {key.split(".", 1)[0]
+                                   for key in FileStorage.__pending}
+                    for class_name in class_names:
+                        serialized += self.__write_file(
+                            self.__partition_path(class_name),
+                            self.all(class_name)
+                        )
+                else:
+                    serialized += self.__write_file(self.__file_path,
+                                                    FileStorage.__objects,
+                                                    self.__unbuilt_records())
+            FileStorage.__pending = {}
+            if wait and self.flusher is not None:
+                self.flusher.wait()
+            self.stats["flushes"] += 1
+            self.stats["last_serialized"] = serialized
+            self.stats["total_serialized"] += serialized
+            self.stats["last_coalesced"] = max(self.__deferred, 1)
+            self.__deferred = 0
+            self.__deferred_since = None
+            if self.__window_timer is not None:
+                self.__window_timer.cancel()
+                self.__window_timer = None
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers every save() made inside a with block to a single flush()
+        when the outermost block ends, e.g. for bulk loads:
+
+            with storage.batch():
+                for row in rows:
+                    User(**row).save()
+        """
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.__flush_deferred()
+
+    def __flush_deferred(self):
+        """
+        Flushes the saves deferred so far, if any.
         """
-        file_path = FileStorage.__file_path
-        obj = {key: value.to_dict()
-               for key, value in FileStorage.__objects.items()}
-        with open(file_path, "w", encoding="utf-8") as obj_file:
-            json.dump(obj, obj_file)
+        if self.__deferred:
+            self.flush()
+
+    def close(self):
+        """
+        Flushes the deferred saves and waits for the background writes,
+        then stops the background thread; later saves write the files
+        synchronously. Called on exit.
+        """
+        self.__flush_deferred()
+        if self.flusher is not None:
+            flusher, self.flusher = self.flusher, None
+            flusher.close()
+
+    def __write(self, path, func, *args):
+        """
+        Runs a write, on the background thread in background mode.
+
+        Args:
+            path (str): The file func rewrites as a whole, or None.
+            func (function): The write.
+            *args: The arguments of func.
+        """
+        if self.flusher is None:
+            func(*args)
+        else:
+            self.flusher.submit(path, func, *args)
+
+    def __append(self, records):
+        """
+        Appends records to the write-ahead log, then starts a compaction
+        if the log has grown past its thresholds.
+        """
+        self.journal.append(records)
+        self.compactor.maybe_compact()
+
+    def __refresh_fragments(self):
+        """
+        Serializes again the pending objects in the fragment cache, which
+        maps storage keys to the serialized form of each object.
+
+        Returns:
+            int: The number of objects serialized.
+        """
+        if FileStorage.__fragments_for is not FileStorage.__objects or \
+                FileStorage.__fragments_format != self.serializer.name:
+            FileStorage.__fragments = {}
+            FileStorage.__fragments_for = FileStorage.__objects
+            FileStorage.__fragments_format = self.serializer.name
+        serialized = 0
+        encode = self.serializer.encode
+        for key in FileStorage.__pending:
+            obj = FileStorage.__objects.get(key)
+            if obj is None:
+                FileStorage.__fragments.pop(key, None)
+            else:
+                FileStorage.__fragments[key] = encode(
+                    key, obj.to_dict(cache=False))
+                serialized += 1
+        return serialized
+
+    def __write_file(self, path, objects, unbuilt=None):
+        """
+        Writes objects to path in the storage format, using the fragment
+        cache and serializing the objects missing from it.
+
+        Args:
+            path (str): The file to write.
+            objects (dict): The objects to write, keyed by storage key.
+            unbuilt (dict): The serialized objects lazy mode has not
+            built yet, by class name, to write as well.
+
+        Returns:
+            int: The number of objects serialized.
+        """
+        fragments = FileStorage.__fragments
+        encode = self.serializer.encode
+        serialized = 0
+        parts = []
+        for key, obj in objects.items():
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = fragments[key] = encode(
+                    key, obj.to_dict(cache=False))
+                serialized += 1
+            parts.append(fragment)
+        for records in (unbuilt or {}).values():
+            for key, value in records.items():
+                fragment = fragments.get(key)
+                if fragment is None:
+                    fragment = fragments[key] = encode(key, value)
+                    serialized += 1
+                parts.append(fragment)
+        self.__write(path, self.__write_parts, path, parts)
+        return serialized
+
+    def __write_parts(self, path, parts):
+        """
+        Writes the file made of the serialized objects parts to path.
+        """
+        write_atomic(path, self.serializer.join(parts), self.durability)
+
+    def __index(self):
+        """
+        Returns the class index, after rebuilding every index if
+        __objects was replaced since they were last built.
+        """
+        if FileStorage.__secondary is None:
+            FileStorage.__secondary = {
+                (class_name, attribute): HashIndex(class_name, attribute)
+                for class_name, attributes in
+                self.indexed_attributes().items()
+                for attribute in attributes
+            }
+            FileStorage.__secondary.update({
+                (class_name, attribute): SortedIndex(class_name, attribute)
+                for class_name, attributes in
+                self.sorted_attributes().items()
+                for attribute in attributes
+            })
+            FileStorage.__secondary.update({
+                (class_name, attribute): InvertedIndex(class_name, attribute)
+                for class_name, attributes in
+                self.inverted_attributes().items()
+                for attribute in attributes
+            })
+            FileStorage.__secondary.update({
+                (class_name, attribute): TextIndex(class_name, attribute)
+                for class_name, attributes in
+                self.text_attributes().items()
+                for attribute in attributes
+            })
+            FileStorage.__spatial = {
+                class_name: GridIndex(class_name, *coordinates)
+                for class_name, coordinates in
+                self.spatial_attributes().items()
+            }
+            FileStorage.__columns = {
+                class_name: ColumnIndex(
+                    class_name, attributes,
+                    self.indexed_attributes().get(class_name, [])
+                )
+                for class_name, attributes in
+                self.column_attributes().items()
+            }
+            FileStorage.__indexed = None
+        if FileStorage.__indexed is not FileStorage.__objects:
+            for index in self.__indexes():
+                index.rebuild(FileStorage.__objects)
+            FileStorage.__indexed = FileStorage.__objects
+        return FileStorage.__class_index
+
+    def __indexes(self):
+        """
+        Returns every index maintained next to __objects.
+        """
+        return [FileStorage.__class_index] + \
+            list(FileStorage.__secondary.values()) + \
+            list(FileStorage.__spatial.values()) + \
+            list(FileStorage.__columns.values())
+
+    def __store(self, key, obj):
+        """
+        Stores obj under key in __objects and in every index.
+        """
+        self.__index()
+        old = FileStorage.__objects.get(key)
+        FileStorage.__objects[key] = obj
+        for index in self.__indexes():
+            if old is not None:
+                index.remove(key, old)
+            index.add(key, obj)
+
+    @staticmethod
+    def __class_name(cls):
+        """
+        Returns the name of cls, which may already be a class name.
+        """
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __partition_path(self, class_name):
+        """
+        Returns the path of the file holding the objects of class_name.
+        """
+        directory = os.path.dirname(self.__file_path)
+        return os.path.join(directory, class_name + self.serializer.extension)
+
+    def __load(self, class_name):
+        """
+        Loads the objects of class_name on its first access: the
+        partition file in partitioned mode, the snapshot in snapshot
+        mode, and the serialized objects left by reload() in lazy mode.
+
+        Args:
+            class_name (str): The class whose objects are needed.
+        """
+        with FileStorage.__lock:
+            records = self.__unbuilt_records().pop(class_name, None)
+            if records:
+                for key, value in records.items():
+                    self.__store(key, self.__build(value))
+            if class_name in FileStorage.__loaded or \
+                    not (self.partitioned or self.snapshot is not None):
+                return
+            FileStorage.__loaded.add(class_name)
+            if self.snapshot is not None:
+                if class_name not in self.classes():
+                    return
+                for key, value in self.snapshot.items(class_name):
+                    if key not in FileStorage.__objects and \
+                            FileStorage.__pending.get(key) != "delete":
+                        self.__store(key, self.__build(value))
+                return
+            path = self.__partition_path(class_name)
+            if class_name not in self.classes() or not os.path.isfile(path):
+                return
+            try:
+                obj_dict = {key: self.__build(value)
+                            for key, value in self.serializer.read(path)}
+            except (json.JSONDecodeError, FormatError):
+                print("Error: Invalid JSON data in {}.".format(path))
+                return
+            for key, obj in obj_dict.items():
+                if key not in FileStorage.__objects:
+                    self.__store(key, obj)
+
+    def __unbuilt_records(self):
+        """
+        Returns the serialized objects lazy mode has not built yet, as a
+        {class name: {key: serialized object}} dictionary. They are
+        dropped once __objects is replaced.
+        """
+        if FileStorage.__unbuilt_for is not FileStorage.__objects:
+            FileStorage.__unbuilt = {}
+            FileStorage.__unbuilt_for = FileStorage.__objects
+        return FileStorage.__unbuilt
+
+    def __build(self, value):
+        """
+        Builds the instance of a serialized object, counting it in
+        stats["materialized"]. The ids it holds are interned, so that
+        the objects referring to another share the string of its id.
+        """
+        self.stats["materialized"] += 1
+        cls = self.classes()[value["__class__"]]
+        registry.intern_references(cls.__name__, value)
+        if self.compact_models:
+            cls = compact_class(cls)
+        return cls(**value)
+
+    def __from_snapshot(self, class_name, key):
+        """
+        Returns the object stored under key, decoding it from the
+        snapshot unless it is in memory already or was deleted.
+        """
+        obj = FileStorage.__objects.get(key)
+        if obj is not None or FileStorage.__pending.get(key) == "delete":
+            return obj
+        value = self.snapshot.get(key)
+        cls = self.classes().get(class_name)
+        if value is None or cls is None:
+            return None
+        obj = self.__build(value)
+        self.__store(key, obj)
+        return obj
+
+    def write_snapshot(self, path):
+        """
+        Writes the objects in storage to a snapshot file, which snapshot
+        mode can then read.
+
+        Args:
+            path (str): The snapshot file.
+
+        Returns:
+            int: The number of objects written.
+        """
+        return write_snapshot(
+            path,
+            ((key, obj.to_dict(cache=False))
+             for key, obj in self.all().items()),
+            schema_fields(self.attributes())
+        )
+
+    def compact(self, wait=True):
+        """
+        Folds the write-ahead log into the JSON snapshot.
+
+        Args:
+            wait (bool): Whether to block until the compaction is over.
+
+        Returns:
+            dict: The compaction statistics, or None if the storage is
+            not journaled.
+        """
+        if self.compactor is None:
+            return None
+        if self.flusher is not None:
+            self.flusher.wait()
+        self.compactor.start()
+        if wait:
+            self.compactor.wait()
+        return self.compactor.stats
+
+    def __journal_records(self):
+        """
+        Builds the log records for the pending mutations: the whole
+        object for a new one, and the attributes that changed or were
+        deleted for the others.
+
+        Returns:
+            list: The put and delete records, in mutation order.
+        """
+        records = []
+        for key, changed in FileStorage.__pending.items():
+            if changed == "delete":
+                records.append(Journal.delete_record(key))
+            elif key in FileStorage.__objects:
+                data = FileStorage.__objects[key].to_dict(cache=False)
+                replace = not isinstance(changed, set)
+                deleted = ()
+                if not replace:
+                    deleted = [name for name in changed if name not in data]
+                    data = {name: data[name] for name in changed
+                            if name in data}
+                records.append(Journal.put_record(key, data, replace,
+                                                  deleted))
+        return records
 
     def classes(self):
         """
         Retrieve a dictionary mapping valid class names
         to their corresponding class references.
 
+        The classes register themselves when they are defined, so the
+        dictionary is built once and shared: it must not be modified.
+
         Returns:
             dict: A dictionary containing the valid classes
             and their references
         """
-        from models.base_model import BaseModel
-        from models.user import User
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.place import Place
-        from models.review import Review
-
-        classes = {
-            "BaseModel": BaseModel,
-            "User": User,
-            "State": State,
-            "City": City,
-            "Amenity": Amenity,
-            "Place": Place,
-            "Review": Review
-        }
-        return classes
+        return registry.classes()
 
     def reload(self):
         """
         Deserializes the JSON file into __objects.
 
-        This method reads the JSON file, deserializes its contents, and
-        assigns the loaded objects to the __objects dictionary.
+        This method reads the JSON file one object at a time, builds
+        each instance as soon as it is read, and assigns the loaded
+        objects to the __objects dictionary. In journaled mode the
+        write-ahead log is replayed on top of it.
 
         If the JSON file does not exist, is empty, or an error occurs during
         deserialization, this method does nothing.
 
+        In partitioned mode the objects in memory are dropped and every
+        class file is read again on its next access. In snapshot mode
+        the snapshot is mapped again. In lazy mode the objects read are
+        kept serialized until they are accessed.
+
         Returns:
             None
         """
-        if not os.path.isfile(FileStorage.__file_path):
-            return
+        if self.flusher is not None:
+            self.flusher.wait()
+        with FileStorage.__lock:
+            if self.partitioned or self.snapshot_path is not None:
+                FileStorage.__objects = {}
+                FileStorage.__loaded = set()
+                FileStorage.__pending = {}
+                if self.snapshot_path is not None:
+                    if self.snapshot is not None:
+                        self.snapshot.close()
+                    self.snapshot = Snapshot(self.snapshot_path)
+                return
+            if self.compactor is not None:
+                self.compactor.wait()
+            has_snapshot = os.path.isfile(self.__file_path)
+            if not has_snapshot and self.journal is None:
+                return
 
-        try:
-            with open(FileStorage.__file_path, "r", encoding="utf-8") as f:
-                obj_dict = json.load(f)
-                obj_dict = {
-                    k: self.classes()[v["__class__"]](**v)
-                    for k, v in obj_dict.items()
-                }
+            try:
+                changes = {}
+                if self.journal is not None:
+                    changes = self.journal.overlay()
+                obj_dict = {}
+                unbuilt = {}
+                for k, v in self.__records(has_snapshot, changes):
+                    if self.lazy:
+                        unbuilt.setdefault(k.split(".", 1)[0], {})[k] = v
+                    else:
+                        obj_dict[k] = self.__build(v)
                 FileStorage.__objects = obj_dict
-        except json.JSONDecodeError:
-            # Handles when the JSON file is empty or contains invalid data
-            print("Error: Invalid JSON data. File will be recreated.")
-            FileStorage.__objects = {}
+                FileStorage.__unbuilt = unbuilt
+                FileStorage.__unbuilt_for = obj_dict
+            except (json.JSONDecodeError, FormatError):
+                # Handles when the JSON file is empty or contains invalid data
+                print("Error: Invalid JSON data. File will be recreated.")
+                FileStorage.__objects = {}
+            FileStorage.__pending = {}
+
+    def __records(self, has_snapshot, changes):
+        """
+        Yields the serialized objects of the data file, with the changes
+        from Journal.overlay() applied, then the objects only the log
+        holds.
+        """
+        if has_snapshot:
+            for k, v in self.serializer.read(self.__file_path):
+                if k in changes:
+                    v = Journal.merge(v, changes.pop(k))
+                    if v is None:
+                        continue
+                yield k, v
+        for k, change in changes.items():
+            if change is not None:
+                yield k, change[1]
 
     def to_dict(self):
         """
@@ -124,49 +1216,87 @@ class FileStorage:
                 obj = cls(**value)
                 FileStorage.__objects[key] = obj
 
+    def indexed_attributes(self):
+        """
+        Returns the attributes that have a secondary index by default:
+        the foreign keys between classes.
+        """
+        indexed_attributes = {
+            "City": ["state_id"],
+            "Place": ["city_id", "user_id"],
+            "Review": ["place_id", "user_id"]
+        }
+        return indexed_attributes
+
+    def sorted_attributes(self):
+        """
+        Returns the numeric attributes that have a sorted index by
+        default, for range queries.
+        """
+        sorted_attributes = {
+            "Place": [
+                "price_by_night",
+                "number_rooms",
+                "number_bathrooms",
+                "max_guest"
+            ]
+        }
+        return sorted_attributes
+
+    def inverted_attributes(self):
+        """
+        Returns the list attributes that have an inverted index by
+        default, for membership queries.
+        """
+        inverted_attributes = {
+            "Place": ["amenity_ids"]
+        }
+        return inverted_attributes
+
+    def text_attributes(self):
+        """
+        Returns the text attributes that have a full-text index by
+        default.
+        """
+        text_attributes = {
+            "Place": ["description"],
+            "Review": ["text"]
+        }
+        return text_attributes
+
+    def spatial_attributes(self):
+        """
+        Returns the (latitude, longitude) attributes that have a grid
+        index, for geographic queries.
+        """
+        spatial_attributes = {
+            "Place": ("latitude", "longitude")
+        }
+        return spatial_attributes
+
+    def column_attributes(self):
+        """
+        Returns the numeric attributes mirrored in columns, for
+        aggregates. The objects can be grouped by the attributes of
+        their class in indexed_attributes().
+        """
+        column_attributes = {
+            "Place": [
+                "number_rooms",
+                "number_bathrooms",
+                "max_guest",
+                "price_by_night",
+                "latitude",
+                "longitude"
+            ]
+        }
+        return column_attributes
+
     def attributes(self):
         """
         Returns the valid attributes and their types for classname.
+
+        The attributes are those each class declares, recorded once by
+        the registry; the dictionary is shared and must not be modified.
         """
-        attributes = {
-            "BaseModel": {
-                "id": str,
-                "created_at": datetime.datetime,
-                "updated_at": datetime.datetime
-            },
-            "User": {
-                "email": str,
-                "password": str,
-                "first_name": str,
-                "last_name": str
-            },
-            "State": {
-                "name": str
-            },
-            "City": {
-                "state_id": str,
-                "name": str
-            },
-            "Amenity": {
-                "name": str
-            },
-            "Place": {
-                "city_id": str,
-                "user_id": str,
-                "name": str,
-                "description": str,
-                "number_rooms": int,
-                "number_bathrooms": int,
-                "max_guest": int,
-                "price_by_night": int,
-                "latitude": float,
-                "longitude": float,
-                "amenity_ids": list
-            },
-            "Review": {
-                "place_id": str,
-                "user_id": str,
-                "text": str
-            }
-        }
-        return attributes
+        return registry.attributes()
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+
+"""
+Background writer used by FileStorage to persist saves off the calling
+thread.
+
+FileStorage serializes the changed objects on the caller's thread and
+hands the writes over as jobs. Jobs run in submission order; a job
+writing a whole file supersedes the queued jobs writing the same file,
+so a burst of saves costs one rewrite.
+"""
+
+import queue
+import threading
+
+
+class Flusher:
+    """
+    A worker thread running storage writes in the background.
+
+    Attributes:
+        max_queued (int): The number of queued jobs past which submit()
+        blocks until the worker catches up.
+        stats (dict): Counters of the jobs submitted, run, and skipped
+        because a later job superseded them.
+    """
+
+    def __init__(self, max_queued=64):
+        """
+        Initializes and starts a flusher.
+
+        Args:
+            max_queued (int): The size of the job queue.
+        """
+        self.max_queued = max_queued
+        self.stats = {"submitted": 0, "written": 0, "coalesced": 0}
+        self.__queue = queue.Queue(max_queued)
+        self.__error = None
+        self.__thread = threading.Thread(
+            target=self.__run, name="hbnb-flusher", daemon=True
+        )
+        self.__thread.start()
+
+    def submit(self, key, func, *args):
+        """
+        Queues a write, blocking while the queue is full.
+
+        Args:
+            key (str): The file the job rewrites as a whole, so that it
+            supersedes the queued jobs with the same key, or None for a
+            job that must always run (e.g. a log append).
+            func (function): The write to run.
+            *args: The arguments of func.
+
+        Raises:
+            RuntimeError: If the flusher was closed.
+        """
+        if self.__thread is None:
+            raise RuntimeError("the flusher is closed")
+        self.__raise_error()
+        self.stats["submitted"] += 1
+        self.__queue.put((key, func, args))
+
+    def wait(self):
+        """
+        Blocks until every queued job has run.
+
+        Raises:
+            Exception: The first error a job raised since the last call.
+        """
+        self.__queue.join()
+        self.__raise_error()
+
+    def close(self):
+        """
+        Runs the queued jobs and stops the worker thread.
+        """
+        if self.__thread is None:
+            return
+        self.__queue.put(None)
+        self.__thread.join()
+        self.__thread = None
+        self.__raise_error()
+
+    def __raise_error(self):
+        """
+        Raises the error a job left behind, if any.
+        """
+        error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def __run(self):
+        """
+        Runs jobs until close() queues the end marker.
+        """
+        while True:
+            jobs = [self.__queue.get()]
+            while True:
+                try:
+                    jobs.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in jobs
+            if done:
+                jobs = [job for job in jobs if job is not None]
+            latest = {job[0]: i for i, job in enumerate(jobs)}
+            for i, (key, func, args) in enumerate(jobs):
+                if key is not None and latest[key] != i:
+                    self.stats["coalesced"] += 1
+                    continue
+                try:
+                    func(*args)
+                    self.stats["written"] += 1
+                except Exception as error:
+                    if self.__error is None:
+                        self.__error = error
+            for _ in range(len(jobs) + done):
+                self.__queue.task_done()
+            if done:
+                return
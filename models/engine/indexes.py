@@ -0,0 +1,924 @@
+#!/usr/bin/python3
+
+"""
+In-memory indexes maintained by FileStorage next to __objects.
+
+Every index is told about each object stored (add) and dropped
+(remove) under a given key, and can be rebuilt from scratch from a
+dictionary of objects, such as the one produced by reload().
+"""
+
+import math
+import re
+import shlex
+from bisect import bisect_left, bisect_right, insort
+
+
+class Index:
+    """
+    Base class of the FileStorage indexes.
+    """
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        raise NotImplementedError
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key.
+
+        Args:
+            key (str): The storage key, "<class name>.<id>".
+            obj (BaseModel): The object stored under key.
+        """
+        raise NotImplementedError
+
+    def remove(self, key, obj):
+        """
+        Drops the entries of obj, stored under key.
+
+        Args:
+            key (str): The storage key, "<class name>.<id>".
+            obj (BaseModel): The object stored under key.
+        """
+        raise NotImplementedError
+
+    def add_many(self, items):
+        """
+        Indexes objects not in the index yet.
+
+        Args:
+            items (iterable): (key, object) pairs.
+        """
+        for key, obj in items:
+            self.add(key, obj)
+
+    def rebuild(self, objects):
+        """
+        Rebuilds the index from a dictionary of objects.
+
+        Args:
+            objects (dict): The objects, keyed by storage key.
+        """
+        self.clear()
+        for key, obj in objects.items():
+            self.add(key, obj)
+
+
+class ClassIndex(Index):
+    """
+    Groups the objects in storage by class name.
+
+    Attributes:
+        classes (dict): Maps class names to {key: object} dictionaries.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty class index.
+        """
+        self.classes = {}
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.classes = {}
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key.
+        """
+        self.classes.setdefault(obj.__class__.__name__, {})[key] = obj
+
+    def remove(self, key, obj):
+        """
+        Drops the entry of obj, stored under key.
+        """
+        bucket = self.classes.get(obj.__class__.__name__)
+        if bucket is not None:
+            bucket.pop(key, None)
+
+    def objects(self, class_name):
+        """
+        Returns the objects of a class.
+
+        Args:
+            class_name (str): The name of the class.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        return dict(self.classes.get(class_name, {}))
+
+    def count(self, class_name):
+        """
+        Returns the number of objects of a class.
+
+        Args:
+            class_name (str): The name of the class.
+        """
+        return len(self.classes.get(class_name, ()))
+
+
+class HashIndex(Index):
+    """
+    Groups the objects of one class by the value of one attribute.
+
+    The value each object was indexed under is remembered, so an object
+    updated in place can be moved to its new bucket when it is stored
+    again.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        attribute (str): The indexed attribute.
+        buckets (dict): Maps values to {key: object} dictionaries.
+        values (dict): Maps keys to the value they are indexed under.
+    """
+
+    def __init__(self, class_name, attribute):
+        """
+        Initializes an empty hash index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            attribute (str): The indexed attribute.
+        """
+        self.class_name = class_name
+        self.attribute = attribute
+        self.buckets = {}
+        self.values = {}
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.buckets = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key, unless it is of another class or its
+        value is not hashable.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return
+        value = getattr(obj, self.attribute, None)
+        try:
+            self.buckets.setdefault(value, {})[key] = obj
+        except TypeError:
+            return
+        self.values[key] = value
+
+    def remove(self, key, obj):
+        """
+        Drops the entry of the object stored under key.
+        """
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        bucket = self.buckets[value]
+        bucket.pop(key, None)
+        if not bucket:
+            del self.buckets[value]
+
+    def lookup(self, value):
+        """
+        Returns the objects whose attribute equals value.
+
+        Args:
+            value: The value to look for.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        try:
+            return dict(self.buckets.get(value, {}))
+        except TypeError:
+            return {}
+
+
+class _Top:
+    """
+    A sentinel that compares greater than any storage key.
+    """
+
+    def __lt__(self, other):
+        """
+        Nothing is greater than the sentinel.
+        """
+        return False
+
+    def __gt__(self, other):
+        """
+        The sentinel is greater than anything else.
+        """
+        return True
+
+
+_TOP = _Top()
+
+
+class SortedIndex(Index):
+    """
+    Keeps the objects of one class sorted by a numeric attribute, so
+    that range queries cost O(log N + k).
+
+    Objects whose value is not an int or a float are not indexed.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        attribute (str): The indexed attribute.
+        entries (list): The sorted (value, key) pairs.
+        values (dict): Maps keys to the value they are indexed under.
+        objects (dict): Maps keys to the indexed objects.
+    """
+
+    def __init__(self, class_name, attribute):
+        """
+        Initializes an empty sorted index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            attribute (str): The indexed attribute.
+        """
+        self.class_name = class_name
+        self.attribute = attribute
+        self.entries = []
+        self.values = {}
+        self.objects = {}
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.entries = []
+        self.values = {}
+        self.objects = {}
+
+    def __value(self, obj):
+        """
+        Returns the value obj is indexed under, or None if it is not
+        indexed.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return None
+        value = getattr(obj, self.attribute, None)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key.
+        """
+        value = self.__value(obj)
+        if value is None:
+            return
+        insort(self.entries, (value, key))
+        self.values[key] = value
+        self.objects[key] = obj
+
+    def remove(self, key, obj):
+        """
+        Drops the entry of the object stored under key.
+        """
+        if key not in self.values:
+            return
+        entry = (self.values.pop(key), key)
+        del self.entries[bisect_left(self.entries, entry)]
+        del self.objects[key]
+
+    def add_many(self, items):
+        """
+        Indexes objects not in the index yet with a single sort, instead
+        of an insertion into the middle of entries for each one.
+        """
+        added = []
+        for key, obj in items:
+            value = self.__value(obj)
+            if value is not None:
+                added.append((value, key))
+                self.values[key] = value
+                self.objects[key] = obj
+        if added:
+            added.sort()
+            self.entries += added
+            self.entries.sort()
+
+    def rebuild(self, objects):
+        """
+        Rebuilds the index from a dictionary of objects with a single
+        sort.
+        """
+        self.clear()
+        for key, obj in objects.items():
+            value = self.__value(obj)
+            if value is not None:
+                self.entries.append((value, key))
+                self.values[key] = value
+                self.objects[key] = obj
+        self.entries.sort()
+
+    def __bounds(self, low, high):
+        """
+        Returns the slice of entries with low <= value <= high.
+        """
+        start = 0 if low is None else bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else \
+            bisect_right(self.entries, (high, _TOP))
+        return start, max(start, end)
+
+    def count(self, low=None, high=None):
+        """
+        Returns the number of objects with low <= value <= high.
+
+        Args:
+            low: The lower bound, or None for no lower bound.
+            high: The upper bound, or None for no upper bound.
+        """
+        start, end = self.__bounds(low, high)
+        return end - start
+
+    def range(self, low=None, high=None):
+        """
+        Returns the objects with low <= value <= high, in value order.
+
+        Args:
+            low: The lower bound, or None for no lower bound.
+            high: The upper bound, or None for no upper bound.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        start, end = self.__bounds(low, high)
+        return {key: self.objects[key]
+                for _, key in self.entries[start:end]}
+
+    def lookup(self, value):
+        """
+        Returns the objects whose attribute equals value.
+        """
+        try:
+            return self.range(value, value)
+        except TypeError:
+            return {}
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Returns the great-circle distance between two points, in km.
+
+    Args:
+        lat1 (float): The latitude of the first point, in degrees.
+        lng1 (float): The longitude of the first point, in degrees.
+        lat2 (float): The latitude of the second point, in degrees.
+        lng2 (float): The longitude of the second point, in degrees.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def within_bounds(obj, bounds):
+    """
+    Tells whether the numeric attributes of obj fall within bounds.
+
+    Args:
+        obj (BaseModel): The object to test.
+        bounds (dict): Maps attributes to (low, high) bounds, either of
+        which may be None.
+
+    Returns:
+        bool: False if an attribute is not a number or out of bounds.
+    """
+    for attribute, (low, high) in bounds.items():
+        value = getattr(obj, attribute, None)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        if (low is not None and value < low) or \
+                (high is not None and value > high):
+            return False
+    return True
+
+
+class GridIndex(Index):
+    """
+    Buckets the objects of one class into a grid of latitude/longitude
+    cells, for bounding-box, radius and nearest-neighbour queries.
+
+    Objects whose coordinates are not numbers within [-90, 90] and
+    [-180, 180] are not indexed.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        lat_attribute (str): The latitude attribute.
+        lng_attribute (str): The longitude attribute.
+        cell_size (float): The side of a cell, in degrees.
+        cells (dict): Maps (row, column) cells to {key: object}
+        dictionaries.
+        points (dict): Maps keys to the (lat, lng) they are indexed
+        under.
+    """
+
+    def __init__(self, class_name, lat_attribute="latitude",
+                 lng_attribute="longitude", cell_size=0.1):
+        """
+        Initializes an empty grid index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            lat_attribute (str): The latitude attribute.
+            lng_attribute (str): The longitude attribute.
+            cell_size (float): The side of a cell, in degrees.
+        """
+        self.class_name = class_name
+        self.lat_attribute = lat_attribute
+        self.lng_attribute = lng_attribute
+        self.cell_size = cell_size
+        self.cells = {}
+        self.points = {}
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.cells = {}
+        self.points = {}
+
+    def __cell(self, lat, lng):
+        """
+        Returns the cell holding a point. Longitude 180 shares the cells
+        of longitude -180.
+        """
+        lng = (lng + 180) % 360 - 180
+        return (math.floor(lat / self.cell_size),
+                math.floor(lng / self.cell_size))
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return
+        point = []
+        for attribute, limit in ((self.lat_attribute, 90),
+                                 (self.lng_attribute, 180)):
+            value = getattr(obj, attribute, None)
+            if isinstance(value, bool) or \
+                    not isinstance(value, (int, float)) or \
+                    not -limit <= value <= limit:
+                return
+            point.append(value)
+        self.cells.setdefault(self.__cell(*point), {})[key] = obj
+        self.points[key] = tuple(point)
+
+    def remove(self, key, obj):
+        """
+        Drops the entry of the object stored under key.
+        """
+        if key not in self.points:
+            return
+        cell = self.__cell(*self.points.pop(key))
+        bucket = self.cells[cell]
+        bucket.pop(key, None)
+        if not bucket:
+            del self.cells[cell]
+
+    def __cells_in(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Yields the non-empty cells overlapping a box that does not cross
+        the antimeridian.
+        """
+        rows = (math.floor(min_lat / self.cell_size),
+                math.floor(max_lat / self.cell_size))
+        columns = [(math.floor(min_lng / self.cell_size),
+                    math.floor(max_lng / self.cell_size))]
+        if max_lng >= 180:
+            columns.append((self.__cell(0, 180)[1],) * 2)
+        for low, high in columns:
+            area = (rows[1] - rows[0] + 1) * (high - low + 1)
+            if area > len(self.cells):
+                for cell in list(self.cells):
+                    if rows[0] <= cell[0] <= rows[1] and \
+                            low <= cell[1] <= high:
+                        yield cell
+                continue
+            for row in range(rows[0], rows[1] + 1):
+                for column in range(low, high + 1):
+                    if (row, column) in self.cells:
+                        yield (row, column)
+
+    def bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Returns the objects inside a bounding box, bounds included.
+
+        A box with min_lng greater than max_lng crosses the antimeridian.
+
+        Args:
+            min_lat (float): The southern edge, in degrees.
+            min_lng (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lng (float): The eastern edge, in degrees.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        if min_lng > max_lng:
+            found = self.bbox(min_lat, min_lng, max_lat, 180)
+            found.update(self.bbox(min_lat, -180, max_lat, max_lng))
+            return found
+        found = {}
+        for cell in self.__cells_in(min_lat, min_lng, max_lat, max_lng):
+            for key, obj in self.cells[cell].items():
+                lat, lng = self.points[key]
+                if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                    found[key] = obj
+        return found
+
+    def radius(self, lat, lng, km):
+        """
+        Returns the objects within km of a point, nearest first.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            km (float): The radius, in kilometres.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        d_lat = km / KM_PER_DEGREE
+        min_lat, max_lat = max(lat - d_lat, -90), min(lat + d_lat, 90)
+        cos_lat = min(math.cos(math.radians(min_lat)),
+                      math.cos(math.radians(max_lat)))
+        if cos_lat <= 0 or km / (KM_PER_DEGREE * cos_lat) >= 180:
+            min_lng, max_lng = -180, 180
+        else:
+            d_lng = km / (KM_PER_DEGREE * cos_lat)
+            min_lng = (lng - d_lng + 180) % 360 - 180
+            max_lng = (lng + d_lng + 180) % 360 - 180
+        found = []
+        for key, obj in self.bbox(min_lat, min_lng, max_lat,
+                                  max_lng).items():
+            distance = haversine(lat, lng, *self.points[key])
+            if distance <= km:
+                found.append((distance, key, obj))
+        found.sort(key=lambda item: item[:2])
+        return {key: obj for _, key, obj in found}
+
+    def nearest(self, lat, lng, k):
+        """
+        Returns the k objects nearest to a point, nearest first.
+
+        Rings of cells are searched outwards from the cell of the point
+        until the k-th candidate is closer than anything a further ring
+        could hold. Once a ring would cover more cells than are in use,
+        every indexed object is measured instead.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lng (float): The longitude of the point, in degrees.
+            k (int): The number of objects to return.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        if k <= 0:
+            return {}
+        centre = self.__cell(lat, lng)
+        found = []
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 >= len(self.cells):
+                cells = list(self.cells)
+                found = []
+            else:
+                cells = self.__ring(centre, ring)
+            for cell in cells:
+                for key, obj in self.cells.get(cell, {}).items():
+                    distance = haversine(lat, lng, *self.points[key])
+                    found.append((distance, key, obj))
+            found.sort(key=lambda item: item[:2])
+            del found[k:]
+            if (2 * ring + 1) ** 2 >= len(self.cells) or \
+                    (len(found) == k and
+                     found[-1][0] <= self.__reach(lat, ring)):
+                break
+            ring += 1
+        return {key: obj for _, key, obj in found}
+
+    def __reach(self, lat, ring):
+        """
+        Returns a lower bound, in km, of the distance from a point to any
+        object outside the cells within ring of its own cell.
+        """
+        span = math.radians(min(ring * self.cell_size, 90))
+        across = math.asin(math.cos(math.radians(lat)) * math.sin(span))
+        return EARTH_RADIUS_KM * min(span, across)
+
+    def __ring(self, centre, ring):
+        """
+        Yields the cells at Chebyshev distance ring from centre, with
+        columns wrapping around the antimeridian.
+        """
+        seen = set()
+        for d_row in range(-ring, ring + 1):
+            for d_column in range(-ring, ring + 1):
+                if max(abs(d_row), abs(d_column)) != ring:
+                    continue
+                row = centre[0] + d_row
+                lng = (centre[1] + d_column + 0.5) * self.cell_size
+                cell = (row, self.__cell(0, lng)[1])
+                if cell not in seen:
+                    seen.add(cell)
+                    yield cell
+
+
+class InvertedIndex(Index):
+    """
+    Maps each element of a list attribute to the objects of one class
+    whose list holds it, such as amenity ids to the places offering them.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        attribute (str): The indexed list attribute.
+        postings (dict): Maps elements to {key: object} dictionaries.
+        values (dict): Maps keys to the elements they are indexed under.
+    """
+
+    def __init__(self, class_name, attribute):
+        """
+        Initializes an empty inverted index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            attribute (str): The indexed list attribute.
+        """
+        self.class_name = class_name
+        self.attribute = attribute
+        self.postings = {}
+        self.values = {}
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.postings = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """
+        Indexes obj under key, once per hashable element of its list.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return
+        elements = getattr(obj, self.attribute, None)
+        if not isinstance(elements, (list, tuple, set)):
+            return
+        indexed = set()
+        for element in elements:
+            try:
+                self.postings.setdefault(element, {})[key] = obj
+            except TypeError:
+                continue
+            indexed.add(element)
+        self.values[key] = indexed
+
+    def remove(self, key, obj):
+        """
+        Drops the entries of the object stored under key.
+        """
+        for element in self.values.pop(key, ()):
+            posting = self.postings[element]
+            posting.pop(key, None)
+            if not posting:
+                del self.postings[element]
+
+    def lookup(self, value):
+        """
+        Returns the objects whose list holds value.
+        """
+        return self.all_of([value])
+
+    def all_of(self, values):
+        """
+        Returns the objects whose list holds every one of values.
+
+        The postings are intersected starting from the shortest, so the
+        cost is bounded by the rarest value.
+
+        Args:
+            values (iterable): The elements to look for.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        try:
+            postings = sorted((self.postings.get(value, {})
+                               for value in set(values)), key=len)
+        except TypeError:
+            return {}
+        if not postings:
+            return {}
+        found = dict(postings[0])
+        for posting in postings[1:]:
+            if not found:
+                break
+            found = {key: obj for key, obj in found.items()
+                     if key in posting}
+        return found
+
+    def any_of(self, values):
+        """
+        Returns the objects whose list holds at least one of values.
+
+        Args:
+            values (iterable): The elements to look for.
+
+        Returns:
+            dict: A new {key: object} dictionary.
+        """
+        found = {}
+        for value in values:
+            try:
+                found.update(self.postings.get(value, {}))
+            except TypeError:
+                continue
+        return found
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The tokens, in order.
+    """
+    return re.findall(r"\w+", text.lower())
+
+
+def parse_query(query):
+    """
+    Splits a search query into phrases, a phrase being a list of tokens.
+    Double-quoted parts of the query are kept together as one phrase;
+    every other word is a phrase of its own.
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        list: The phrases of the query.
+    """
+    try:
+        parts = shlex.split(query)
+    except ValueError:
+        parts = query.split()
+    phrases = []
+    for part in parts:
+        tokens = tokenize(part)
+        if len(tokens) > 1:
+            phrases.append(tokens)
+        else:
+            phrases.extend([token] for token in tokens)
+    return phrases
+
+
+class TextIndex(Index):
+    """
+    A positional inverted index over a text attribute of one class,
+    ranking matches with BM25.
+
+    Attributes:
+        class_name (str): The class of the indexed objects.
+        attribute (str): The indexed text attribute.
+        postings (dict): Maps terms to {key: [positions]} dictionaries.
+        lengths (dict): Maps keys to the number of tokens they hold.
+        terms (dict): Maps keys to the distinct terms they hold.
+        objects (dict): Maps keys to the indexed objects.
+        total_length (int): The number of tokens indexed.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, class_name, attribute):
+        """
+        Initializes an empty text index.
+
+        Args:
+            class_name (str): The class of the indexed objects.
+            attribute (str): The indexed text attribute.
+        """
+        self.class_name = class_name
+        self.attribute = attribute
+        self.clear()
+
+    def clear(self):
+        """
+        Drops every entry of the index.
+        """
+        self.postings = {}
+        self.lengths = {}
+        self.terms = {}
+        self.objects = {}
+        self.total_length = 0
+
+    def add(self, key, obj):
+        """
+        Indexes the text of obj under key.
+        """
+        if obj.__class__.__name__ != self.class_name:
+            return
+        text = getattr(obj, self.attribute, None)
+        if not isinstance(text, str):
+            return
+        tokens = tokenize(text)
+        for position, token in enumerate(tokens):
+            self.postings.setdefault(token, {}).setdefault(
+                key, []).append(position)
+        self.lengths[key] = len(tokens)
+        self.terms[key] = tuple(set(tokens))
+        self.objects[key] = obj
+        self.total_length += len(tokens)
+
+    def remove(self, key, obj):
+        """
+        Drops the entries of the object stored under key.
+        """
+        if key not in self.lengths:
+            return
+        self.total_length -= self.lengths.pop(key)
+        del self.objects[key]
+        for term in self.terms.pop(key):
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+
+    def score(self, phrases):
+        """
+        Scores the objects matching every phrase of a query.
+
+        Candidates come from the rarest term, so the cost depends on the
+        number of matches rather than on the number of objects indexed.
+
+        Args:
+            phrases (list): The phrases of the query, see parse_query().
+
+        Returns:
+            dict: Maps the keys of the matching objects to their score.
+        """
+        terms = {term for phrase in phrases for term in phrase}
+        if not terms or not all(term in self.postings for term in terms):
+            return {}
+        rarest = min(terms, key=lambda term: len(self.postings[term]))
+        candidates = [key for key in self.postings[rarest]
+                      if all(key in self.postings[term] for term in terms)]
+        count = len(self.lengths)
+        average = self.total_length / count
+        idf = {
+            term: math.log(1 + (count - len(self.postings[term]) + 0.5) /
+                           (len(self.postings[term]) + 0.5))
+            for term in terms
+        }
+        scores = {}
+        for key in candidates:
+            if not all(self.__has_phrase(key, phrase) for phrase in phrases):
+                continue
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[key] /
+                              average)
+            score = 0.0
+            for term in terms:
+                frequency = len(self.postings[term][key])
+                score += idf[term] * frequency * (self.k1 + 1) / \
+                    (frequency + norm)
+            scores[key] = score
+        return scores
+
+    def __has_phrase(self, key, phrase):
+        """
+        Tells whether the text under key holds the tokens of phrase one
+        after the other.
+        """
+        if len(phrase) == 1:
+            return True
+        starts = set(self.postings[phrase[0]][key])
+        for offset, term in enumerate(phrase[1:], 1):
+            positions = set(self.postings[term][key])
+            starts = {start for start in starts
+                      if start + offset in positions}
+            if not starts:
+                return False
+        return True
@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+
+"""
+Append-only write-ahead log used by FileStorage in journaled mode.
+
+Every mutation is stored as one JSON line, either a put (the
+serialized fields of an object) or a delete, so persisting a change
+costs the size of the changed object instead of the whole dataset.
+A put holds either the whole object, replacing what came before, or
+the attributes that changed and the names of those that were deleted.
+"""
+
+import json
+import os
+import threading
+
+from models.engine.atomic import fsync_directory
+
+
+class Journal:
+    """
+    A write-ahead log of storage mutations kept next to the snapshot file.
+
+    While a compaction is folding the log into the snapshot, the records
+    it covers are moved to a sealed segment and new records keep being
+    appended to a fresh log.
+
+    Attributes:
+        path (str): The path of the log file.
+        sealed_path (str): The path of the segment being compacted.
+        record_count (int): The number of records in the log, sealed
+        segment included.
+        durability (str): How far appends are pushed to disk, one of
+        "none", "flush" (the log is fsynced) or "fsync" (the log and,
+        when it is created, its directory are fsynced).
+    """
+
+    def __init__(self, path, durability="fsync"):
+        """
+        Initializes a journal stored at path.
+
+        Args:
+            path (str): The path of the log file.
+            durability (str): How far appends are pushed to disk.
+        """
+        self.path = path
+        self.durability = durability
+        self.sealed_path = path + ".sealed"
+        self.record_count = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def put_record(key, data, replace=False, deleted=()):
+        """
+        Builds a put record for the object stored under key.
+
+        Args:
+            key (str): The storage key, "<class name>.<id>".
+            data (dict): The changed fields of the object.
+            replace (bool): Whether data is the whole object, which
+            replaces the fields logged or stored before.
+            deleted (iterable): The names of the attributes deleted.
+
+        Returns:
+            dict: The log record.
+        """
+        class_name, obj_id = key.split(".", 1)
+        record = {"op": "put", "class": class_name, "id": obj_id,
+                  "data": data}
+        if replace:
+            record["replace"] = True
+        if deleted:
+            record["deleted"] = sorted(deleted)
+        return record
+
+    @staticmethod
+    def delete_record(key):
+        """
+        Builds a delete record for the object stored under key.
+
+        Args:
+            key (str): The storage key, "<class name>.<id>".
+
+        Returns:
+            dict: The log record.
+        """
+        class_name, obj_id = key.split(".", 1)
+        return {"op": "delete", "class": class_name, "id": obj_id}
+
+    def append(self, records):
+        """
+        Appends records to the end of the log.
+
+        A torn last line, left behind by a crash in the middle of an
+        earlier append, is cut off first, so that the new records do
+        not continue it.
+
+        Args:
+            records (list): The records to write, in mutation order.
+        """
+        if not records:
+            return
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with self.lock:
+            created = not os.path.isfile(self.path)
+            if not created:
+                self.__cut_torn_tail()
+            with open(self.path, "a", encoding="utf-8") as log_file:
+                log_file.write(lines)
+                if self.durability != "none":
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+            if created and self.durability == "fsync":
+                fsync_directory(self.path)
+            self.record_count += len(records)
+
+    def __cut_torn_tail(self):
+        """
+        Truncates the log after its last complete line.
+        """
+        with open(self.path, "rb+") as log_file:
+            end = log_file.seek(0, os.SEEK_END)
+            if not end:
+                return
+            log_file.seek(end - 1)
+            if log_file.read(1) == b"\n":
+                return
+            position = end - 1
+            while position > 0:
+                start = max(position - 4096, 0)
+                log_file.seek(start)
+                newline = log_file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            log_file.truncate(position)
+            if self.durability != "none":
+                os.fsync(log_file.fileno())
+
+    def records(self, sealed_only=False):
+        """
+        Yields the records stored in the log, oldest first.
+
+        A torn last line, left behind by a crash in the middle of an
+        append, is ignored.
+
+        Args:
+            sealed_only (bool): Whether to stop after the sealed segment.
+
+        Raises:
+            ValueError: If a line other than the last one of a file is
+            not a record.
+        """
+        paths = [self.sealed_path] if sealed_only else \
+            [self.sealed_path, self.path]
+        for path in paths:
+            if not os.path.isfile(path):
+                continue
+            with open(path, "r", encoding="utf-8") as log_file:
+                for number, line in enumerate(log_file, 1):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        if next(log_file, None) is None:
+                            break
+                        raise ValueError(
+                            "corrupt record on line {} of {}".format(
+                                number, path)) from None
+                    yield record
+
+    def overlay(self):
+        """
+        Folds the log into the changes it makes to the snapshot, so that
+        the snapshot can be read one object at a time.
+
+        Returns:
+            dict: The changes, as returned by fold().
+        """
+        changes, self.record_count = self.fold(self.records())
+        return changes
+
+    @staticmethod
+    def fold(records):
+        """
+        Folds records into the changes they make to the snapshot.
+
+        Args:
+            records (iterable): The records to fold, oldest first.
+
+        Returns:
+            tuple: The changes and the number of records. The changes
+            map the storage keys the records touch to None if the object
+            was deleted, or to a (replaced, data, removed) tuple: whether
+            the logged fields replace the snapshot entry instead of
+            updating it, the fields, and the names of the attributes to
+            remove from the snapshot entry before updating it.
+        """
+        changes = {}
+        count = 0
+        for record in records:
+            key = "{}.{}".format(record["class"], record["id"])
+            count += 1
+            if record["op"] == "delete":
+                changes[key] = None
+                continue
+            change = changes.get(key)
+            if change is None or record.get("replace"):
+                change = changes[key] = (
+                    key in changes or record.get("replace", False),
+                    dict(record["data"]), set())
+            else:
+                change[1].update(record["data"])
+            for name in record.get("deleted", ()):
+                change[1].pop(name, None)
+                if not change[0]:
+                    change[2].add(name)
+        return changes, count
+
+    @staticmethod
+    def merge(value, change):
+        """
+        Applies a change from fold() to a snapshot entry.
+
+        Args:
+            value (dict): The serialized object, updated in place.
+            change (tuple): Its change, or None if it was deleted.
+
+        Returns:
+            dict: The entry as the log leaves it, or None if deleted.
+        """
+        if change is None:
+            return None
+        replaced, data, removed = change
+        if replaced:
+            return data
+        for name in removed:
+            value.pop(name, None)
+        value.update(data)
+        return value
+
+    @staticmethod
+    def apply(obj_dict, records):
+        """
+        Applies records to a dictionary of serialized objects.
+
+        Args:
+            obj_dict (dict): The serialized objects, updated in place.
+            records (iterable): The records to apply, oldest first.
+
+        Returns:
+            int: The number of records applied.
+        """
+        count = 0
+        for record in records:
+            key = "{}.{}".format(record["class"], record["id"])
+            if record["op"] == "delete":
+                obj_dict.pop(key, None)
+            elif record.get("replace"):
+                obj_dict[key] = dict(record["data"])
+            else:
+                obj_dict.setdefault(key, {}).update(record["data"])
+            for name in record.get("deleted", ()):
+                obj_dict[key].pop(name, None)
+            count += 1
+        return count
+
+    def size(self):
+        """
+        Returns the size of the log in bytes, sealed segment included.
+        """
+        size = 0
+        for path in (self.sealed_path, self.path):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def seal(self):
+        """
+        Moves the current log to the sealed segment so that it can be
+        compacted while new records go to a fresh log.
+
+        A sealed segment left behind by an interrupted compaction is kept
+        as is, and compacted first.
+
+        Returns:
+            bool: True if there is a sealed segment to compact.
+        """
+        with self.lock:
+            if os.path.isfile(self.sealed_path):
+                return True
+            if not os.path.isfile(self.path):
+                return False
+            os.replace(self.path, self.sealed_path)
+            return True
+
+    def drop_sealed(self, count):
+        """
+        Removes the sealed segment once it is part of the snapshot.
+
+        Args:
+            count (int): The number of records the segment held.
+        """
+        with self.lock:
+            if os.path.isfile(self.sealed_path):
+                os.remove(self.sealed_path)
+            self.record_count = max(self.record_count - count, 0)
+
+    def truncate(self):
+        """
+        Empties the log.
+        """
+        with self.lock:
+            for path in (self.sealed_path, self.path):
+                if os.path.isfile(path):
+                    os.remove(path)
+            self.record_count = 0
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+
+"""
+Registry of the model classes and of their schema.
+
+Every subclass of BaseModel registers itself when it is defined. The
+registry records the attributes each class declares, with their types,
+and derives once the tables the storage and the console look up on
+every object: the classes by name, the declared attributes of each
+class, the types the console converts updated values to, and the
+attributes holding ids, whose values are interned so that each id is
+kept once in memory however many objects refer to it.
+"""
+
+import importlib
+import sys
+
+MODEL_MODULES = ("models.base_model", "models.user", "models.state",
+                 "models.city", "models.amenity", "models.place",
+                 "models.review")
+
+_classes = {}
+_fields = {}
+_coercions = {}
+_references = {}
+_imported = False
+
+
+def register(cls, fields=None):
+    """
+    Registers a model class.
+
+    Args:
+        cls (type): The class, registered under its name.
+        fields (dict): The attributes the class declares, mapped to
+        their types. Defaults to the public class attributes cls defines
+        itself, typed after their default value.
+    """
+    if fields is None:
+        fields = {
+            name: type(value) for name, value in vars(cls).items()
+            if not name.startswith("_") and not callable(value) and
+            not isinstance(value, (property, staticmethod, classmethod))
+        }
+    _classes[cls.__name__] = cls
+    _fields[cls.__name__] = dict(fields)
+    _coercions.clear()
+    _references.clear()
+
+
+def unregister(class_name):
+    """
+    Removes a class from the registry.
+
+    Args:
+        class_name (str): The name of the class.
+    """
+    _classes.pop(class_name, None)
+    _fields.pop(class_name, None)
+    _coercions.clear()
+    _references.clear()
+
+
+def classes():
+    """
+    Returns the registered classes keyed by name, importing the model
+    modules on the first call so that every class is registered.
+
+    The dictionary is shared and must not be modified.
+    """
+    global _imported
+    if not _imported:
+        for module in MODEL_MODULES:
+            importlib.import_module(module)
+        _imported = True
+    return _classes
+
+
+def attributes():
+    """
+    Returns the attributes each class declares itself, mapped to their
+    types, keyed by class name. The attributes of BaseModel are listed
+    under "BaseModel" only.
+
+    The dictionary is shared and must not be modified.
+    """
+    classes()
+    return _fields
+
+
+def coercions(class_name):
+    """
+    Returns the types the console converts the values of the string and
+    numeric attributes of a class to, inherited attributes included.
+
+    Args:
+        class_name (str): The name of a registered class.
+
+    Returns:
+        dict: Maps attribute names to str, int or float.
+    """
+    table = _coercions.get(class_name)
+    if table is None:
+        table = _coercions[class_name] = {
+            name: kind for name, kind in _schema(class_name).items()
+            if kind in (str, int, float)
+        }
+    return table
+
+
+def references(class_name):
+    """
+    Returns the attributes of a class holding ids: its own id, the
+    foreign keys ("<class>_id") and the lists of ids ("<class>_ids").
+
+    Args:
+        class_name (str): The name of a class.
+
+    Returns:
+        frozenset: The attribute names, empty for unknown classes.
+    """
+    names = _references.get(class_name)
+    if names is None:
+        names = _references[class_name] = frozenset(
+            name for name, kind in _schema(class_name).items()
+            if (kind is str and (name == "id" or name.endswith("_id"))) or
+            (kind is list and name.endswith("_ids"))
+        )
+    return names
+
+
+def intern_references(class_name, data):
+    """
+    Replaces the ids held by a serialized object with their interned
+    copy, so that the objects referring to the same id share one
+    string.
+
+    Args:
+        class_name (str): The class of the object.
+        data (dict): The serialized object, modified in place.
+
+    Returns:
+        dict: data.
+    """
+    for name in references(class_name):
+        value = data.get(name)
+        if type(value) is str:
+            data[name] = sys.intern(value)
+        elif type(value) is list:
+            intern_value(value)
+    return data
+
+
+def intern_value(value):
+    """
+    Returns the interned copy of an id, or value itself after interning
+    the ids it holds if it is a list.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is list:
+        for i, item in enumerate(value):
+            if type(item) is str:
+                value[i] = sys.intern(item)
+    return value
+
+
+def _schema(class_name):
+    """
+    Returns the attributes of a class and their types, inherited
+    attributes included, or an empty dictionary for unknown classes.
+    """
+    cls = classes().get(class_name)
+    schema = {}
+    if cls is not None:
+        for base in reversed(cls.__mro__):
+            schema.update(_fields.get(base.__name__, {}))
+    return schema
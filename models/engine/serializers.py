@@ -0,0 +1,463 @@
+#!/usr/bin/python3
+
+"""
+File formats of the storage engine.
+
+A serializer turns each object into a fragment, cached by FileStorage
+until the object changes, joins the fragments into a file and reads a
+file back one object at a time. Two formats are available:
+
+    "json"   - the historical file.json, a single JSON object mapping
+               storage keys to serialized objects.
+    "binary" - a compact format of length-prefixed records with typed
+               fields, whose field names are numbered in a table written
+               once at the start of the file.
+
+The module also converts files between formats:
+
+    python3 -m models.engine.serializers file.json file.hbnb
+"""
+
+import argparse
+import json
+import struct
+
+from models.engine.atomic import write_atomic
+from models.engine.stream import iter_items
+
+
+class FormatError(ValueError):
+    """
+    Raised when a storage file is not in the expected format.
+    """
+
+
+class JSONSerializer:
+    """
+    Stores objects as one JSON object, in the format of json.dump().
+    """
+
+    name = "json"
+    extension = ".json"
+
+    def __init__(self, fields=()):
+        """
+        Initializes a JSON serializer. fields is unused.
+        """
+
+    def encode(self, key, data):
+        """
+        Serializes one object.
+
+        Args:
+            key (str): The storage key of the object.
+            data (dict): The object, as returned by to_dict().
+
+        Returns:
+            str: The "<key>: <object>" fragment.
+        """
+        return "{}: {}".format(json.dumps(key), json.dumps(data))
+
+    def join(self, fragments):
+        """
+        Assembles fragments into the content of a file.
+
+        Args:
+            fragments (iterable): Fragments returned by encode().
+
+        Returns:
+            str: The content of the file.
+        """
+        return "{" + ", ".join(fragments) + "}"
+
+    def read(self, path):
+        """
+        Yields the objects stored in path, one at a time.
+
+        Args:
+            path (str): The file to read.
+
+        Yields:
+            tuple: The storage key and the serialized object.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            yield from iter_items(f)
+
+
+def _write_varint(out, value):
+    """
+    Appends an unsigned LEB128 integer to the bytearray out.
+    """
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos):
+    """
+    Reads an unsigned LEB128 integer from buf at pos.
+
+    Returns:
+        tuple: The integer and the position after it.
+    """
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+
+class BinarySerializer:
+    """
+    Stores objects as length-prefixed binary records.
+
+    The file starts with MAGIC and the length-prefixed JSON header
+    {"fields": [...]}, listing the field names records refer to by
+    number. Each record then holds the storage key and the fields of one
+    object, every value prefixed by a one-byte type tag: None, booleans,
+    ints (zigzag varints), floats (8 bytes), strings (varint length and
+    UTF-8), lists and dicts. Field names missing from the table are
+    stored inline, under number 0.
+
+    Attributes:
+        fields (list): The field names numbered in the header.
+    """
+
+    name = "binary"
+    extension = ".hbnb"
+    MAGIC = b"HBNB\x01"
+
+    def __init__(self, fields=()):
+        """
+        Initializes a binary serializer.
+
+        Args:
+            fields (iterable): The field names to number, usually the
+            attributes declared by FileStorage.attributes().
+        """
+        self.fields = sorted(set(fields))
+        self.__numbers = {name: i + 1 for i, name in enumerate(self.fields)}
+
+    def encode(self, key, data):
+        """
+        Serializes one object.
+
+        Args:
+            key (str): The storage key of the object.
+            data (dict): The object, as returned by to_dict().
+
+        Returns:
+            bytes: The length-prefixed record.
+        """
+        out = bytearray()
+        self.__write_str(out, key)
+        _write_varint(out, len(data))
+        for name, value in data.items():
+            number = self.__numbers.get(name, 0)
+            _write_varint(out, number)
+            if not number:
+                self.__write_str(out, name)
+            self.__write_value(out, value)
+        return _LENGTH.pack(len(out)) + out
+
+    def join(self, fragments):
+        """
+        Assembles fragments into the content of a file.
+
+        Args:
+            fragments (iterable): Fragments returned by encode().
+
+        Returns:
+            bytes: The content of the file.
+        """
+        header = json.dumps({"fields": self.fields}).encode("utf-8")
+        return b"".join([self.MAGIC, _LENGTH.pack(len(header)), header,
+                         *fragments])
+
+    def read(self, path):
+        """
+        Yields the objects stored in path, one at a time.
+
+        Args:
+            path (str): The file to read.
+
+        Yields:
+            tuple: The storage key and the serialized object.
+
+        Raises:
+            FormatError: If path is not a complete binary storage file.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise FormatError("{} is not a binary storage file".format(
+                    path))
+            try:
+                fields = [None] + json.loads(self.__read_record(f))["fields"]
+            except (TypeError, ValueError, KeyError) as error:
+                raise FormatError("Invalid header in {}".format(path)) \
+                    from error
+            while True:
+                record = self.__read_record(f)
+                if record is None:
+                    return
+                try:
+                    yield self.decode(record, fields)
+                except (IndexError, UnicodeDecodeError, struct.error) as error:
+                    raise FormatError("Invalid record in {}".format(path)) \
+                        from error
+
+    @staticmethod
+    def __read_record(f):
+        """
+        Reads the next length-prefixed record, or None at the end.
+        """
+        prefix = f.read(_LENGTH.size)
+        if not prefix:
+            return None
+        if len(prefix) < _LENGTH.size:
+            raise FormatError("Truncated record length")
+        length, = _LENGTH.unpack(prefix)
+        record = f.read(length)
+        if len(record) < length:
+            raise FormatError("Truncated record")
+        return record
+
+    def decode(self, buf, fields, pos=0, end=None):
+        """
+        Decodes one record, without its length prefix.
+
+        Args:
+            buf (bytes): The buffer holding the record.
+            fields (list): The field table of the file, preceded by None
+            for the inline names.
+            pos (int): The position of the record in buf.
+            end (int): The position after the record, len(buf) if None.
+
+        Returns:
+            tuple: The storage key and the serialized object.
+
+        Raises:
+            IndexError: If the record is malformed.
+        """
+        if end is None:
+            end = len(buf)
+        key, pos = self.__read_str(buf, pos)
+        count, pos = _read_varint(buf, pos)
+        data = {}
+        for _ in range(count):
+            number = buf[pos]
+            if 0 < number < 0x80:
+                name = fields[number]
+                pos += 1
+            else:
+                number, pos = _read_varint(buf, pos)
+                if number:
+                    name = fields[number]
+                else:
+                    name, pos = self.__read_str(buf, pos)
+            # Short strings, most of the values, are decoded inline.
+            if buf[pos] == 0x73 and buf[pos + 1] < 0x80:
+                length = buf[pos + 1]
+                pos += 2 + length
+                data[name] = buf[pos - length:pos].decode("utf-8")
+            else:
+                data[name], pos = self.__read_value(buf, pos)
+        if pos != end:
+            raise IndexError("record size mismatch")
+        return key, data
+
+    @staticmethod
+    def __write_str(out, value):
+        """
+        Appends a varint-length-prefixed UTF-8 string to out.
+        """
+        encoded = value.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+
+    @staticmethod
+    def __read_str(buf, pos):
+        """
+        Reads a string written by __write_str() from buf at pos.
+        """
+        length, pos = _read_varint(buf, pos)
+        end = pos + length
+        if end > len(buf):
+            raise IndexError("string past the end of the record")
+        return buf[pos:end].decode("utf-8"), end
+
+    def __write_value(self, out, value):
+        """
+        Appends a tagged value to out.
+        """
+        if isinstance(value, str):
+            out += b"s"
+            self.__write_str(out, value)
+        elif value is None:
+            out += b"N"
+        elif value is True:
+            out += b"T"
+        elif value is False:
+            out += b"F"
+        elif isinstance(value, int):
+            out += b"i"
+            _write_varint(out, value << 1 if value >= 0 else ~value << 1 | 1)
+        elif isinstance(value, float):
+            out += b"f"
+            out += _FLOAT.pack(value)
+        elif isinstance(value, (list, tuple)):
+            out += b"l"
+            _write_varint(out, len(value))
+            for item in value:
+                self.__write_value(out, item)
+        elif isinstance(value, dict):
+            out += b"d"
+            _write_varint(out, len(value))
+            for name, item in value.items():
+                self.__write_str(out, str(name))
+                self.__write_value(out, item)
+        else:
+            raise TypeError("Cannot serialize {!r}".format(value))
+
+    def __read_value(self, buf, pos):
+        """
+        Reads a tagged value from buf at pos.
+
+        Returns:
+            tuple: The value and the position after it.
+        """
+        tag = buf[pos]
+        pos += 1
+        if tag == 0x73:  # s
+            return self.__read_str(buf, pos)
+        if tag == 0x69:  # i
+            value, pos = _read_varint(buf, pos)
+            return (~(value >> 1) if value & 1 else value >> 1), pos
+        if tag == 0x66:  # f
+            return _FLOAT.unpack_from(buf, pos)[0], pos + _FLOAT.size
+        if tag == 0x4E:  # N
+            return None, pos
+        if tag == 0x54:  # T
+            return True, pos
+        if tag == 0x46:  # F
+            return False, pos
+        if tag == 0x6C:  # l
+            count, pos = _read_varint(buf, pos)
+            items = []
+            for _ in range(count):
+                item, pos = self.__read_value(buf, pos)
+                items.append(item)
+            return items, pos
+        if tag == 0x64:  # d
+            count, pos = _read_varint(buf, pos)
+            items = {}
+            for _ in range(count):
+                name, pos = self.__read_str(buf, pos)
+                items[name], pos = self.__read_value(buf, pos)
+            return items, pos
+        raise IndexError("unknown type tag {}".format(tag))
+
+
+SERIALIZERS = {
+    JSONSerializer.name: JSONSerializer,
+    BinarySerializer.name: BinarySerializer
+}
+
+
+def get_serializer(name, fields=()):
+    """
+    Returns a serializer for a format.
+
+    Args:
+        name (str): The format, a key of SERIALIZERS.
+        fields (iterable): The field names the format may number.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if name not in SERIALIZERS:
+        raise ValueError("format must be one of {}".format(
+            ", ".join(SERIALIZERS)))
+    return SERIALIZERS[name](fields)
+
+
+def schema_fields(attributes):
+    """
+    Returns the field names a schema declares.
+
+    Args:
+        attributes (dict): Maps class names to their attributes, as
+        FileStorage.attributes() does.
+
+    Returns:
+        set: The attribute names, and "__class__".
+    """
+    return {name for names in attributes.values() for name in names} | \
+        {"__class__"}
+
+
+def format_of(path):
+    """
+    Guesses the format of path from its extension, defaulting to JSON.
+    """
+    for serializer in SERIALIZERS.values():
+        if path.endswith(serializer.extension):
+            return serializer.name
+    return JSONSerializer.name
+
+
+def convert(src, dst, src_format=None, dst_format=None, fields=()):
+    """
+    Converts a storage file to another format, one object at a time.
+
+    Args:
+        src (str): The file to read.
+        dst (str): The file to write.
+        src_format (str): The format of src, guessed from its extension
+        if None.
+        dst_format (str): The format of dst, guessed from its extension
+        if None.
+        fields (iterable): The field names the binary format numbers.
+
+    Returns:
+        int: The number of objects converted.
+    """
+    reader = get_serializer(src_format or format_of(src), fields)
+    writer = get_serializer(dst_format or format_of(dst), fields)
+    fragments = [writer.encode(key, data) for key, data in reader.read(src)]
+    write_atomic(dst, writer.join(fragments))
+    return len(fragments)
+
+
+def main():
+    """
+    Converts a storage file from the command line.
+    """
+    from models.engine import registry
+
+    parser = argparse.ArgumentParser(
+        description="Converts a storage file to another format.")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--from", dest="src_format", choices=SERIALIZERS)
+    parser.add_argument("--to", dest="dst_format", choices=SERIALIZERS)
+    args = parser.parse_args()
+    count = convert(args.src, args.dst, args.src_format, args.dst_format,
+                    schema_fields(registry.attributes()))
+    print("{} objects converted".format(count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+
+"""
+Read-only, memory-mapped snapshots of the storage.
+
+A snapshot holds the objects as binary records (the format of
+BinarySerializer), sorted by storage key and followed by an index of
+their offsets. Opening one only maps the file: looking up an object
+bisects the index and decodes that single record, so the cost of a
+short-lived process reading a few objects does not depend on the size
+of the dataset.
+
+Layout:
+
+    MAGIC
+    uint32 length, header    JSON {"fields": [...]}
+    records                  uint32 length, record, sorted by key
+    index                    uint64 offset of each record
+    uint64 index offset, uint64 record count, MAGIC
+
+Snapshots are built from any storage file:
+
+    python3 -m models.engine.snapshot file.json file.snap
+"""
+
+import argparse
+import json
+import mmap
+import struct
+
+from models.engine.atomic import write_atomic
+from models.engine.serializers import SERIALIZERS, BinarySerializer, \
+    FormatError, format_of, get_serializer, schema_fields
+
+MAGIC = b"HBNBSNAP\x01"
+_LENGTH = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+_FOOTER = struct.Struct("<QQ")
+
+
+def write_snapshot(path, items, fields=()):
+    """
+    Writes a snapshot of objects.
+
+    Args:
+        path (str): The snapshot file.
+        items (iterable): The (storage key, serialized object) pairs.
+        fields (iterable): The field names to number in the header.
+
+    Returns:
+        int: The number of objects written.
+    """
+    serializer = BinarySerializer(fields)
+    records = sorted(
+        (key.encode("utf-8"), serializer.encode(key, data))
+        for key, data in items
+    )
+    header = json.dumps({"fields": serializer.fields}).encode("utf-8")
+    parts = [MAGIC, _LENGTH.pack(len(header)), header]
+    offset = len(MAGIC) + _LENGTH.size + len(header)
+    offsets = []
+    for _, record in records:
+        offsets.append(_OFFSET.pack(offset))
+        parts.append(record)
+        offset += len(record)
+    parts += offsets
+    parts.append(_FOOTER.pack(offset, len(records)))
+    parts.append(MAGIC)
+    write_atomic(path, b"".join(parts))
+    return len(records)
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file.
+
+    Attributes:
+        path (str): The snapshot file.
+        fields (list): The field table of the records, preceded by None.
+    """
+
+    def __init__(self, path):
+        """
+        Maps a snapshot file.
+
+        Args:
+            path (str): The snapshot file.
+
+        Raises:
+            FormatError: If path is not a complete snapshot.
+        """
+        self.path = path
+        self.__serializer = BinarySerializer()
+        with open(path, "rb") as f:
+            try:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise FormatError("{} is empty".format(path)) from error
+        size = len(self.__map)
+        footer = size - len(MAGIC) - _FOOTER.size
+        if footer < len(MAGIC) or \
+                self.__map[:len(MAGIC)] != MAGIC or \
+                self.__map[size - len(MAGIC):] != MAGIC:
+            self.close()
+            raise FormatError("{} is not a complete snapshot".format(path))
+        self.__index, self.__count = _FOOTER.unpack_from(self.__map, footer)
+        length, = _LENGTH.unpack_from(self.__map, len(MAGIC))
+        start = len(MAGIC) + _LENGTH.size
+        self.fields = [None] + json.loads(
+            self.__map[start:start + length])["fields"]
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self.__map.close()
+
+    def __len__(self):
+        """
+        Returns the number of objects in the snapshot.
+        """
+        return self.__count
+
+    def __offset(self, i):
+        """
+        Returns the offset of the i-th record.
+        """
+        return _OFFSET.unpack_from(self.__map,
+                                   self.__index + i * _OFFSET.size)[0]
+
+    def __key(self, i):
+        """
+        Returns the UTF-8 storage key of the i-th record.
+        """
+        pos = self.__offset(i) + _LENGTH.size
+        length = self.__map[pos]
+        if length < 0x80:
+            return self.__map[pos + 1:pos + 1 + length]
+        return self.__record(i)[0].encode("utf-8")
+
+    def __record(self, i):
+        """
+        Decodes the i-th record.
+
+        Returns:
+            tuple: The storage key and the serialized object.
+        """
+        offset = self.__offset(i)
+        length, = _LENGTH.unpack_from(self.__map, offset)
+        start = offset + _LENGTH.size
+        try:
+            return self.__serializer.decode(self.__map, self.fields, start,
+                                            start + length)
+        except (IndexError, UnicodeDecodeError, struct.error) as error:
+            raise FormatError("Invalid record in {}".format(self.path)) \
+                from error
+
+    def __bisect(self, key):
+        """
+        Returns the position of the first record whose key is not less
+        than key, a UTF-8 encoded key.
+        """
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __bounds(self, class_name):
+        """
+        Returns the positions of the first record of class_name and of
+        the record after its last one, or of every record if None.
+        """
+        if class_name is None:
+            return 0, self.__count
+        prefix = class_name.encode("utf-8")
+        return self.__bisect(prefix + b"."), self.__bisect(prefix + b"/")
+
+    def get(self, key):
+        """
+        Decodes the object stored under key.
+
+        Args:
+            key (str): The storage key.
+
+        Returns:
+            dict: The serialized object, or None if there is none.
+        """
+        encoded = key.encode("utf-8")
+        i = self.__bisect(encoded)
+        if i < self.__count and self.__key(i) == encoded:
+            return self.__record(i)[1]
+        return None
+
+    def count(self, class_name=None):
+        """
+        Counts the objects of a class without decoding them.
+
+        Args:
+            class_name (str): The class, or None for every object.
+
+        Returns:
+            int: The number of objects.
+        """
+        low, high = self.__bounds(class_name)
+        return high - low
+
+    def items(self, class_name=None):
+        """
+        Yields the objects of a class, in key order.
+
+        Args:
+            class_name (str): The class, or None for every object.
+
+        Yields:
+            tuple: The storage key and the serialized object.
+        """
+        low, high = self.__bounds(class_name)
+        for i in range(low, high):
+            yield self.__record(i)
+
+
+def main():
+    """
+    Builds a snapshot from a storage file on the command line.
+    """
+    from models.engine import registry
+
+    parser = argparse.ArgumentParser(
+        description="Builds a read-only snapshot of a storage file.")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--from", dest="src_format", choices=SERIALIZERS)
+    args = parser.parse_args()
+    reader = get_serializer(args.src_format or format_of(args.src))
+    count = write_snapshot(args.dst, reader.read(args.src),
+                           schema_fields(registry.attributes()))
+    print("{} objects written".format(count))
+
+
+if __name__ == "__main__":
+    main()
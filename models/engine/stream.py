@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+
+"""
+Incremental reader for the storage files.
+
+json.load() builds the whole file as a dictionary of dictionaries before
+FileStorage turns it into model instances, so a reload needs room for
+both. iter_items() reads the top-level object in chunks and yields one
+entry at a time instead, so each serialized object can be dropped as
+soon as its instance is built.
+"""
+
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """
+    The unread part of a text file, refilled chunk by chunk.
+    """
+
+    def __init__(self, text_file, chunk_size):
+        """
+        Initializes a buffer over text_file.
+        """
+        self.file = text_file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Reads one more chunk, dropping the consumed text first.
+
+        Returns:
+            bool: False if the end of the file was already reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        """
+        Builds the error raised on malformed input.
+        """
+        return json.JSONDecodeError(message, self.text, self.pos)
+
+    def skip(self):
+        """
+        Skips whitespace and returns the next character, or "" at the
+        end of the file.
+        """
+        while True:
+            while self.pos < len(self.text) and \
+                    self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        """
+        Consumes the next non-whitespace character, one of chars.
+
+        Returns:
+            str: The character consumed.
+        """
+        char = self.skip()
+        if not char or char not in chars:
+            raise self.error("Expecting one of {!r}".format(chars))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decodes the next JSON value, reading more chunks until it is
+        complete.
+        """
+        self.skip()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.text) and not self.eof and \
+                    not isinstance(value, (dict, list, str)):
+                # A number or literal may go on in the next chunk.
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(text_file, chunk_size=1 << 20):
+    """
+    Yields the entries of the JSON object stored in text_file.
+
+    Args:
+        text_file (file): A file opened in text mode, holding one JSON
+        object.
+        chunk_size (int): The number of characters read at a time.
+
+    Yields:
+        tuple: The key and the decoded value of each entry, in file
+        order.
+
+    Raises:
+        json.JSONDecodeError: If the file is empty or malformed.
+    """
+    buf = _Buffer(text_file, chunk_size)
+    buf.expect("{")
+    if buf.skip() == "}":
+        buf.pos += 1
+    else:
+        while True:
+            key = buf.value()
+            if not isinstance(key, str):
+                raise buf.error("Expecting property name")
+            buf.expect(":")
+            yield key, buf.value()
+            if buf.expect(",}") == "}":
+                break
+    if buf.skip():
+        raise buf.error("Extra data")
@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 
 from models.base_model import BaseModel
-from models import storage
 
 
 class User(BaseModel):
@@ -2,12 +2,14 @@
 
 import os
 import sys
+import tempfile
 import unittest
 
 from io import StringIO
 from unittest.mock import patch
 from models import storage
 from models.engine.file_storage import FileStorage
+from models.user import User
 from console import HBNBCommand
 
 
@@ -1791,5 +1793,437 @@ class TestHBNBCommandUpdate(unittest.TestCase):
                 )
 
 
+class TestHBNBCommandRange(unittest.TestCase):
+    """
+    Unit tests for testing the 'range' command
+    in the HBNB command interpreter.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up the test class environment.
+        """
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Tears down the test class environment.
+        """
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def create_place(self, price, guests):
+        """
+        Creates a Place through the console and returns its id.
+        """
+        with patch("sys.stdout", new=StringIO()) as f:
+            HBNBCommand().onecmd("create Place")
+            place_id = f.getvalue().strip()
+        HBNBCommand().onecmd(
+            f"update Place {place_id} price_by_night {price}")
+        HBNBCommand().onecmd(f"update Place {place_id} max_guest {guests}")
+        return place_id
+
+    def test_range_errors(self):
+        """
+        Tests 'range' command with missing or invalid arguments.
+        """
+        cases = {
+            "range": "** class name missing **",
+            "range MyModel": "** class doesn't exist **",
+            "range Place": "** attribute name missing **",
+            "range Place max_guest 1": "** value missing **",
+            "range Place max_guest one -": "** value must be a number **"
+        }
+        for cmd, proper_output in cases.items():
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual(proper_output, f.getvalue().strip())
+
+    def test_range_filters_places(self):
+        """
+        Tests 'range' command over several attributes and notations.
+        """
+        cheap_big = self.create_place(80, 6)
+        cheap_small = self.create_place(50, 2)
+        pricey_big = self.create_place(300, 8)
+        commands = [
+            "range Place price_by_night - 99 max_guest 4 -",
+            "Place.range(price_by_night, 0, 99)"
+        ]
+        expected = [{cheap_big}, {cheap_big, cheap_small}]
+        for cmd, ids in zip(commands, expected):
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    output = f.getvalue()
+                for place_id in (cheap_big, cheap_small, pricey_big):
+                    self.assertEqual(place_id in output, place_id in ids)
+
+
+class TestHBNBCommandStats(unittest.TestCase):
+    """
+    Unit tests for testing the 'stats' command
+    in the HBNB command interpreter.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up the test class environment.
+        """
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Tears down the test class environment.
+        """
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_stats_errors(self):
+        """
+        Tests 'stats' command with missing or invalid arguments.
+        """
+        cases = {
+            "stats": "** class name missing **",
+            "stats MyModel": "** class doesn't exist **",
+            "stats Place": "** attribute name missing **"
+        }
+        for cmd, proper_output in cases.items():
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual(proper_output, f.getvalue().strip())
+
+    def test_stats_places(self):
+        """
+        Tests 'stats' command overall and per group.
+        """
+        for price, city_id in ((10, "a"), (30, "a"), (20, "b")):
+            with patch("sys.stdout", new=StringIO()) as f:
+                HBNBCommand().onecmd("create Place")
+                place_id = f.getvalue().strip()
+            HBNBCommand().onecmd(
+                f"update Place {place_id} price_by_night {price}")
+            HBNBCommand().onecmd(f"update Place {place_id} city_id {city_id}")
+        with patch("sys.stdout", new=StringIO()) as f:
+            HBNBCommand().onecmd("stats Place price_by_night")
+            self.assertIn("'mean': 20.0", f.getvalue())
+            self.assertIn("'p50': 20.0", f.getvalue())
+        with patch("sys.stdout", new=StringIO()) as f:
+            HBNBCommand().onecmd('Place.stats("price_by_night", "city_id")')
+            self.assertIn("'a': {'count': 2", f.getvalue())
+        with patch("sys.stdout", new=StringIO()) as f:
+            HBNBCommand().onecmd("stats Place price_by_night amenity_ids")
+            self.assertEqual("{}", f.getvalue().strip())
+
+
+class TestHBNBCommandGeo(unittest.TestCase):
+    """
+    Unit tests for testing the 'within', 'near' and 'nearest' commands
+    in the HBNB command interpreter.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up the test class environment with three places: two in
+        Paris and one in London.
+        """
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        cls.ids = {}
+        for name, lat, lng in (("louvre", 48.8606, 2.3376),
+                               ("eiffel", 48.8584, 2.2945),
+                               ("london", 51.5072, -0.1276)):
+            with patch("sys.stdout", new=StringIO()) as f:
+                HBNBCommand().onecmd("create Place")
+                cls.ids[name] = f.getvalue().strip()
+            HBNBCommand().onecmd(
+                f"Place.update({cls.ids[name]}, "
+                f"{{'latitude': {lat}, 'longitude': {lng}}})")
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Tears down the test class environment.
+        """
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def found(self, cmd):
+        """
+        Runs cmd and returns the names of the places it printed, in order.
+        """
+        with patch("sys.stdout", new=StringIO()) as f:
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+            output = f.getvalue()
+        positions = {output.find(place_id): name
+                     for name, place_id in self.ids.items()
+                     if place_id in output}
+        return [positions[position] for position in sorted(positions)]
+
+    def test_geo_errors(self):
+        """
+        Tests geographic commands with missing or invalid arguments.
+        """
+        cases = {
+            "near": "** class name missing **",
+            "nearest MyModel 0 0 1": "** class doesn't exist **",
+            "near Place 48.8 2.3": "** value missing **",
+            "within Place 48 2 north 3": "** value must be a number **"
+        }
+        for cmd, proper_output in cases.items():
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual(proper_output, f.getvalue().strip())
+
+    def test_within(self):
+        """
+        Tests 'within' command with a box around Paris.
+        """
+        self.assertEqual(
+            sorted(self.found("within Place 48.8 2.2 48.9 2.4")),
+            ["eiffel", "louvre"]
+        )
+
+    def test_near(self):
+        """
+        Tests 'near' command, in space and dot notation.
+        """
+        self.assertEqual(self.found("near Place 48.8606 2.3376 1"),
+                         ["louvre"])
+        self.assertEqual(self.found("Place.near(48.86, 2.30, 500)"),
+                         ["eiffel", "louvre", "london"])
+
+    def test_nearest(self):
+        """
+        Tests 'nearest' command.
+        """
+        self.assertEqual(self.found("nearest Place 51 0 2"),
+                         ["london", "eiffel"])
+
+
+class TestHBNBCommandAmenities(unittest.TestCase):
+    """
+    Unit tests for testing the 'amenities' command
+    in the HBNB command interpreter.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up the test class environment.
+        """
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Tears down the test class environment.
+        """
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_amenities_errors(self):
+        """
+        Tests 'amenities' command with missing or invalid arguments.
+        """
+        cases = {
+            "amenities": "** class name missing **",
+            "amenities MyModel all 1": "** class doesn't exist **",
+            "amenities Place one 1": "** match must be all or any **",
+            "amenities Place all": "** amenity id missing **"
+        }
+        for cmd, proper_output in cases.items():
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual(proper_output, f.getvalue().strip())
+
+    def test_amenities_filters_places(self):
+        """
+        Tests 'amenities' command after updating amenity_ids.
+        """
+        ids = []
+        for amenities in (["wifi", "tv"], ["wifi"]):
+            with patch("sys.stdout", new=StringIO()) as f:
+                HBNBCommand().onecmd("create Place")
+                ids.append(f.getvalue().strip())
+            HBNBCommand().onecmd(
+                f"Place.update({ids[-1]}, {{'amenity_ids': {amenities}}})")
+        expected = {
+            "amenities Place all wifi tv": [ids[0]],
+            "Place.amenities(any, tv, pool)": [ids[0]],
+            "amenities Place all wifi": ids
+        }
+        for cmd, found in expected.items():
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    output = f.getvalue()
+                for place_id in ids:
+                    self.assertEqual(place_id in output, place_id in found)
+
+
+class TestHBNBCommandSearch(unittest.TestCase):
+    """
+    Unit tests for testing the 'search' command
+    in the HBNB command interpreter.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up the test class environment.
+        """
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Tears down the test class environment.
+        """
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_search_missing_words(self):
+        """
+        Tests 'search' command without words.
+        """
+        for cmd in ("search", "search Review", "Review.search()"):
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual("** search words missing **",
+                                     f.getvalue().strip())
+
+    def test_search_updated_text(self):
+        """
+        Tests 'search' command after updating a review text.
+        """
+        with patch("sys.stdout", new=StringIO()) as f:
+            HBNBCommand().onecmd("create Review")
+            review_id = f.getvalue().strip()
+        HBNBCommand().onecmd(
+            f'update Review {review_id} text "Lovely garden view"')
+        for cmd in ("search garden", 'Review.search("garden view")',
+                    "search Place garden"):
+            with self.subTest(cmd=cmd):
+                with patch("sys.stdout", new=StringIO()) as f:
+                    self.assertFalse(HBNBCommand().onecmd(cmd))
+                    self.assertEqual(review_id in f.getvalue(),
+                                     "Place" not in cmd)
+
+
+class TestHBNBCommandReadOnly(unittest.TestCase):
+    """
+    Unit tests for testing the commands that change objects
+    on a read-only storage.
+    """
+
+    def setUp(self):
+        """
+        Sets up a storage in snapshot mode with one user.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, "file.snap")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.user_id = User().id
+        FileStorage(file_path=os.path.join(self.tmp_dir.name, "file.json")) \
+            .write_snapshot(path)
+        self.storage = FileStorage(snapshot=path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Closes the snapshot and removes the temporary directory.
+        """
+        self.storage.snapshot.close()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        FileStorage._FileStorage__loaded = set()
+        self.tmp_dir.cleanup()
+
+    def test_read_only(self):
+        """
+        Tests that 'create', 'update' and 'destroy' change nothing.
+        """
+        cmds = ("create User",
+                f"update User {self.user_id} first_name Betty",
+                f"destroy User {self.user_id}")
+        with patch("console.storage", self.storage):
+            for cmd in cmds:
+                with self.subTest(cmd=cmd):
+                    with patch("sys.stdout", new=StringIO()) as f:
+                        self.assertFalse(HBNBCommand().onecmd(cmd))
+                        self.assertEqual("** storage is read-only **",
+                                         f.getvalue().strip())
+            self.assertEqual(self.storage.count("User"), 1)
+            self.assertEqual(
+                self.storage.get("User", self.user_id).first_name, "")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -10,7 +10,7 @@ import re
 import time
 import uuid
 
-from models.base_model import BaseModel
+from models.base_model import BaseModel, new_id, parse_datetime
 from models.engine.file_storage import FileStorage
 from models import storage
 
@@ -101,6 +101,27 @@ class TestBaseModel(unittest.TestCase):
         ids = [BaseModel().id for _ in range(1000)]
         self.assertEqual(len(set(ids)), len(ids))
 
+    def test_new_id(self):
+        """
+        Test that generated ids are distinct version 4 UUIDs.
+        """
+        ids = [new_id() for _ in range(10000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        for value in ids[:100]:
+            parsed = uuid.UUID(value)
+            self.assertEqual(str(parsed), value)
+            self.assertEqual(parsed.version, 4)
+            self.assertEqual(parsed.variant, uuid.RFC_4122)
+
+    def test_build(self):
+        """
+        Test that build() creates an instance without storing it.
+        """
+        instance = BaseModel.build({"name": "Loft"})
+        self.assertEqual(instance.name, "Loft")
+        self.assertEqual(instance.created_at, instance.updated_at)
+        self.assertNotIn("BaseModel." + instance.id, storage.all())
+
     def test_save(self):
         """
         Test the public instance's method save().
@@ -145,6 +166,21 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(serialized_dict["name"], base_model.name)
         self.assertEqual(serialized_dict["age"], base_model.age)
 
+    def test_to_dict_cache(self):
+        """
+        Test that to_dict() is kept until an attribute changes.
+        """
+        base_model = BaseModel()
+        base_model.name = "Betty"
+        serialized_dict = base_model.to_dict()
+        serialized_dict["name"] = "Holberton"
+        self.assertEqual(base_model.to_dict()["name"], "Betty")
+        base_model.name = "Alchemist"
+        self.assertEqual(base_model.to_dict()["name"], "Alchemist")
+        del base_model.name
+        self.assertNotIn("name", base_model.to_dict())
+        self.assertNotIn("_BaseModel__serialized", base_model.__dict__)
+
     def test_to_dict_no_args(self):
         """
         Test to_dict() without arguments.
@@ -192,6 +228,26 @@ class TestBaseModel(unittest.TestCase):
         instance = BaseModel(**custom_dict)
         self.assertEqual(instance.to_dict(), custom_dict)
 
+    def test_kwargs_datetime_without_microseconds(self):
+        """
+        Test instantiation with datetimes isoformat() wrote without
+        microseconds.
+        """
+        instance = BaseModel(created_at="2023-05-01T10:20:30",
+                             updated_at="2023-05-01T10:20:30.000250")
+        self.assertEqual(instance.created_at, datetime(2023, 5, 1, 10, 20, 30))
+        self.assertEqual(instance.updated_at.microsecond, 250)
+
+    def test_parse_datetime(self):
+        """
+        Test that parse_datetime() reverses isoformat().
+        """
+        for value in (datetime(2043, 11, 25, 23, 45, 55, 123456),
+                      datetime(2000, 1, 1)):
+            self.assertEqual(parse_datetime(value.isoformat()), value)
+        with self.assertRaises(ValueError):
+            parse_datetime("yesterday")
+
     def test_save_calls_storage_save(self):
         """
         Test to ensure that storage.save() is called from save().
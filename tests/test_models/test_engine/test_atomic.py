@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Unit test module for the atomic file writes.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models.engine.atomic import check_durability, write_atomic
+
+
+class TestWriteAtomic(unittest.TestCase):
+    """
+    Test cases for write_atomic().
+    """
+
+    def setUp(self):
+        """
+        Set up a file in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("old")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.tmp_dir.cleanup()
+
+    def read(self):
+        """
+        Returns the content of the file.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_write(self):
+        """
+        Test that every durability level replaces the content.
+        """
+        for durability in ("none", "flush", "fsync"):
+            with self.subTest(durability=durability):
+                write_atomic(self.path, durability, durability)
+                self.assertEqual(self.read(), durability)
+                self.assertEqual(os.listdir(self.tmp_dir.name),
+                                 ["file.json"])
+
+    def test_fsync(self):
+        """
+        Test which durability levels fsync the data.
+        """
+        for durability, calls in (("none", 0), ("flush", 1), ("fsync", 2)):
+            with self.subTest(durability=durability):
+                with patch("models.engine.atomic.os.fsync") as fsync:
+                    write_atomic(self.path, "new", durability)
+                self.assertEqual(fsync.call_count, calls)
+
+    def test_crash_keeps_previous_version(self):
+        """
+        Test that a write interrupted before the rename leaves the file
+        untouched.
+        """
+        with patch("models.engine.atomic.os.replace",
+                   side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                write_atomic(self.path, "new")
+        self.assertEqual(self.read(), "old")
+
+    def test_check_durability(self):
+        """
+        Test that unknown durability levels are rejected.
+        """
+        check_durability("fsync")
+        with self.assertRaises(ValueError):
+            check_durability("always")
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""
+Unit test module for the column index and its aggregates.
+"""
+import os
+import tempfile
+import unittest
+from array import array
+from unittest.mock import patch
+
+from models.engine import columns
+from models.engine.columns import ColumnIndex
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+class TestColumnIndex(unittest.TestCase):
+    """
+    Test cases for the ColumnIndex class.
+    """
+
+    def setUp(self):
+        """
+        Set up an index over three places.
+        """
+        FileStorage._FileStorage__objects = {}
+        self.index = ColumnIndex("Place", ["price_by_night"], ["city_id"])
+        self.places = []
+        for price, city_id in ((10, "a"), (20, "b"), ("free", "a")):
+            place = Place()
+            place.price_by_night = price
+            place.city_id = city_id
+            self.places.append(place)
+            self.index.add("Place." + place.id, place)
+
+    def tearDown(self):
+        """
+        Reset FileStorage data.
+        """
+        FileStorage._FileStorage__objects = {}
+
+    def test_add(self):
+        """
+        Test that each object gets a row, NaN for values that are not
+        numbers.
+        """
+        column = self.index.columns["price_by_night"]
+        self.assertEqual(list(column[:2]), [10.0, 20.0])
+        self.assertNotEqual(column[2], column[2])
+        self.assertEqual(list(self.index.groups["city_id"]), [0, 1, 0])
+        self.assertEqual(self.index.labels["city_id"], ["a", "b"])
+
+    def test_unhashable_group(self):
+        """
+        Test that group values that are not hashable are not grouped.
+        """
+        index = ColumnIndex("Place", ["price_by_night"], ["amenity_ids"])
+        place = self.places[0]
+        place.amenity_ids = ["wifi"]
+        index.add("Place." + place.id, place)
+        self.assertEqual(list(index.groups["amenity_ids"]), [-1])
+        self.assertEqual(index.labels["amenity_ids"], [])
+
+    def test_remove(self):
+        """
+        Test that the last row replaces a removed one.
+        """
+        first = self.places[0]
+        self.index.remove("Place." + first.id, first)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.keys[0], "Place." + self.places[2].id)
+        self.assertEqual(list(self.index.groups["city_id"]), [0, 1])
+        self.index.remove("Place." + first.id, first)
+        self.assertEqual(len(self.index), 2)
+
+
+class TestAggregates(unittest.TestCase):
+    """
+    Test cases for the aggregates, with and without NumPy.
+    """
+
+    column = array("d", [4.0, float("nan"), 1.0, 3.0, 2.0])
+    codes = array("q", [0, 0, 1, -1, 1])
+
+    def check(self):
+        """
+        Checks every aggregate against known results.
+        """
+        self.assertEqual(columns.summarize(self.column), {
+            "count": 4, "sum": 10.0, "mean": 2.5, "min": 1.0, "max": 4.0
+        })
+        self.assertEqual(columns.summarize(array("d"))["mean"], None)
+        self.assertEqual(
+            columns.summarize_groups(self.column, self.codes, ["a", "b"]),
+            {"a": {"count": 1, "sum": 4.0, "mean": 4.0, "min": 4.0,
+                   "max": 4.0},
+             "b": {"count": 2, "sum": 3.0, "mean": 1.5, "min": 1.0,
+                   "max": 2.0}})
+        result = columns.percentiles(self.column, [0, 50, 100])
+        self.assertEqual([round(value, 6) for value in result],
+                         [1.0, 2.5, 4.0])
+        self.assertEqual(columns.percentiles([], [50]), [None])
+        counts, edges = columns.histogram(self.column, 3)
+        self.assertEqual(counts, [1, 1, 2])
+        self.assertEqual([round(edge, 6) for edge in edges],
+                         [1.0, 2.0, 3.0, 4.0])
+
+    @unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """
+        Test the vectorized aggregates.
+        """
+        self.check()
+
+    def test_python(self):
+        """
+        Test the aggregates computed without NumPy.
+        """
+        with patch("models.engine.columns.numpy", None):
+            self.check()
+
+
+class TestFileStorageAggregates(unittest.TestCase):
+    """
+    Test cases for the aggregates of FileStorage.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage holding four places.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(
+            file_path=os.path.join(self.tmp_dir.name, "file.json"))
+        self.places = []
+        for price, city_id in ((10, "a"), (30, "a"), (20, "b"), (40, "b")):
+            place = Place()
+            place.price_by_night = price
+            place.city_id = city_id
+            self.places.append(place)
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        self.tmp_dir.cleanup()
+
+    def test_aggregate(self):
+        """
+        Test the aggregates of a class, overall and grouped.
+        """
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night"),
+                         {"count": 4, "sum": 100.0, "mean": 25.0,
+                          "min": 10.0, "max": 40.0})
+        groups = self.storage.aggregate(Place, "price_by_night",
+                                        by="city_id")
+        self.assertEqual({city: result["mean"]
+                          for city, result in groups.items()},
+                         {"a": 20.0, "b": 30.0})
+        self.assertEqual(self.storage.percentiles(Place, "price_by_night",
+                                                  [50]), [25.0])
+        self.assertEqual(self.storage.histogram(Place, "max_guest", 2),
+                         ([0, 4], [-0.5, 0.0, 0.5]))
+
+    def test_follows_updates(self):
+        """
+        Test that the columns follow saved changes and deletions.
+        """
+        self.places[0].price_by_night = 90
+        self.storage.new(self.places[0])
+        self.storage.delete(self.places[1])
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night"),
+                         {"count": 3, "sum": 150.0, "mean": 50.0,
+                          "min": 20.0, "max": 90.0})
+
+    def test_undeclared_attribute(self):
+        """
+        Test the aggregates of an attribute without a column.
+        """
+        self.places[0].rating = 4
+        self.assertEqual(self.storage.aggregate("Place", "rating")["sum"],
+                         4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Unit test module for the compact model instances.
+"""
+import os
+import tempfile
+import unittest
+
+from models.engine import registry
+from models.engine.compact import CompactModel, compact_class
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+
+
+class TestCompactModel(unittest.TestCase):
+    """
+    Test cases for the compact twins of the model classes.
+    """
+
+    def setUp(self):
+        """
+        Set up a serialized place.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        place = Place()
+        place.name = "Loft"
+        place.number_rooms = 2
+        self.value = place.to_dict()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def test_twin(self):
+        """
+        Test that the twin stands in for its class.
+        """
+        twin = compact_class(Place)
+        self.assertIs(compact_class(Place), twin)
+        self.assertEqual(twin.__name__, "Place")
+        self.assertTrue(issubclass(twin, Place))
+        self.assertTrue(issubclass(twin, CompactModel))
+        self.assertIs(registry.classes()["Place"], Place)
+
+    def test_no_dict(self):
+        """
+        Test that the declared attributes are stored in slots.
+        """
+        place = compact_class(Place)(**self.value)
+        self.assertFalse(hasattr(place, "_extra"))
+        self.assertEqual(place.number_rooms, 2)
+        self.assertEqual(place.description, "")
+        self.assertEqual(place.amenity_ids, [])
+
+    def test_same_output(self):
+        """
+        Test that to_dict() and __str__ match a regular instance.
+        """
+        regular = Place(**self.value)
+        place = compact_class(Place)(**self.value)
+        self.assertEqual(place.to_dict(), regular.to_dict())
+        self.assertEqual(str(place), str(regular))
+
+    def test_same_order(self):
+        """
+        Test that attributes are listed in assignment order, as a
+        regular instance lists them.
+        """
+        value = {"rating": 4.5, "number_rooms": 2, "__class__": "Place",
+                 "name": "Loft", "id": "1",
+                 "created_at": self.value["created_at"],
+                 "updated_at": self.value["updated_at"]}
+        regular = Place(**value)
+        place = compact_class(Place)(**value)
+        for obj in (regular, place):
+            obj.description = "Sunny"
+            del obj.number_rooms
+            obj.number_rooms = 3
+        self.assertEqual(list(place.to_dict().items()),
+                         list(regular.to_dict().items()))
+        self.assertEqual(str(place), str(regular))
+        self.assertEqual(str(compact_class(Place)(**regular.to_dict())),
+                         str(Place(**regular.to_dict())))
+
+    def test_extra_attributes(self):
+        """
+        Test that attributes not declared are kept as well.
+        """
+        place = compact_class(Place)(**self.value)
+        place.rating = 4.5
+        self.assertEqual(place.rating, 4.5)
+        self.assertEqual(place.to_dict()["rating"], 4.5)
+        del place.rating
+        with self.assertRaises(AttributeError):
+            place.rating
+        self.assertNotIn("rating", place.to_dict())
+
+    def test_new_instance(self):
+        """
+        Test that a twin created without arguments is initialized.
+        """
+        review = compact_class(Review)()
+        self.assertEqual(len(review.id), 36)
+        self.assertIn("Review." + review.id, FileStorage().all())
+
+
+class TestFileStorageCompactModels(unittest.TestCase):
+    """
+    Test cases for FileStorage with compact_models.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage file in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.place = Place()
+        self.place.name = "Loft"
+        FileStorage(file_path=self.path).save()
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_reload(self):
+        """
+        Test that reload() builds compact instances that can be saved.
+        """
+        storage = FileStorage(file_path=self.path, compact_models=True)
+        storage.reload()
+        place = storage.get(Place, self.place.id)
+        self.assertIsInstance(place, CompactModel)
+        self.assertEqual(place.to_dict(), self.place.to_dict())
+        place.name = "Barn"
+        storage.save()
+        storage = FileStorage(file_path=self.path)
+        storage.reload()
+        self.assertEqual(storage.get(Place, self.place.id).name, "Barn")
+
+
+if __name__ == "__main__":
+    unittest.main()
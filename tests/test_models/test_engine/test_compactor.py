@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+"""
+Unit test module for the Compactor class.
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models.engine.compactor import Compactor
+from models.engine.journal import Journal
+
+
+class TestCompactor(unittest.TestCase):
+    """
+    Test cases for the Compactor class.
+    """
+
+    def setUp(self):
+        """
+        Set up a journal and its snapshot in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmp_dir.name, "file.json")
+        self.journal = Journal(self.snapshot + ".log")
+        self.compactor = Compactor(self.journal, self.snapshot,
+                                   max_records=3)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.tmp_dir.cleanup()
+
+    def log(self, count):
+        """
+        Appends count put records for User.0 .. User.<count - 1>.
+        """
+        self.journal.append([
+            Journal.put_record("User.{}".format(i), {"id": str(i)})
+            for i in range(count)
+        ])
+
+    def test_thresholds(self):
+        """
+        Test that compaction is only needed past a threshold.
+        """
+        self.log(2)
+        self.assertFalse(self.compactor.needed())
+        self.log(1)
+        self.assertTrue(self.compactor.needed())
+        self.compactor.max_records = 100
+        self.compactor.max_bytes = 10
+        self.assertTrue(self.compactor.needed())
+
+    def test_compact_folds_log(self):
+        """
+        Test that compaction writes the snapshot and empties the log.
+        """
+        with open(self.snapshot, "w", encoding="utf-8") as f:
+            json.dump({"State.1": {"id": "1"}}, f)
+        self.log(3)
+        self.journal.append([Journal.delete_record("User.1")])
+        self.compactor.start()
+        self.compactor.wait()
+        with open(self.snapshot, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {
+                "State.1": {"id": "1"},
+                "User.0": {"id": "0"},
+                "User.2": {"id": "2"}
+            })
+        self.assertEqual(self.journal.size(), 0)
+        self.assertEqual(self.journal.record_count, 0)
+        self.assertEqual(self.compactor.stats["compactions"], 1)
+        self.assertGreater(self.compactor.stats["last_bytes_reclaimed"], 0)
+
+    def test_compact_merges_changes(self):
+        """
+        Test that partial records update the snapshot entries and that
+        whole-object records replace them.
+        """
+        with open(self.snapshot, "w", encoding="utf-8") as f:
+            json.dump({"User.0": {"id": "0", "nick": "x"},
+                       "User.1": {"id": "1", "nick": "y"}}, f)
+        self.journal.append([
+            Journal.put_record("User.0", {"email": "a@b.c"},
+                               deleted=["nick"]),
+            Journal.put_record("User.1", {"id": "1"}, replace=True)
+        ])
+        self.assertTrue(self.compactor.compact())
+        with open(self.snapshot, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {
+                "User.0": {"id": "0", "email": "a@b.c"},
+                "User.1": {"id": "1"}
+            })
+
+    def test_durability(self):
+        """
+        Test that the snapshot is written with the durability of the
+        journal.
+        """
+        self.journal.durability = "none"
+        self.log(1)
+        with patch("models.engine.compactor.write_atomic") as write:
+            self.assertTrue(self.compactor.compact())
+        self.assertEqual(write.call_args.args[2], "none")
+
+    def test_records_after_seal_survive(self):
+        """
+        Test that records appended during a compaction stay in the log.
+        """
+        self.log(2)
+        self.assertTrue(self.journal.seal())
+        self.journal.append([Journal.delete_record("User.0")])
+        self.assertEqual(self.journal.overlay(), {
+            "User.0": None,
+            "User.1": (False, {"id": "1"}, set())
+        })
+        self.assertTrue(self.compactor.compact())
+        self.assertEqual(self.journal.record_count, 1)
+        self.assertEqual(self.journal.overlay(), {"User.0": None})
+        with open(self.snapshot, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_nothing_to_compact(self):
+        """
+        Test that compacting an empty log is a no-op.
+        """
+        self.assertFalse(self.compactor.compact())
+        self.assertFalse(os.path.isfile(self.snapshot))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+#!/usr/bin/python3
+"""
+Unit test module for the DBStorage class.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """
+    Test cases for the DBStorage class.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "hbnb.db")
+        self.storage = DBStorage(self.path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Close the database and remove the temporary directory.
+        """
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def place(self, **attributes):
+        """
+        Stores a new place with the given attributes.
+        """
+        place = Place()
+        for name, value in attributes.items():
+            setattr(place, name, value)
+        self.storage.new(place)
+        return place
+
+    def test_new_save_reload(self):
+        """
+        Test that saved objects are read back by another storage.
+        """
+        place = self.place(name="Loft", number_rooms=2, latitude=1.5,
+                           amenity_ids=["wifi"], pets=True)
+        self.storage.save()
+        other = DBStorage(self.path)
+        self.addCleanup(other.close)
+        loaded = other.get(Place, place.id)
+        self.assertIsNot(loaded, place)
+        self.assertEqual(loaded.to_dict(), place.to_dict())
+        self.assertEqual(other.count(), 1)
+
+    def test_unsaved_changes(self):
+        """
+        Test that queries see pending changes and reload() drops them.
+        """
+        place = self.place(name="Loft")
+        self.storage.save()
+        place.name = "Barn"
+        self.storage.touch(place, "name")
+        self.assertEqual(self.storage.lookup(Place, "name", "Barn"),
+                         {"Place." + place.id: place})
+        self.storage.reload()
+        self.assertEqual(self.storage.get(Place, place.id).name, "Loft")
+
+    def test_identity(self):
+        """
+        Test that a row is handed out as one instance.
+        """
+        place = self.place()
+        self.assertIs(self.storage.get(Place, place.id), place)
+        self.assertIs(self.storage.all(Place)["Place." + place.id], place)
+        self.assertIsNone(self.storage.get(Place, "missing"))
+        self.assertIsNone(self.storage.get("Nope", "missing"))
+
+    def test_delete(self):
+        """
+        Test that delete() removes the row.
+        """
+        place = self.place()
+        self.storage.save()
+        self.storage.delete(place)
+        self.storage.save()
+        self.assertIsNone(self.storage.get(Place, place.id))
+        self.assertEqual(self.storage.count(Place), 0)
+
+    def test_all_and_count(self):
+        """
+        Test all() and count() by class.
+        """
+        user = User()
+        self.storage.new(user)
+        self.place()
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertEqual(list(self.storage.all("User")), ["User." + user.id])
+        self.assertEqual(len(self.storage.all()), 2)
+
+    def test_foreign_key_indexes(self):
+        """
+        Test that lookups on foreign keys use an index.
+        """
+        city = City()
+        city.state_id = "s1"
+        self.storage.new(city)
+        self.assertEqual(list(self.storage.lookup(City, "state_id", "s1")),
+                         ["City." + city.id])
+        conn = sqlite3.connect(self.path)
+        self.addCleanup(conn.close)
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM "Review" '
+                            'WHERE place_id = ?', ("p",)).fetchall()
+        self.assertIn("Review_place_id", str(plan))
+
+    def test_range(self):
+        """
+        Test numeric range queries.
+        """
+        cheap = self.place(price_by_night=50, max_guest=2)
+        self.place(price_by_night=150, max_guest=2)
+        self.place(price_by_night="free")
+        self.assertEqual(
+            list(self.storage.range(Place, price_by_night=(None, 100),
+                                    max_guest=(1, 3))),
+            ["Place." + cheap.id])
+
+    def test_aggregate(self):
+        """
+        Test aggregates in SQL and over undeclared attributes.
+        """
+        self.place(price_by_night=50, city_id="a")
+        self.place(price_by_night=150, city_id="a")
+        self.place(price_by_night=100, city_id="b")
+        self.place(price_by_night="free", city_id="b")
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night"),
+                         {"count": 3, "sum": 300.0, "mean": 100.0,
+                          "min": 50.0, "max": 150.0})
+        groups = self.storage.aggregate(Place, "price_by_night",
+                                        by="city_id")
+        self.assertEqual(groups["a"]["mean"], 100.0)
+        self.assertEqual(groups["b"]["count"], 1)
+        self.assertEqual(self.storage.percentiles(
+            Place, "price_by_night", [50]), [100.0])
+        self.place(rating=4)
+        self.assertEqual(self.storage.aggregate(Place, "rating")["sum"], 4.0)
+
+    def test_new_many(self):
+        """
+        Test that objects created in bulk are inserted on save().
+        """
+        places = self.storage.new_many(Place, [{"name": "Loft"}, {}])
+        self.assertIs(self.storage.get(Place, places[0].id), places[0])
+        self.storage.save()
+        other = DBStorage(self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(other.count(Place), 2)
+        self.assertEqual(other.get(Place, places[0].id).name, "Loft")
+
+    def test_class_defaults(self):
+        """
+        Test that attributes left to their class default answer queries
+        as they do in FileStorage.
+        """
+        FileStorage._FileStorage__objects = {}
+        self.addCleanup(setattr, FileStorage, "_FileStorage__objects", {})
+        file_storage = FileStorage(
+            file_path=os.path.join(self.tmp_dir.name, "file.json"))
+        place = self.place(name="Loft")
+        self.storage.save()
+        other = DBStorage(self.path)
+        self.addCleanup(other.close)
+        for storage in (file_storage, self.storage, other):
+            with self.subTest(storage=storage):
+                self.assertEqual(
+                    list(storage.range(Place, price_by_night=(0, 10))),
+                    ["Place." + place.id])
+                self.assertEqual(
+                    storage.aggregate(Place, "max_guest")["count"], 1)
+        self.assertEqual(other.get(Place, place.id).to_dict(),
+                         place.to_dict())
+
+    def test_default_value_set(self):
+        """
+        Test that an attribute set to its class default is read back
+        as set.
+        """
+        place = self.place(name="", number_rooms=0)
+        unset = self.place(name="Loft")
+        self.storage.save()
+        other = DBStorage(self.path)
+        self.addCleanup(other.close)
+        found = other.get(Place, place.id).to_dict()
+        self.assertEqual(found["name"], "")
+        self.assertEqual(found["number_rooms"], 0)
+        self.assertNotIn("number_rooms", other.get(Place, unset.id).to_dict())
+        self.assertEqual(len(other.lookup(Place, "number_rooms", 0)), 2)
+        self.assertEqual(len(other.range(Place, number_rooms=(0, 0))), 2)
+        self.assertEqual(other.aggregate(Place, "number_rooms")["count"], 2)
+
+    def test_contains(self):
+        """
+        Test membership queries on list attributes.
+        """
+        both = self.place(amenity_ids=["wifi", "tv"])
+        wifi = self.place(amenity_ids=["wifi"])
+        self.assertEqual(
+            list(self.storage.contains(Place, "amenity_ids", ["wifi", "tv"])),
+            ["Place." + both.id])
+        self.assertEqual(
+            set(self.storage.contains(Place, "amenity_ids", ["tv", "wifi"],
+                                      match="any")),
+            {"Place." + both.id, "Place." + wifi.id})
+
+    def test_search(self):
+        """
+        Test full-text search over reviews.
+        """
+        review = Review()
+        review.text = "A quiet loft close to the metro"
+        self.storage.new(review)
+        self.assertEqual(list(self.storage.search('"quiet loft"')),
+                         ["Review." + review.id])
+        self.assertEqual(self.storage.search("garden"), {})
+
+    def test_geo(self):
+        """
+        Test the geographic queries.
+        """
+        paris = self.place(latitude=48.8566, longitude=2.3522)
+        london = self.place(latitude=51.5074, longitude=-0.1278)
+        tokyo = self.place(latitude=35.6762, longitude=139.6503)
+        self.assertEqual(list(self.storage.within(Place, 45, -5, 55, 5)),
+                         sorted(["Place." + paris.id, "Place." + london.id]))
+        self.assertEqual(list(self.storage.near(Place, 51, 0, 400)),
+                         ["Place." + london.id, "Place." + paris.id])
+        self.assertEqual(list(self.storage.nearest(Place, 36, 140, 2)),
+                         ["Place." + tokyo.id, "Place." + london.id])
@@ -5,9 +5,18 @@ Unit test module for the FileStorage class.
 import unittest
 from datetime import datetime
 import json
+import os
+import sys
+import tempfile
+import threading
 from time import sleep
+from unittest.mock import patch
 
+from models.city import City
 from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
 
 
 class TestFileStorage(unittest.TestCase):
@@ -33,6 +42,924 @@ class TestFileStorage(unittest.TestCase):
         self.assertIsNotNone(FileStorage.save.__doc__)
         self.assertIsNotNone(FileStorage.reload.__doc__)
 
+    def test_all_get_count_by_class(self):
+        """
+        Test filtering all(), get() and count() by class.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        user, place = User(), Place()
+        self.assertEqual(file_storage.all(User), {"User." + user.id: user})
+        self.assertEqual(file_storage.all("Place"),
+                         {"Place." + place.id: place})
+        self.assertIs(file_storage.get("User", user.id), user)
+        self.assertIsNone(file_storage.get(Place, user.id))
+        self.assertEqual(file_storage.count(), 2)
+        self.assertEqual(file_storage.count(Review), 0)
+        FileStorage._FileStorage__objects = {}
+
+    def test_class_index_in_sync(self):
+        """
+        Test that count(cls) follows new(), delete() and a reset of
+        __objects.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        users = [User() for _ in range(3)]
+        self.assertEqual(file_storage.count(User), 3)
+        file_storage.delete(users[0])
+        file_storage.new(users[1])
+        self.assertEqual(file_storage.count("User"), 2)
+        self.assertNotIn("User." + users[0].id, file_storage.all(User))
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(file_storage.count(User), 0)
+        self.assertEqual(file_storage.all(User), {})
+
+    def test_lookup_foreign_keys(self):
+        """
+        Test that lookup() follows new(), updates and delete().
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        place = Place()
+        reviews = [Review() for _ in range(3)]
+        for review in reviews[:2]:
+            review.place_id = place.id
+            file_storage.new(review)
+        self.assertEqual(
+            set(file_storage.lookup(Review, "place_id", place.id)),
+            {"Review." + review.id for review in reviews[:2]}
+        )
+        reviews[0].place_id = "elsewhere"
+        file_storage.new(reviews[0])
+        file_storage.delete(reviews[1])
+        self.assertEqual(file_storage.lookup("Review", "place_id", place.id),
+                         {})
+        self.assertEqual(file_storage.lookup(Review, "place_id", "elsewhere"),
+                         {"Review." + reviews[0].id: reviews[0]})
+        FileStorage._FileStorage__objects = {}
+
+    def test_add_index(self):
+        """
+        Test declaring an index on an attribute not indexed by default.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        user = User()
+        user.email = "hbnb@example.com"
+        self.assertEqual(file_storage.lookup(User, "email", user.email),
+                         {"User." + user.id: user})
+        file_storage.add_index(User, "email")
+        self.assertIn(("User", "email"),
+                      FileStorage._FileStorage__secondary)
+        self.assertEqual(file_storage.lookup(User, "email", user.email),
+                         {"User." + user.id: user})
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__secondary = None
+
+    def test_range(self):
+        """
+        Test range queries over several Place attributes.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        places = []
+        for price, guests in ((80, 6), (50, 2), (300, 8)):
+            place = Place()
+            place.price_by_night = price
+            place.max_guest = guests
+            file_storage.new(place)
+            places.append(place)
+        self.assertEqual(
+            file_storage.range(Place, price_by_night=(None, 99),
+                               max_guest=(4, None)),
+            {"Place." + places[0].id: places[0]}
+        )
+        self.assertEqual(len(file_storage.range("Place", max_guest=(2, 8))),
+                         3)
+        self.assertEqual(file_storage.range(User, max_guest=(0, None)), {})
+        FileStorage._FileStorage__objects = {}
+
+    def test_contains(self):
+        """
+        Test all-of and any-of queries over Place.amenity_ids.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        both, wifi_only = Place(), Place()
+        both.amenity_ids = ["wifi", "tv"]
+        wifi_only.amenity_ids = ["wifi"]
+        file_storage.new(both)
+        file_storage.new(wifi_only)
+        self.assertEqual(
+            file_storage.contains(Place, "amenity_ids", ["tv", "wifi"]),
+            {"Place." + both.id: both}
+        )
+        self.assertEqual(
+            len(file_storage.contains("Place", "amenity_ids", ["tv", "x"],
+                                      match="any")), 1
+        )
+        file_storage.delete(both)
+        self.assertEqual(
+            file_storage.contains(Place, "amenity_ids", ["tv"]), {}
+        )
+        with self.assertRaises(ValueError):
+            file_storage.contains(Place, "amenity_ids", ["tv"], match="one")
+        FileStorage._FileStorage__objects = {}
+
+    def test_search(self):
+        """
+        Test full-text search across place descriptions and reviews.
+        """
+        FileStorage._FileStorage__objects = {}
+        file_storage = FileStorage()
+        place, review = Place(), Review()
+        place.description = "Quiet loft with a sea view"
+        review.text = "The sea view is stunning, the sea breeze too"
+        file_storage.new(place)
+        file_storage.new(review)
+        self.assertEqual(list(file_storage.search("sea view")),
+                         ["Review." + review.id, "Place." + place.id])
+        self.assertEqual(list(file_storage.search('"sea view"', Place)),
+                         ["Place." + place.id])
+        self.assertEqual(len(file_storage.search("sea", limit=1)), 1)
+        place.description = "Loud studio"
+        file_storage.new(place)
+        self.assertEqual(list(file_storage.search("loft")), [])
+        FileStorage._FileStorage__objects = {}
+
+
+class TestFileStorageDirtyTracking(unittest.TestCase):
+    """
+    Test cases for the objects serialized by FileStorage.save().
+    """
+
+    def setUp(self):
+        """
+        Set up a storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def load(self):
+        """
+        Returns the content of the JSON file.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_save_serializes_changed_objects(self):
+        """
+        Test that save() only serializes what changed since the last one.
+        """
+        users = [User() for _ in range(5)]
+        self.storage.save()
+        self.assertEqual(self.storage.stats["last_serialized"], 5)
+        users[0].first_name = "Betty"
+        self.storage.delete(users[1])
+        self.storage.save()
+        self.assertEqual(self.storage.stats["last_serialized"], 1)
+        self.storage.save()
+        self.assertEqual(self.storage.stats["last_serialized"], 0)
+        self.assertEqual(self.storage.stats["flushes"], 3)
+        self.assertEqual(self.storage.stats["total_serialized"], 6)
+        self.assertEqual(self.load(), {
+            "User." + user.id: user.to_dict()
+            for user in users if user is not users[1]
+        })
+
+    def test_untracked_objects_are_ignored(self):
+        """
+        Test that assignments to objects not in storage are not recorded.
+        """
+        user = User(id="1", __class__="User")
+        user.first_name = "Betty"
+        self.assertEqual(FileStorage._FileStorage__pending, {})
+
+    def test_journal_logs_changed_attributes(self):
+        """
+        Test that the log only holds the attributes that changed.
+        """
+        journaled = FileStorage(file_path=self.path, journal=True)
+        user = User()
+        journaled.save()
+        user.first_name = "Betty"
+        user.last_name = "Holberton"
+        journaled.save()
+        with open(self.path + ".log", "r", encoding="utf-8") as f:
+            record = json.loads(f.readlines()[-1])
+        self.assertEqual(record["data"],
+                         {"first_name": "Betty", "last_name": "Holberton"})
+        FileStorage._FileStorage__objects = {}
+        journaled.reload()
+        self.assertEqual(journaled.get(User, user.id).to_dict(),
+                         user.to_dict())
+
+    def test_journal_logs_saved_object(self):
+        """
+        Test that new(), which obj.save() calls, logs the whole object,
+        changes made in place included.
+        """
+        journaled = FileStorage(file_path=self.path, journal=True)
+        place = Place()
+        place.amenity_ids = ["a"]
+        journaled.save()
+        place.amenity_ids.append("b")
+        journaled.new(place)
+        journaled.save()
+        FileStorage._FileStorage__objects = {}
+        journaled.reload()
+        self.assertEqual(journaled.get(Place, place.id).amenity_ids,
+                         ["a", "b"])
+
+
+class TestFileStorageDurability(unittest.TestCase):
+    """
+    Test cases for how FileStorage writes its files to disk.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def load(self):
+        """
+        Returns the content of the JSON file.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_save_is_atomic(self):
+        """
+        Test that a save failing halfway leaves the JSON file untouched.
+        """
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        with patch("models.engine.atomic.os.replace",
+                   side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                self.storage.save()
+        self.assertNotIn("first_name", self.load()["User." + user.id])
+
+    def test_durability(self):
+        """
+        Test that unknown durability levels are rejected.
+        """
+        with self.assertRaises(ValueError):
+            FileStorage(file_path=self.path, durability="always")
+
+
+class TestFileStorageBinary(unittest.TestCase):
+    """
+    Test cases for FileStorage in the binary format.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary directory for the binary file.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.hbnb")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_binary_format(self):
+        """
+        Test saving and reloading objects in the binary format.
+        """
+        storage = FileStorage(file_path=self.path, file_format="binary")
+        place = Place()
+        place.name = "Loft"
+        place.latitude = 48.85
+        place.amenity_ids = ["wifi"]
+        storage.new(place)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(Place, place.id).to_dict(),
+                         place.to_dict())
+        with self.assertRaises(ValueError):
+            FileStorage(file_path=self.path, file_format="binary",
+                        journal=True)
+
+
+class TestFileStorageInterning(unittest.TestCase):
+    """
+    Test cases for the ids shared by reloaded objects.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_reload_shares_ids(self):
+        """
+        Test that reloaded objects share the string of the ids they
+        refer to.
+        """
+        place = Place()
+        reviews = [Review() for _ in range(2)]
+        for review in reviews:
+            review.place_id = place.id
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        loaded = self.storage.get(Place, place.id)
+        for review in reviews:
+            self.assertIs(self.storage.get(Review, review.id).place_id,
+                          loaded.id)
+
+
+class TestFileStorageNewMany(unittest.TestCase):
+    """
+    Test cases for the objects created by FileStorage.new_many().
+    """
+
+    def setUp(self):
+        """
+        Set up a storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_new_many(self):
+        """
+        Test that objects created in bulk are stored, indexed and saved.
+        """
+        city = City()
+        places = self.storage.new_many(Place, [
+            {"name": "Loft", "city_id": city.id}, {"name": "Barn"}, {}])
+        self.assertEqual([place.name for place in places],
+                         ["Loft", "Barn", ""])
+        self.assertIs(places[0].city_id, city.id)
+        self.assertEqual(self.storage.count(Place), 3)
+        self.assertEqual(self.storage.lookup(Place, "city_id", city.id),
+                         {"Place." + places[0].id: places[0]})
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(Place, places[1].id).to_dict(),
+                         places[1].to_dict())
+
+
+class TestFileStorageGroupCommit(unittest.TestCase):
+    """
+    Test cases for the saves coalesced by FileStorage.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary directory for the JSON file.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def create(self, storage):
+        """
+        Stores a new user the way BaseModel.save() does.
+        """
+        user = User()
+        storage.new(user)
+        storage.save()
+        return user
+
+    def test_batch(self):
+        """
+        Test that batch() defers every save to one flush at the end.
+        """
+        storage = FileStorage(file_path=self.path)
+        with storage.batch():
+            with storage.batch():
+                users = [self.create(storage) for _ in range(3)]
+            self.assertFalse(os.path.exists(self.path))
+            users.append(self.create(storage))
+        self.assertEqual(storage.stats["flushes"], 1)
+        self.assertEqual(storage.stats["last_coalesced"], 4)
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 4)
+
+    def test_commit_count(self):
+        """
+        Test that commit_count saves are coalesced into one flush.
+        """
+        storage = FileStorage(file_path=self.path, commit_count=3)
+        self.create(storage)
+        self.create(storage)
+        self.assertEqual(storage.stats["flushes"], 0)
+        self.create(storage)
+        self.assertEqual(storage.stats["flushes"], 1)
+        self.assertEqual(storage.stats["last_coalesced"], 3)
+        self.create(storage)
+        storage.flush()
+        self.assertEqual(storage.stats["flushes"], 2)
+        self.assertEqual(storage.stats["last_coalesced"], 1)
+
+    def test_commit_window(self):
+        """
+        Test that the saves made within commit_window share a flush.
+        """
+        storage = FileStorage(file_path=self.path, commit_window=0.2)
+        self.addCleanup(storage.close)
+        for _ in range(3):
+            self.create(storage)
+        self.assertEqual(storage.stats["flushes"], 0)
+        sleep(0.4)
+        self.assertEqual(storage.stats["flushes"], 1)
+        self.assertEqual(storage.stats["last_coalesced"], 3)
+
+    def test_commit_window_without_save(self):
+        """
+        Test that a deferred save reaches the file once the window has
+        elapsed, without another save.
+        """
+        storage = FileStorage(file_path=self.path, commit_window=0.05)
+        self.addCleanup(storage.close)
+        user = self.create(storage)
+        self.assertFalse(os.path.exists(self.path))
+        sleep(0.3)
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertIn("User." + user.id, json.load(f))
+
+    def test_commit_window_while_reading(self):
+        """
+        Test that the flush of the commit window does not fail while
+        reads build the objects of a lazy storage.
+        """
+        storage = FileStorage(file_path=self.path)
+        storage.new_many(User, ({} for _ in range(10000)))
+        storage.save()
+        ids = [key.split(".", 1)[1] for key in storage.all()]
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(file_path=self.path, lazy=True,
+                              commit_window=0.001)
+        self.addCleanup(storage.close)
+        storage.reload()
+        errors = []
+        hook = threading.excepthook
+        threading.excepthook = errors.append
+        self.addCleanup(setattr, threading, "excepthook", hook)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        for i, id in enumerate(ids):
+            if i % 50 == 0:
+                self.create(storage)
+            self.assertIsNotNone(storage.get(User, id))
+        sleep(0.05)
+        self.assertEqual(errors, [])
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 10200)
+
+    def test_background(self):
+        """
+        Test that flush() waits for the writes of the background thread.
+        """
+        storage = FileStorage(file_path=self.path, background=True)
+        self.addCleanup(storage.close)
+        users = [self.create(storage) for _ in range(20)]
+        storage.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 20)
+        storage.delete(users[0])
+        storage.save()
+        storage.close()
+        self.assertIsNone(storage.flusher)
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 19)
+
+
+class TestFileStorageSnapshot(unittest.TestCase):
+    """
+    Test cases for FileStorage in snapshot mode.
+    """
+
+    def setUp(self):
+        """
+        Set up a snapshot of a few objects in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.snap")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.users = [User() for _ in range(3)]
+        self.place = Place()
+        self.place.number_rooms = 3
+        FileStorage(file_path=os.path.join(self.tmp_dir.name, "file.json")) \
+            .write_snapshot(self.path)
+        self.storage = FileStorage(snapshot=self.path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        self.storage.snapshot.close()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        FileStorage._FileStorage__loaded = set()
+        self.tmp_dir.cleanup()
+
+    def objects(self):
+        """
+        Returns the objects decoded so far.
+        """
+        return FileStorage._FileStorage__objects
+
+    def test_get_decodes_one_object(self):
+        """
+        Test that get() and count() do not decode the whole snapshot.
+        """
+        user = self.storage.get(User, self.users[1].id)
+        self.assertEqual(user.to_dict(), self.users[1].to_dict())
+        self.assertIs(self.storage.get(User, user.id), user)
+        self.assertIsNone(self.storage.get(User, "missing"))
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(list(self.objects()), ["User." + user.id])
+
+    def test_queries_load_the_class(self):
+        """
+        Test that other queries decode the class they need.
+        """
+        self.assertEqual(list(self.storage.range(Place, number_rooms=(3, 3))),
+                         ["Place." + self.place.id])
+        self.assertEqual(len(self.storage.all(User)), 3)
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_delete(self):
+        """
+        Test that deleted objects are not decoded again.
+        """
+        user = self.storage.get(User, self.users[0].id)
+        self.storage.delete(user)
+        self.assertIsNone(self.storage.get(User, user.id))
+        self.assertEqual(self.storage.count(User), 2)
+
+    def test_read_only(self):
+        """
+        Test that a snapshot cannot be saved.
+        """
+        with self.assertRaises(PermissionError):
+            self.storage.save()
+        with self.assertRaises(ValueError):
+            FileStorage(snapshot=self.path, journal=True)
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """
+    Test cases for FileStorage in lazy mode.
+    """
+
+    def setUp(self):
+        """
+        Set up a storage file of a few objects in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.users = [User() for _ in range(3)]
+        self.place = Place()
+        self.place.number_rooms = 3
+        FileStorage(file_path=self.path).save()
+        self.storage = FileStorage(file_path=self.path, lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_get_builds_one_object(self):
+        """
+        Test that get() and count() only build the object requested.
+        """
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(User), 3)
+        user = self.storage.get(User, self.users[1].id)
+        self.assertEqual(user.to_dict(), self.users[1].to_dict())
+        self.assertIs(self.storage.get(User, user.id), user)
+        self.assertIsNone(self.storage.get(User, "missing"))
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(self.storage.stats["materialized"], 1)
+
+    def test_queries_build_the_class(self):
+        """
+        Test that other queries build the class they need.
+        """
+        self.assertEqual(list(self.storage.range(Place, number_rooms=(3, 3))),
+                         ["Place." + self.place.id])
+        self.assertEqual(self.storage.stats["materialized"], 1)
+        self.assertEqual(len(self.storage.all(User)), 3)
+        self.assertEqual(len(self.storage.all()), 4)
+        self.assertEqual(self.storage.stats["materialized"], 4)
+
+    def test_save_keeps_unbuilt_objects(self):
+        """
+        Test that saving writes the objects not built yet.
+        """
+        user = self.storage.get(User, self.users[0].id)
+        self.storage.delete(user)
+        self.storage.save()
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data["Place." + self.place.id],
+                         self.place.to_dict())
+        self.assertNotIn("User." + user.id, data)
+
+    def test_invalid_modes(self):
+        """
+        Test that lazy mode cannot be combined with partitioned or
+        snapshot mode.
+        """
+        with self.assertRaises(ValueError):
+            FileStorage(lazy=True, partitioned=True)
+        with self.assertRaises(ValueError):
+            FileStorage(lazy=True, snapshot=self.path)
+
+
+class TestFileStoragePartitioned(unittest.TestCase):
+    """
+    Test cases for FileStorage in partitioned mode.
+    """
+
+    def setUp(self):
+        """
+        Set up a partitioned storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path, partitioned=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        FileStorage._FileStorage__loaded = set()
+        self.tmp_dir.cleanup()
+
+    def partition(self, class_name):
+        """
+        Returns the path of the file of class_name.
+        """
+        return os.path.join(self.tmp_dir.name, class_name + ".json")
+
+    def test_save_writes_one_file_per_class(self):
+        """
+        Test that save() only writes the files of changed classes.
+        """
+        user = User()
+        place = Place()
+        self.storage.new(user)
+        self.storage.new(place)
+        self.storage.save()
+        self.assertTrue(os.path.isfile(self.partition("User")))
+        self.assertTrue(os.path.isfile(self.partition("Place")))
+        self.assertFalse(os.path.isfile(self.path))
+        os.remove(self.partition("Place"))
+        self.storage.delete(user)
+        self.storage.save()
+        self.assertFalse(os.path.isfile(self.partition("Place")))
+        with open(self.partition("User"), "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {})
+
+    def test_partitions_load_lazily(self):
+        """
+        Test that reload() defers reading the class files until needed.
+        """
+        place = Place()
+        review = Review()
+        self.storage.new(place)
+        self.storage.new(review)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        found = self.storage.get(Place, place.id)
+        self.assertEqual(found.to_dict(), place.to_dict())
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["Place." + place.id])
+        self.assertEqual(self.storage.count("Review"), 1)
+        self.assertEqual(len(self.storage.all()), 2)
+
+    def test_exclusive_with_journal(self):
+        """
+        Test that the journaled and partitioned modes cannot be combined.
+        """
+        with self.assertRaises(ValueError):
+            FileStorage(journal=True, partitioned=True)
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """
+    Test cases for FileStorage in journaled mode.
+    """
+
+    def setUp(self):
+        """
+        Set up a journaled storage in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.json")
+        self.storage = FileStorage(file_path=self.path, journal=True)
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """
+        Reset FileStorage data and remove the temporary directory.
+        """
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        self.tmp_dir.cleanup()
+
+    def test_save_appends_to_log(self):
+        """
+        Test that save() appends to the log instead of writing the file.
+        """
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.assertFalse(os.path.isfile(self.path))
+        with open(self.path + ".log", "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["id"], user.id)
+
+    def test_save_after_torn_append(self):
+        """
+        Test that a record torn by a crash does not take the records
+        appended after it down on reload.
+        """
+        first = Place()
+        self.storage.save()
+        with open(self.path + ".log", "a", encoding="utf-8") as f:
+            f.write('{"op": "put", "cla')
+        second = Place()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(file_path=self.path, journal=True).reload()
+        self.assertEqual(set(FileStorage._FileStorage__objects),
+                         {"Place." + first.id, "Place." + second.id})
+
+    def test_save_leaves_to_dict_uncached(self):
+        """
+        Test that logging and snapshotting objects do not keep their
+        to_dict() in the instance.
+        """
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.write_snapshot(
+            os.path.join(self.tmp_dir.name, "file.hbnb"))
+        self.assertIsNone(getattr(user, "_BaseModel__serialized", None))
+
+    def test_save_writes_only_pending(self):
+        """
+        Test that each save only logs what changed since the last one.
+        """
+        users = [User() for _ in range(5)]
+        self.storage.save()
+        size = os.path.getsize(self.path + ".log")
+        self.storage.delete(users[0])
+        self.storage.save()
+        with open(self.path + ".log", "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[-1])["op"], "delete")
+        self.assertLess(os.path.getsize(self.path + ".log") - size, size)
+
+    def test_reload_replays_log(self):
+        """
+        Test that reload() rebuilds objects from snapshot and log.
+        """
+        kept, deleted = User(), User()
+        self.storage.save()
+        kept.email = "hbnb@example.com"
+        self.storage.new(kept)
+        self.storage.delete(deleted)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objects = self.storage.all()
+        self.assertEqual(list(objects.keys()), ["User." + kept.id])
+        self.assertEqual(objects["User." + kept.id].to_dict(), kept.to_dict())
+
+    def test_deleted_attribute(self):
+        """
+        Test that an attribute deleted after it was logged stays deleted
+        on reload and after a compaction.
+        """
+        user = User()
+        user.nick = "x"
+        self.storage.save()
+        self.storage.compact()
+        user.first_name = "Betty"
+        self.storage.save()
+        del user.nick
+        self.storage.save()
+        for compact in (False, True):
+            if compact:
+                self.storage.compact()
+            FileStorage._FileStorage__objects = {}
+            self.storage.reload()
+            with self.subTest(compact=compact):
+                found = self.storage.all()["User." + user.id]
+                self.assertFalse(hasattr(found, "nick"))
+                self.assertEqual(found.first_name, "Betty")
+
+    def test_compaction_keeps_data(self):
+        """
+        Test that reload() sees the same objects after a compaction.
+        """
+        users = [User() for _ in range(3)]
+        self.storage.save()
+        self.storage.delete(users[0])
+        self.storage.save()
+        stats = self.storage.compact()
+        self.assertEqual(stats["compactions"], 1)
+        self.assertFalse(os.path.isfile(self.path + ".log"))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(
+            sorted(self.storage.all().keys()),
+            sorted("User." + user.id for user in users[1:])
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Unit test module for the Flusher class.
+"""
+import threading
+import unittest
+
+from models.engine.flusher import Flusher
+
+
+class TestFlusher(unittest.TestCase):
+    """
+    Test cases for the Flusher class.
+    """
+
+    def setUp(self):
+        """
+        Set up a flusher whose worker can be held back.
+        """
+        self.flusher = Flusher(max_queued=8)
+        self.gate = threading.Event()
+        self.written = []
+
+    def tearDown(self):
+        """
+        Stop the worker thread.
+        """
+        self.gate.set()
+        self.flusher.close()
+
+    def hold(self):
+        """
+        Blocks the worker until the gate opens.
+        """
+        self.flusher.submit(None, self.gate.wait)
+
+    def test_jobs_run_in_order(self):
+        """
+        Test that jobs without a key all run, in submission order.
+        """
+        for i in range(5):
+            self.flusher.submit(None, self.written.append, i)
+        self.flusher.wait()
+        self.assertEqual(self.written, [0, 1, 2, 3, 4])
+
+    def test_coalesce(self):
+        """
+        Test that a queued job is skipped when a later one has its key.
+        """
+        self.hold()
+        self.flusher.submit("a", self.written.append, "a1")
+        self.flusher.submit("b", self.written.append, "b1")
+        self.flusher.submit("a", self.written.append, "a2")
+        self.gate.set()
+        self.flusher.wait()
+        self.assertEqual(self.written, ["b1", "a2"])
+        self.assertEqual(self.flusher.stats["coalesced"], 1)
+
+    def test_error(self):
+        """
+        Test that an error raised by a job is raised again by wait().
+        """
+        self.flusher.submit(None, int, "x")
+        with self.assertRaises(ValueError):
+            self.flusher.wait()
+        self.flusher.wait()
+
+    def test_close(self):
+        """
+        Test that close() runs the queued jobs first.
+        """
+        self.gate.set()
+        for i in range(3):
+            self.flusher.submit(None, self.written.append, i)
+        self.flusher.close()
+        self.assertEqual(self.written, [0, 1, 2])
+        with self.assertRaises(RuntimeError):
+            self.flusher.submit(None, self.written.append, 3)
@@ -0,0 +1,409 @@
+#!/usr/bin/python3
+"""
+Unit test module for the FileStorage indexes.
+"""
+import random
+import unittest
+
+from models.engine.indexes import ClassIndex, GridIndex, HashIndex, \
+    InvertedIndex, SortedIndex, TextIndex, haversine, parse_query
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestClassIndex(unittest.TestCase):
+    """
+    Test cases for the ClassIndex class.
+    """
+
+    def tearDown(self):
+        """
+        Reset FileStorage data.
+        """
+        FileStorage._FileStorage__objects = {}
+
+    def test_add_remove(self):
+        """
+        Test that objects are grouped by class name.
+        """
+        index = ClassIndex()
+        user, place = User(), Place()
+        index.add("User." + user.id, user)
+        index.add("Place." + place.id, place)
+        self.assertEqual(index.objects("User"), {"User." + user.id: user})
+        self.assertEqual(index.count("Place"), 1)
+        self.assertEqual(index.count("Review"), 0)
+        index.remove("User." + user.id, user)
+        self.assertEqual(index.objects("User"), {})
+
+    def test_rebuild(self):
+        """
+        Test rebuilding the index from a dictionary of objects.
+        """
+        index = ClassIndex()
+        users = {"User." + user.id: user for user in (User(), User())}
+        index.add("Place.1", Place())
+        index.rebuild(users)
+        self.assertEqual(index.objects("User"), users)
+        self.assertEqual(index.count("Place"), 0)
+
+    def test_objects_is_a_copy(self):
+        """
+        Test that the dictionary returned does not alias the index.
+        """
+        index = ClassIndex()
+        user = User()
+        index.add("User." + user.id, user)
+        index.objects("User").clear()
+        self.assertEqual(index.count("User"), 1)
+
+
+class TestHashIndex(unittest.TestCase):
+    """
+    Test cases for the HashIndex class.
+    """
+
+    def tearDown(self):
+        """
+        Reset FileStorage data.
+        """
+        FileStorage._FileStorage__objects = {}
+
+    def test_lookup(self):
+        """
+        Test looking objects up by attribute value.
+        """
+        index = HashIndex("Review", "place_id")
+        first, second, other = Review(), Review(), Review()
+        first.place_id = second.place_id = "p1"
+        other.place_id = "p2"
+        for review in (first, second, other):
+            index.add("Review." + review.id, review)
+        self.assertEqual(set(index.lookup("p1")),
+                         {"Review." + first.id, "Review." + second.id})
+        self.assertEqual(index.lookup("p3"), {})
+        self.assertEqual(index.lookup([]), {})
+
+    def test_ignores_other_classes(self):
+        """
+        Test that objects of other classes are not indexed.
+        """
+        index = HashIndex("Review", "user_id")
+        place = Place()
+        place.user_id = "u1"
+        index.add("Place." + place.id, place)
+        self.assertEqual(index.lookup("u1"), {})
+
+    def test_update_in_place(self):
+        """
+        Test that an object mutated in place moves to its new bucket.
+        """
+        index = HashIndex("Review", "place_id")
+        review = Review()
+        key = "Review." + review.id
+        review.place_id = "p1"
+        index.add(key, review)
+        review.place_id = "p2"
+        index.remove(key, review)
+        index.add(key, review)
+        self.assertEqual(index.lookup("p1"), {})
+        self.assertEqual(index.lookup("p2"), {key: review})
+        self.assertNotIn("p1", index.buckets)
+
+
+class TestSortedIndex(unittest.TestCase):
+    """
+    Test cases for the SortedIndex class.
+    """
+
+    def setUp(self):
+        """
+        Set up an index over five places priced 0, 25, 50, 75 and 100.
+        """
+        self.index = SortedIndex("Place", "price_by_night")
+        self.places = []
+        for price in (50, 0, 100, 25, 75):
+            place = Place()
+            place.price_by_night = price
+            self.places.append(place)
+            self.index.add("Place." + place.id, place)
+
+    def tearDown(self):
+        """
+        Reset FileStorage data.
+        """
+        FileStorage._FileStorage__objects = {}
+
+    def prices(self, objects):
+        """
+        Returns the prices of objects, in order.
+        """
+        return [obj.price_by_night for obj in objects.values()]
+
+    def test_range(self):
+        """
+        Test inclusive and open-ended range queries.
+        """
+        self.assertEqual(self.prices(self.index.range(25, 75)), [25, 50, 75])
+        self.assertEqual(self.prices(self.index.range(None, 30)), [0, 25])
+        self.assertEqual(self.prices(self.index.range(80)), [100])
+        self.assertEqual(self.index.range(60, 40), {})
+        self.assertEqual(self.index.count(0, 100), 5)
+        self.assertEqual(self.prices(self.index.lookup(50)), [50])
+
+    def test_duplicates_and_removal(self):
+        """
+        Test removing one object among several with the same value.
+        """
+        twins = []
+        for _ in range(3):
+            place = Place()
+            place.price_by_night = 10
+            twins.append(place)
+            self.index.add("Place." + place.id, place)
+        self.index.remove("Place." + twins[1].id, twins[1])
+        self.assertEqual(set(self.index.range(10, 10)),
+                         {"Place." + twins[0].id, "Place." + twins[2].id})
+        self.assertEqual(len(self.index.entries), 7)
+
+    def test_skips_non_numeric(self):
+        """
+        Test that non-numeric values and other classes are not indexed.
+        """
+        place = Place()
+        place.price_by_night = "cheap"
+        self.index.add("Place." + place.id, place)
+        user = User()
+        user.price_by_night = 1
+        self.index.add("User." + user.id, user)
+        self.assertEqual(self.index.count(), 5)
+
+    def test_rebuild_sorts(self):
+        """
+        Test rebuilding the index from a dictionary of objects.
+        """
+        objects = {"Place." + place.id: place for place in self.places}
+        index = SortedIndex("Place", "price_by_night")
+        index.rebuild(objects)
+        self.assertEqual(index.entries, self.index.entries)
+
+
+class TestGridIndex(unittest.TestCase):
+    """
+    Test cases for the GridIndex class, checked against brute force.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set up an index over places around New York and on both sides
+        of the antimeridian.
+        """
+        rng = random.Random(98)
+        cls.index = GridIndex("Place")
+        cls.places = {}
+        for i in range(3000):
+            place = Place(id=str(i), __class__="Place")
+            place.latitude = rng.uniform(40, 41)
+            place.longitude = rng.choice([rng.uniform(-74, -73),
+                                          rng.uniform(179.5, 180),
+                                          rng.uniform(-180, -179.5)])
+            cls.places["Place." + place.id] = place
+            cls.index.add("Place." + place.id, place)
+
+    def distance(self, point, key):
+        """
+        Returns the distance between point and the place under key.
+        """
+        place = self.places[key]
+        return haversine(point[0], point[1], place.latitude, place.longitude)
+
+    def test_nearest(self):
+        """
+        Test k-nearest-neighbour queries.
+        """
+        for point in ((40.5, -73.5), (40.5, 179.99), (0, 0), (89, 10)):
+            for k in (1, 7):
+                with self.subTest(point=point, k=k):
+                    expected = sorted(
+                        self.places,
+                        key=lambda key: (self.distance(point, key), key)
+                    )[:k]
+                    self.assertEqual(list(self.index.nearest(*point, k)),
+                                     expected)
+
+    def test_radius(self):
+        """
+        Test radius queries, including across the antimeridian.
+        """
+        for point in ((40.5, -73.5), (40.5, -179.99)):
+            for km in (2, 30):
+                with self.subTest(point=point, km=km):
+                    expected = {key for key in self.places
+                                if self.distance(point, key) <= km}
+                    self.assertEqual(set(self.index.radius(*point, km)),
+                                     expected)
+
+    def test_bbox(self):
+        """
+        Test bounding-box queries, including across the antimeridian.
+        """
+        found = self.index.bbox(40.2, 179.8, 40.4, -179.8)
+        expected = {
+            key for key, place in self.places.items()
+            if 40.2 <= place.latitude <= 40.4 and
+            abs(place.longitude) >= 179.8
+        }
+        self.assertEqual(set(found), expected)
+        self.assertEqual(self.index.bbox(0, 0, 1, 1), {})
+
+    def test_remove(self):
+        """
+        Test that a removed object is no longer found.
+        """
+        index = GridIndex("Place")
+        place = Place(id="x", __class__="Place")
+        place.latitude, place.longitude = 10.0, 180
+        index.add("Place.x", place)
+        self.assertEqual(index.bbox(9, 179, 11, 180), {"Place.x": place})
+        index.remove("Place.x", place)
+        self.assertEqual(index.cells, {})
+        self.assertEqual(index.nearest(10, 180, 1), {})
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """
+    Test cases for the InvertedIndex class.
+    """
+
+    def setUp(self):
+        """
+        Set up an index over three places and their amenities.
+        """
+        self.index = InvertedIndex("Place", "amenity_ids")
+        self.places = {}
+        for name, amenities in (("a", ["wifi", "tv"]),
+                                ("b", ["wifi"]),
+                                ("c", ["tv", "pool", "wifi"])):
+            place = Place(id=name, __class__="Place")
+            place.amenity_ids = amenities
+            self.places[name] = place
+            self.index.add("Place." + name, place)
+
+    def found(self, objects):
+        """
+        Returns the sorted ids of objects.
+        """
+        return sorted(obj.id for obj in objects.values())
+
+    def test_all_of(self):
+        """
+        Test queries for places offering every amenity.
+        """
+        self.assertEqual(self.found(self.index.all_of(["wifi", "tv"])),
+                         ["a", "c"])
+        self.assertEqual(self.found(self.index.all_of(["pool", "tv"])),
+                         ["c"])
+        self.assertEqual(self.index.all_of(["wifi", "sauna"]), {})
+        self.assertEqual(self.index.all_of([]), {})
+
+    def test_any_of(self):
+        """
+        Test queries for places offering at least one amenity.
+        """
+        self.assertEqual(self.found(self.index.any_of(["pool", "sauna"])),
+                         ["c"])
+        self.assertEqual(self.found(self.index.lookup("wifi")),
+                         ["a", "b", "c"])
+
+    def test_update_in_place(self):
+        """
+        Test that an updated list moves the object between postings.
+        """
+        place = self.places["b"]
+        place.amenity_ids = ["pool"]
+        self.index.remove("Place.b", place)
+        self.index.add("Place.b", place)
+        self.assertEqual(self.found(self.index.lookup("wifi")), ["a", "c"])
+        self.assertEqual(self.found(self.index.lookup("pool")), ["b", "c"])
+        self.index.remove("Place.c", self.places["c"])
+        self.assertEqual(self.found(self.index.lookup("tv")), ["a"])
+        self.assertEqual(self.found(self.index.lookup("pool")), ["b"])
+
+
+class TestTextIndex(unittest.TestCase):
+    """
+    Test cases for the TextIndex class.
+    """
+
+    def setUp(self):
+        """
+        Set up an index over three reviews.
+        """
+        self.index = TextIndex("Review", "text")
+        self.reviews = {}
+        for name, text in (("a", "Great view of the ocean, great host"),
+                           ("b", "The ocean was cold but the view great"),
+                           ("c", "Noisy street, no view")):
+            review = Review(id=name, __class__="Review")
+            review.text = text
+            self.reviews[name] = review
+            self.index.add("Review." + name, review)
+
+    def tearDown(self):
+        """
+        Reset FileStorage data.
+        """
+        FileStorage._FileStorage__objects = {}
+
+    def ranked(self, query):
+        """
+        Returns the ids of the reviews matching query, best first.
+        """
+        scores = self.index.score(parse_query(query))
+        return [key.split(".")[1]
+                for key in sorted(scores, key=lambda key: -scores[key])]
+
+    def test_parse_query(self):
+        """
+        Test splitting a query into words and phrases.
+        """
+        self.assertEqual(parse_query('Great "ocean view" sea-side'),
+                         [["great"], ["ocean", "view"], ["sea", "side"]])
+
+    def test_keywords(self):
+        """
+        Test that every keyword must match and scores rank the results.
+        """
+        self.assertEqual(self.ranked("great"), ["a", "b"])
+        self.assertEqual(sorted(self.ranked("VIEW")), ["a", "b", "c"])
+        self.assertEqual(self.ranked("ocean street"), [])
+        self.assertEqual(self.ranked("sauna"), [])
+
+    def test_phrase(self):
+        """
+        Test that phrases must appear as consecutive words.
+        """
+        self.assertEqual(self.ranked('"view great"'), ["b"])
+        self.assertEqual(self.ranked('"great view"'), ["a"])
+
+    def test_update_and_remove(self):
+        """
+        Test that changed texts are reindexed and removed ones dropped.
+        """
+        review = self.reviews["c"]
+        review.text = "Great location"
+        self.index.remove("Review.c", review)
+        self.index.add("Review.c", review)
+        self.assertEqual(sorted(self.ranked("great")), ["a", "b", "c"])
+        self.assertNotIn("noisy", self.index.postings)
+        for name, review in self.reviews.items():
+            self.index.remove("Review." + name, review)
+        self.assertEqual(self.index.postings, {})
+        self.assertEqual(self.index.total_length, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+Unit test module for the Journal class.
+"""
+import os
+import tempfile
+import unittest
+
+from models.engine.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """
+    Test cases for the Journal class.
+    """
+
+    def setUp(self):
+        """
+        Set up a journal in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = Journal(os.path.join(self.tmp_dir.name, "file.log"))
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_overlay_empty(self):
+        """
+        Test folding a log that does not exist yet.
+        """
+        self.assertEqual(self.journal.overlay(), {})
+        self.assertEqual(self.journal.size(), 0)
+
+    def test_apply_put_and_delete(self):
+        """
+        Test that puts merge fields and deletes drop the object.
+        """
+        self.journal.append([
+            Journal.put_record("User.1", {"__class__": "User", "id": "1"}),
+            Journal.put_record("User.2", {"__class__": "User", "id": "2"}),
+            Journal.put_record("User.1", {"email": "a@b.c"}),
+            Journal.delete_record("User.2")
+        ])
+        snapshot = {"State.9": {"__class__": "State", "id": "9"}}
+        self.assertEqual(Journal.apply(snapshot, self.journal.records()), 4)
+        self.assertEqual(snapshot, {
+            "State.9": {"__class__": "State", "id": "9"},
+            "User.1": {"__class__": "User", "id": "1", "email": "a@b.c"}
+        })
+
+    def test_overlay(self):
+        """
+        Test that overlay() folds the log into per-object changes.
+        """
+        self.journal.append([
+            Journal.put_record("User.1", {"email": "a@b.c"}),
+            Journal.put_record("User.1", {"first_name": "Betty"}),
+            Journal.delete_record("User.2"),
+            Journal.delete_record("User.3"),
+            Journal.put_record("User.3", {"id": "3"})
+        ])
+        self.assertEqual(self.journal.overlay(), {
+            "User.1": (False, {"email": "a@b.c", "first_name": "Betty"},
+                       set()),
+            "User.2": None,
+            "User.3": (True, {"id": "3"}, set())
+        })
+        self.assertEqual(self.journal.record_count, 5)
+
+    def test_replace_and_deleted(self):
+        """
+        Test that a whole-object put replaces the fields before it and
+        that deleted attributes are removed.
+        """
+        self.journal.append([
+            Journal.put_record("User.1", {"email": "a@b.c", "nick": "x"}),
+            Journal.put_record("User.1", {"id": "1"}, replace=True),
+            Journal.put_record("User.2", {"email": "a@b.c"},
+                               deleted=["nick"]),
+            Journal.put_record("User.3", {"nick": "y"}),
+            Journal.put_record("User.3", {}, deleted=["nick"])
+        ])
+        self.assertEqual(self.journal.overlay(), {
+            "User.1": (True, {"id": "1"}, set()),
+            "User.2": (False, {"email": "a@b.c"}, {"nick"}),
+            "User.3": (False, {}, {"nick"})
+        })
+        snapshot = {"User.1": {"id": "1", "first_name": "Betty"},
+                    "User.2": {"id": "2", "nick": "z"},
+                    "User.3": {"id": "3"}}
+        Journal.apply(snapshot, self.journal.records())
+        self.assertEqual(snapshot, {"User.1": {"id": "1"},
+                                    "User.2": {"id": "2", "email": "a@b.c"},
+                                    "User.3": {"id": "3"}})
+
+    def test_torn_last_line(self):
+        """
+        Test that a partially written last record is ignored.
+        """
+        self.journal.append([Journal.put_record("User.1", {"id": "1"})])
+        with open(self.journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "delete", "cla')
+        self.assertEqual(self.journal.overlay(),
+                         {"User.1": (False, {"id": "1"}, set())})
+
+    def test_append_after_torn_line(self):
+        """
+        Test that an append cuts off a torn last record instead of
+        continuing it.
+        """
+        self.journal.append([Journal.put_record("User.1", {"id": "1"})])
+        with open(self.journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "delete", "cla')
+        self.journal.append([Journal.put_record("User.2", {"id": "2"})])
+        self.assertEqual(self.journal.overlay(), {
+            "User.1": (False, {"id": "1"}, set()),
+            "User.2": (False, {"id": "2"}, set())
+        })
+
+    def test_corrupt_line(self):
+        """
+        Test that a record that cannot be read before the end of the log
+        is reported.
+        """
+        with open(self.journal.path, "w", encoding="utf-8") as f:
+            f.write('{"op": "delete", "cla\n{"op": "delete"}\n')
+        with self.assertRaises(ValueError):
+            self.journal.overlay()
+
+    def test_truncate(self):
+        """
+        Test that truncate empties the log.
+        """
+        self.journal.append([Journal.delete_record("User.1")])
+        self.assertGreater(self.journal.size(), 0)
+        self.journal.truncate()
+        self.assertEqual(self.journal.size(), 0)
+        self.assertEqual(list(self.journal.records()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
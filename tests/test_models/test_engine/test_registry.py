@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""
+Unit test module for the model registry.
+"""
+import unittest
+from datetime import datetime
+
+from models.base_model import BaseModel
+from models.engine import registry
+from models.place import Place
+
+
+class TestRegistry(unittest.TestCase):
+    """
+    Test cases for the model registry.
+    """
+
+    def test_classes(self):
+        """
+        Test that the model classes are registered once, by name.
+        """
+        classes = registry.classes()
+        self.assertIs(classes["Place"], Place)
+        self.assertEqual(set(classes), {"BaseModel", "User", "State", "City",
+                                        "Amenity", "Place", "Review"})
+        self.assertIs(registry.classes(), classes)
+
+    def test_attributes(self):
+        """
+        Test that the schema lists the attributes each class declares.
+        """
+        attributes = registry.attributes()
+        self.assertEqual(attributes["BaseModel"], {
+            "id": str, "created_at": datetime, "updated_at": datetime
+        })
+        self.assertEqual(attributes["Place"]["number_rooms"], int)
+        self.assertEqual(attributes["Place"]["amenity_ids"], list)
+        self.assertNotIn("id", attributes["Place"])
+
+    def test_coercions(self):
+        """
+        Test that only string and numeric attributes are converted,
+        inherited ones included.
+        """
+        coercions = registry.coercions("Place")
+        self.assertEqual(coercions["latitude"], float)
+        self.assertEqual(coercions["id"], str)
+        self.assertNotIn("amenity_ids", coercions)
+        self.assertNotIn("created_at", coercions)
+
+    def test_references(self):
+        """
+        Test that the ids held by an object are interned.
+        """
+        self.assertEqual(registry.references("Place"),
+                         {"id", "city_id", "user_id", "amenity_ids"})
+        self.assertEqual(registry.references("Unknown"), frozenset())
+        city_id = "".join(["city", "-1"])
+        amenity_id = "".join(["amenity", "-1"])
+        data = registry.intern_references("Place", {
+            "city_id": "".join(["city", "-1"]),
+            "amenity_ids": ["".join(["amenity", "-1"])],
+            "name": "".join(["city", "-1"])
+        })
+        self.assertIs(data["city_id"], registry.intern_value(city_id))
+        self.assertIs(data["amenity_ids"][0],
+                      registry.intern_value(amenity_id))
+        self.assertIsNot(data["name"], data["city_id"])
+
+    def test_setattr_interns(self):
+        """
+        Test that assigning an id to an attribute interns it.
+        """
+        place = Place()
+        place.city_id = "".join(["city", "-2"])
+        self.assertIs(place.city_id, registry.intern_value("city-2"))
+
+    def test_subclass_registers(self):
+        """
+        Test that defining a subclass registers it.
+        """
+        class Tmp(BaseModel):
+            """A throwaway model."""
+            rating = 0.0
+
+        try:
+            self.assertIs(registry.classes()["Tmp"], Tmp)
+            self.assertEqual(registry.attributes()["Tmp"], {"rating": float})
+            self.assertEqual(registry.coercions("Tmp")["rating"], float)
+        finally:
+            registry.unregister("Tmp")
+        self.assertNotIn("Tmp", registry.classes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+"""
+Unit test module for the storage file formats.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from models.engine.atomic import write_atomic
+from models.engine.serializers import BinarySerializer, FormatError, \
+    JSONSerializer, convert, format_of, get_serializer
+
+
+class TestSerializers(unittest.TestCase):
+    """
+    Test cases for the JSON and binary serializers.
+    """
+
+    objects = {
+        "Place.1": {
+            "__class__": "Place", "id": "1", "name": "Loft é",
+            "number_rooms": 3, "price_by_night": -2 ** 70,
+            "latitude": 48.8584, "longitude": -0.5, "amenity_ids": ["a", 7],
+            "extra": {"nested": [True, False, None]}
+        },
+        "User.2": {"__class__": "User", "id": "2", "email": "", "age": None}
+    }
+
+    def setUp(self):
+        """
+        Set up a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.tmp_dir.cleanup()
+
+    def write(self, serializer, name):
+        """
+        Writes the objects with serializer and returns the path.
+        """
+        path = os.path.join(self.tmp_dir.name, name)
+        write_atomic(path, serializer.join(
+            serializer.encode(key, data)
+            for key, data in self.objects.items()
+        ))
+        return path
+
+    def test_round_trip(self):
+        """
+        Test that both formats read back what they wrote.
+        """
+        for serializer in (JSONSerializer(), BinarySerializer(),
+                           BinarySerializer(["id", "name", "__class__"])):
+            with self.subTest(serializer=serializer.name):
+                path = self.write(serializer, "file" + serializer.extension)
+                self.assertEqual(dict(serializer.read(path)), self.objects)
+
+    def test_json_format(self):
+        """
+        Test that the JSON format matches json.dumps().
+        """
+        path = self.write(JSONSerializer(), "file.json")
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(self.objects))
+
+    def test_binary_is_smaller(self):
+        """
+        Test that numbered fields make the binary format smaller.
+        """
+        fields = {name for data in self.objects.values() for name in data}
+        json_path = self.write(JSONSerializer(), "file.json")
+        binary_path = self.write(BinarySerializer(fields), "file.hbnb")
+        self.assertLess(os.path.getsize(binary_path),
+                        os.path.getsize(json_path))
+
+    def test_binary_invalid(self):
+        """
+        Test that foreign or truncated binary files are rejected.
+        """
+        serializer = BinarySerializer()
+        path = self.write(serializer, "file.hbnb")
+        with open(path, "rb") as f:
+            content = f.read()
+        for data in (b"{}", content[:-1], content[:-3] + b"\x00\x00\x00"):
+            with self.subTest(data=data[-8:]):
+                with open(path, "wb") as f:
+                    f.write(data)
+                with self.assertRaises(FormatError):
+                    list(serializer.read(path))
+
+    def test_convert(self):
+        """
+        Test converting JSON to binary and back.
+        """
+        json_path = self.write(JSONSerializer(), "file.json")
+        binary_path = os.path.join(self.tmp_dir.name, "copy.hbnb")
+        back_path = os.path.join(self.tmp_dir.name, "copy.json")
+        self.assertEqual(convert(json_path, binary_path), 2)
+        self.assertEqual(format_of(binary_path), "binary")
+        convert(binary_path, back_path)
+        with open(json_path, "rb") as f, open(back_path, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_command_line(self):
+        """
+        Test that the converter does not load the data file of the
+        current directory.
+        """
+        json_path = self.write(JSONSerializer(), "objects.json")
+        with open(os.path.join(self.tmp_dir.name, "file.json"), "w") as f:
+            f.write("not json")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        result = subprocess.run(
+            [sys.executable, "-W", "error", "-m",
+             "models.engine.serializers", json_path, "copy.hbnb"],
+            cwd=self.tmp_dir.name, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=root))
+        self.assertEqual(result.stderr, "")
+        self.assertEqual(result.stdout, "2 objects converted\n")
+
+    def test_unknown_format(self):
+        """
+        Test that unknown formats are rejected.
+        """
+        with self.assertRaises(ValueError):
+            get_serializer("xml")
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Unit test module for the memory-mapped snapshots.
+"""
+import os
+import tempfile
+import unittest
+
+from models.engine.serializers import FormatError
+from models.engine.snapshot import Snapshot, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test cases for write_snapshot() and the Snapshot class.
+    """
+
+    objects = {
+        "User.b": {"__class__": "User", "id": "b", "email": "b@c.d"},
+        "Place.1": {"__class__": "Place", "id": "1", "number_rooms": 2},
+        "User.a": {"__class__": "User", "id": "a", "first_name": "Ann"},
+        "Place.{}".format("x" * 200): {"__class__": "Place", "id": "long"},
+        "State.é": {"__class__": "State", "id": "é"}
+    }
+
+    def setUp(self):
+        """
+        Set up a snapshot in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "file.snap")
+        self.assertEqual(write_snapshot(self.path, self.objects.items(),
+                                        ["id", "__class__"]), 5)
+        self.snapshot = Snapshot(self.path)
+
+    def tearDown(self):
+        """
+        Unmap the snapshot and remove the temporary directory.
+        """
+        self.snapshot.close()
+        self.tmp_dir.cleanup()
+
+    def test_get(self):
+        """
+        Test looking up objects by key.
+        """
+        for key, data in self.objects.items():
+            with self.subTest(key=key[:20]):
+                self.assertEqual(self.snapshot.get(key), data)
+        for key in ("User.c", "Amenity.1", "", "Zzz.1"):
+            self.assertIsNone(self.snapshot.get(key))
+
+    def test_count_and_items(self):
+        """
+        Test counting and iterating the objects of a class.
+        """
+        self.assertEqual(len(self.snapshot), 5)
+        self.assertEqual(self.snapshot.count(), 5)
+        self.assertEqual(self.snapshot.count("Place"), 2)
+        self.assertEqual(self.snapshot.count("Review"), 0)
+        self.assertEqual([key for key, _ in self.snapshot.items("User")],
+                         ["User.a", "User.b"])
+        self.assertEqual(dict(self.snapshot.items()), self.objects)
+
+    def test_empty(self):
+        """
+        Test a snapshot without objects.
+        """
+        path = os.path.join(self.tmp_dir.name, "empty.snap")
+        write_snapshot(path, [])
+        snapshot = Snapshot(path)
+        self.addCleanup(snapshot.close)
+        self.assertEqual(snapshot.count(), 0)
+        self.assertIsNone(snapshot.get("User.a"))
+
+    def test_invalid(self):
+        """
+        Test that empty or truncated files are rejected.
+        """
+        with open(self.path, "rb") as f:
+            content = f.read()
+        for data in (b"", content[:-1]):
+            with open(self.path, "wb") as f:
+                f.write(data)
+            with self.assertRaises(FormatError):
+                Snapshot(self.path)
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Unit test module for the incremental JSON reader.
+"""
+import io
+import json
+import unittest
+
+from models.engine.stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """
+    Test cases for iter_items().
+    """
+
+    def items(self, text, chunk_size=3):
+        """
+        Returns the entries iter_items() reads from text.
+        """
+        return list(iter_items(io.StringIO(text), chunk_size))
+
+    def test_matches_json_load(self):
+        """
+        Test that entries split across chunks are read like json.load().
+        """
+        data = {
+            "User.1": {"id": "1", "email": "a@b.c", "age": 12345,
+                       "tags": ["x", "y"], "ok": True, "none": None},
+            "Place.é": {"latitude": -12.5e3, "name": "café \"}\""},
+            "Empty.0": {}
+        }
+        for text in (json.dumps(data), json.dumps(data, indent=4)):
+            for chunk_size in (1, 2, 7, 1 << 20):
+                with self.subTest(chunk_size=chunk_size):
+                    self.assertEqual(
+                        self.items(text, chunk_size), list(data.items())
+                    )
+
+    def test_scalar_values(self):
+        """
+        Test that numbers cut by a chunk boundary are read whole.
+        """
+        self.assertEqual(self.items('{"a": 123456, "b": true}', 2),
+                         [("a", 123456), ("b", True)])
+
+    def test_empty_object(self):
+        """
+        Test reading an empty object.
+        """
+        self.assertEqual(self.items(" { } "), [])
+
+    def test_invalid(self):
+        """
+        Test that empty, truncated or malformed files are rejected.
+        """
+        for text in ("", "[]", '{"a": {"b": 1}', '{"a" 1}', '{1: 2}',
+                     '{"a": 1,}', '{"a": 1} x'):
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    self.items(text)